@@ -13,6 +13,26 @@ Pybooru modules:
     danbooru -- Contains Danbooru main class.
     api_moebooru -- Contains all Moebooru API functions.
     api_danbooru -- Contains all Danbooru API functions.
+    endpoints -- Contains the declarative registry of the API endpoints.
+    downloader -- Contains the post downloader and its variant policy.
+    archive -- Contains the tar shard archive for downloaded files.
+    crawler -- Contains resumable crawl jobs.
+    tuning -- Contains the auto-tuner of crawl page size and concurrency.
+    mirror -- Contains the local post mirror and its sync engine.
+    tagindex -- Contains the local inverted tag index.
+    tagquery -- Contains the local evaluator of tag searches.
+    taggraph -- Contains the tag alias and implication graph cache.
+    tagdb -- Contains the local snapshot of Moebooru tags.
+    autocomplete -- Contains the local tag autocomplete index.
+    related -- Contains the local related tags engine.
+    tagdict -- Contains the tag dictionary and dictionary-encoded post sets.
+    poststore -- Contains the memory-mapped post metadata store.
+    export -- Contains the streaming exporters of list calls.
+    federated -- Contains the federated search over several sites.
+    deadline -- Contains deadlines and cancellation of API calls.
+    hedging -- Contains the hedging of slow GET requests.
+    breaker -- Contains the circuit breaker of the requests.
+    cache -- Contains the response cache and its serving modes.
     exceptions -- Manages and builds Pybooru errors messages.
     resources -- Contains all resources for Pybooru.
 """
@@ -25,4 +45,25 @@ __author__ = "Daniel Luque <danielluque14[at]gmail[dot]com>"
 # pybooru imports
 from .moebooru import Moebooru  # NOQA
 from .danbooru import Danbooru  # NOQA
-from .exceptions import (PybooruError, PybooruAPIError, PybooruHTTPError)  # NOQA
+from .archive import ShardWriter  # NOQA
+from .crawler import (CrawlJob, ShardedCrawler, SharedRateLimiter)  # NOQA
+from .tuning import AutoTuner  # NOQA
+from .downloader import (Downloader, VariantPolicy)  # NOQA
+from .mirror import (PostMirror, MirrorSync)  # NOQA
+from .tagindex import TagIndex  # NOQA
+from .tagquery import (LocalSearch, PostColumns)  # NOQA
+from .taggraph import TagGraph  # NOQA
+from .tagdb import MoebooruTagSnapshot  # NOQA
+from .autocomplete import TagAutocomplete  # NOQA
+from .related import RelatedTags  # NOQA
+from .tagdict import (TagDictionary, PostSet)  # NOQA
+from .poststore import PostStore  # NOQA
+from .export import (JSONLExporter, CSVExporter, ParquetExporter)  # NOQA
+from .federated import FederatedSearch  # NOQA
+from .hedging import Hedging  # NOQA
+from .breaker import CircuitBreaker  # NOQA
+from .cache import ResponseCache  # NOQA
+from .endpoints import (Endpoint, registry)  # NOQA
+from .exceptions import (PybooruError, PybooruAPIError, PybooruHTTPError,  # NOQA
+                         PybooruTimeoutError, PybooruCancelledError,
+                         PybooruCircuitOpenError)
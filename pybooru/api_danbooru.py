@@ -12,6 +12,7 @@ Classes:
 from __future__ import absolute_import
 
 # pybooru imports
+from .endpoints import (endpoint, CURSOR)
 from .exceptions import PybooruAPIError
 
 
@@ -22,6 +23,7 @@ class DanbooruApi_Mixin(object):
     * Doc: https://danbooru.donmai.us/wiki_pages/43568
     """
 
+    @endpoint('posts.json', pagination=CURSOR)
     def post_list(self, **params):
         """Get a list of posts.
 
@@ -37,17 +39,22 @@ class DanbooruApi_Mixin(object):
             raw (bool): When this parameter is set the tags parameter will not
                         be parsed for aliased tags, metatags or multiple tags,
                         and will instead be parsed as a single literal tag.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('posts.json', params)
+        return params
 
-    def post_show(self, post_id):
+    @endpoint('posts/{post_id}.json')
+    def post_show(self, post_id, only=None):
         """Get a post.
 
         Parameters:
             post_id (int): Where post_id is the post id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('posts/{0}.json'.format(post_id))
 
+    @endpoint('posts/{post_id}.json', 'PUT', auth=True)
     def post_update(self, post_id, tag_string=None, rating=None, source=None,
                     parent_id=None, has_embedded_notes=None,
                     is_rating_locked=None, is_note_locked=None,
@@ -69,16 +76,16 @@ class DanbooruApi_Mixin(object):
         params = {
             'post[tag_string]': tag_string,
             'post[rating]': rating,
-            'ost[source]': source,
+            'post[source]': source,
             'post[parent_id]': parent_id,
             'post[has_embedded_notes]': has_embedded_notes,
             'post[is_rating_locked]': is_rating_locked,
             'post[is_note_locked]': is_note_locked,
             'post[is_status_locked]': is_status_locked
             }
-        return self._get('posts/{0}.json'.format(post_id), params, 'PUT',
-                         auth=True)
+        return params
 
+    @endpoint('posts/{post_id}/revert.json', 'PUT', auth=True)
     def post_revert(self, post_id, version_id):
         """Function to reverts a post to a previous version (Requires login).
 
@@ -86,9 +93,9 @@ class DanbooruApi_Mixin(object):
             post_id (int):
             version_id (int): The post version id to revert to.
         """
-        return self._get('posts/{0}/revert.json'.format(post_id),
-                         {'version_id': version_id}, 'PUT', auth=True)
+        return {'version_id': version_id}
 
+    @endpoint('posts/{post_id}/copy_notes.json', 'PUT', auth=True)
     def post_copy_notes(self, post_id, other_post_id):
         """Function to copy notes (requires login).
 
@@ -96,9 +103,9 @@ class DanbooruApi_Mixin(object):
             post_id (int):
             other_post_id (int): The id of the post to copy notes to.
         """
-        return self._get('posts/{0}/copy_notes.json'.format(post_id),
-                         {'other_post_id': other_post_id}, 'PUT', auth=True)
+        return {'other_post_id': other_post_id}
 
+    @endpoint('posts/{post_id}/mark_as_translated.json', 'PUT', auth=True)
     def post_mark_translated(self, post_id, check_translation,
                              partially_translated):
         """Mark post as translated (Requires login) (UNTESTED).
@@ -115,9 +122,9 @@ class DanbooruApi_Mixin(object):
             'post[check_translation]': check_translation,
             'post[partially_translated]': partially_translated
             }
-        return self._get('posts/{0}/mark_as_translated.json'.format(post_id),
-                         param, method='PUT', auth=True)
+        return param
 
+    @endpoint('posts/{post_id}/votes.json', 'POST', auth=True)
     def post_vote(self, post_id, score):
         """Action lets you vote for a post (Requires login).
         Danbooru: Post votes/create.
@@ -126,42 +133,51 @@ class DanbooruApi_Mixin(object):
             post_id (int):
             score (str): Can be: up, down.
         """
-        return self._get('posts/{0}/votes.json'.format(post_id),
-                         {'score': score}, 'POST', auth=True)
+        return {'score': score}
 
+    @endpoint('posts/{post_id}/unvote.json', 'PUT', auth=True)
     def post_unvote(self, post_id):
         """Action lets you unvote for a post (Requires login).
 
         Parameters:
             post_id (int):
         """
-        return self._get('posts/{0}/unvote.json'.format(post_id),
-                         method='PUT', auth=True)
 
+    @endpoint('post_flags.json', auth=True, pagination=CURSOR)
     def post_flag_list(self, creator_id=None, creator_name=None, post_id=None,
-                       reason_matches=None, is_resolved=None, category=None):
+                       reason_matches=None, is_resolved=None, category=None,
+                       limit=None, page=None, only=None):
         """Function to flag a post (Requires login).
 
         Parameters:
             creator_id (int): The user id of the flag's creator.
             creator_name (str): The name of the flag's creator.
             post_id (int): The post id if the flag.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[creator_id]': creator_id,
             'search[creator_name]': creator_name,
             'search[post_id]': post_id,
             }
-        return self._get('post_flags.json', params, auth=True)
+        return params
 
-    def post_flag_show(self, flag_id):
+    @endpoint('post_flags/{flag_id}.json', auth=True)
+    def post_flag_show(self, flag_id, only=None):
         """Show specific flagged post (Requires login).
 
         Parameters:
             flag_id (int):
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('post_appeals/{0}.json'.format(flag_id), auth=True)
 
+    @endpoint('post_flags.json', 'POST', auth=True)
     def post_flag_create(self, post_id, reason):
         """Function to flag a post.
 
@@ -170,32 +186,42 @@ class DanbooruApi_Mixin(object):
             reason (str): The reason of the flagging.
         """
         params = {'post_flag[post_id]': post_id, 'post_flag[reason]': reason}
-        return self._get('post_flags.json', params, 'POST', auth=True)
+        return params
 
+    @endpoint('post_appeals.json', auth=True, pagination=CURSOR)
     def post_appeals_list(self, creator_id=None, creator_name=None,
-                          post_id=None):
+                          post_id=None, limit=None, page=None, only=None):
         """Function to return list of appeals (Requires login).
 
         Parameters:
             creator_id (int): The user id of the appeal's creator.
             creator_name (str): The name of the appeal's creator.
             post_id (int): The post id if the appeal.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'creator_id': creator_id,
             'creator_name': creator_name,
             'post_id': post_id
             }
-        return self._get('post_appeals.json', params, auth=True)
+        return params
 
-    def post_appeals_show(self, appeal_id):
+    @endpoint('post_appeals/{appeal_id}.json', auth=True)
+    def post_appeals_show(self, appeal_id, only=None):
         """Show a specific post appeal (Requires login) (UNTESTED).
 
         Parameters:
             appeal_id:
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('post_appeals/{0}.json'.format(appeal_id), auth=True)
 
+    @endpoint('post_appeals.json', 'POST', auth=True)
     def post_appeals_create(self, post_id, reason):
         """Function to create appeals (Requires login).
 
@@ -205,10 +231,12 @@ class DanbooruApi_Mixin(object):
         """
         params = {'post_appeal[post_id]': post_id,
                   'post_appeal[reason]': reason}
-        return self._get('post_appeals.json', params, 'POST', auth=True)
+        return params
 
+    @endpoint('post_versions.json', pagination=CURSOR)
     def post_versions_list(self, updater_name=None, updater_id=None,
-                           post_id=None, start_id=None):
+                           post_id=None, start_id=None, limit=None, page=None,
+                           only=None):
         """Get list of post versions.
 
         Parameters:
@@ -216,63 +244,83 @@ class DanbooruApi_Mixin(object):
             updater_id (int):
             post_id (int):
             start_id (int):
+            limit (int): How many versions you want to retrieve.
+            page (str): The page number, or 'a<id>'/'b<id>' to get versions
+                        after/before a version id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
             'search[updater_name]': updater_name,
             'search[updater_id]': updater_id,
             'search[post_id]': post_id,
-            'search[start_id]': start_id
+            'search[start_id]': start_id,
+            'limit': limit,
+            'page': page
             }
-        return self._get('post_versions.json', params)
+        return params
 
-    def post_versions_show(self, version_id):
+    @endpoint('post_versions/{version_id}.json')
+    def post_versions_show(self, version_id, only=None):
         """Show a specific post version (UNTESTED).
 
         Parameters:
             version_id (int):
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('post_versions/{0}.json'.format(version_id))
 
+    @endpoint('post_versions/{version_id}/undo.json', 'PUT', auth=True)
     def post_versions_undo(self, version_id):
         """Undo post version (Requires login) (UNTESTED).
 
         Parameters:
             version_id (int):
         """
-        return self._get('post_versions/{0}/undo.json'.format(version_id),
-                         method='PUT', auth=True)
 
+    @endpoint('counts/posts.json')
     def count_posts(self, tags=None):
         """Show the number of posts on Danbooru or a specific tag search.
 
         Parameters:
             tags (str):
         """
-        return self._get("counts/posts.json", {"tags": tags})
+        return {"tags": tags}
 
-    def upload_list(self, uploader_id=None, uploader_name=None, source=None):
+    @endpoint('uploads.json', auth=True, cacheable=False, pagination=CURSOR)
+    def upload_list(self, uploader_id=None, uploader_name=None, source=None,
+                    limit=None, page=None, only=None):
         """Search and return an uploads list (Requires login).
 
         Parameters:
             uploader_id (int): The id of the uploader.
             uploader_name (str): The name of the uploader.
             source (str): The source of the upload (exact string match).
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[uploader_id]': uploader_id,
             'search[uploader_name]': uploader_name,
             'search[source]': source
             }
-        return self._get('uploads.json', params, auth=True)
+        return params
 
-    def upload_show(self, upload_id):
+    @endpoint('uploads/{upload_id}.json', auth=True, cacheable=False)
+    def upload_show(self, upload_id, only=None):
         """Get an upload (Requires login).
 
         Parameters:
             upload_id (int):
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('uploads/{0}.json'.format(upload_id), auth=True)
 
+    @endpoint('uploads.json', 'POST', auth=True, upload='upload[file]')
     def upload_create(self, tags, rating, file_=None, source=None,
                       parent_id=None):
         """Function to create a new upload (Requires login).
@@ -288,21 +336,19 @@ class DanbooruApi_Mixin(object):
             PybooruAPIError: When file_ or source are empty.
         """
         if file_ or source is not None:
-            params = {
+            return {
                 'upload[source]': source,
                 'upload[rating]': rating,
                 'upload[parent_id]': parent_id,
                 'upload[tag_string]': tags
                 }
-            file_ = {'upload[file]': open(file_, 'rb')}
-            return self._get('uploads.json', params, 'POST', auth=True,
-                             file_=file_)
         else:
             raise PybooruAPIError("'file_' or 'source' is required.")
 
+    @endpoint('comments.json', pagination=CURSOR)
     def comment_list(self, group_by, limit=None, page=None, body_matches=None,
                      post_id=None, post_tags_match=None, creator_name=None,
-                     creator_id=None, is_deleted=None):
+                     creator_id=None, is_deleted=None, only=None):
         """Return a list of comments.
 
         Parameters:
@@ -318,6 +364,8 @@ class DanbooruApi_Mixin(object):
             creator_name (str): The name of the creator (exact match).
             creator_id (int): The user id of the creator.
             is_deleted (bool): Can be: True, False.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
 
         Raises:
             PybooruAPIError: When 'group_by' is invalid.
@@ -333,8 +381,9 @@ class DanbooruApi_Mixin(object):
             'search[creator_id]': creator_id,
             'search[is_deleted]': is_deleted
             }
-        return self._get('comments.json', params)
+        return params
 
+    @endpoint('comments.json', 'POST', auth=True)
     def comment_create(self, post_id, body, do_not_bump_post=None):
         """Action to lets you create a comment (Requires login).
 
@@ -349,8 +398,9 @@ class DanbooruApi_Mixin(object):
             'comment[body]': body,
             'comment[do_not_bump_post]': do_not_bump_post
             }
-        return self._get('comments.json', params, 'POST', auth=True)
+        return params
 
+    @endpoint('comments/{comment_id}.json', 'PUT', auth=True)
     def comment_update(self, comment_id, body):
         """Function to update a comment (Requires login).
 
@@ -359,35 +409,35 @@ class DanbooruApi_Mixin(object):
             body (str):
         """
         params = {'comment[body]': body}
-        return self._get('comments/{0}.json'.format(comment_id), params, 'PUT',
-                         auth=True)
+        return params
 
-    def comment_show(self, comment_id):
+    @endpoint('comments/{comment_id}.json')
+    def comment_show(self, comment_id, only=None):
         """Get a specific comment.
 
         Parameters:
             comment_id (int): The id number of the comment to retrieve.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('comments/{0}.json'.format(comment_id))
 
+    @endpoint('comments/{comment_id}.json', 'DELETE', auth=True)
     def comment_delete(self, comment_id):
         """Remove a specific comment (Requires login).
 
         Parameters:
             comment_id (int): The id number of the comment to remove.
         """
-        return self._get('comments/{0}.json'.format(comment_id),
-                         method='DELETE', auth=True)
 
+    @endpoint('comments/{comment_id}/undelete.json', 'POST', auth=True)
     def comment_undelete(self, comment_id):
         """Undelete a specific comment (Requires login) (UNTESTED).
 
         Parameters:
             comment_id (int):
         """
-        return self._get('comments/{0}/undelete.json'.format(comment_id),
-                         method='POST', auth=True)
 
+    @endpoint('comments/{comment_id}/votes.json', 'POST', auth=True)
     def comment_vote(self, comment_id, score):
         """Lets you vote for a comment (Requires login).
 
@@ -396,47 +446,51 @@ class DanbooruApi_Mixin(object):
             score (str): Can be: up, down.
         """
         params = {'score': score}
-        return self._get('comments/{0}/votes.json'.format(comment_id), params,
-                         method='POST', auth=True)
+        return params
 
+    @endpoint('comments/{comment_id}/unvote.json', 'POST', auth=True)
     def comment_unvote(self, comment_id):
         """Lets you unvote a specific comment (Requires login).
 
         Parameters:
             comment_id (int):
         """
-        return self._get('posts/{0}/unvote.json'.format(comment_id),
-                         method='POST', auth=True)
 
-    def favorite_list(self, user_id=None):
+    @endpoint('favorites.json', auth=True, pagination=CURSOR)
+    def favorite_list(self, user_id=None, limit=None, page=None, only=None):
         """Return a list with favorite posts (Requires login).
 
         Parameters:
             user_id (int): Which user's favorites to show. Defaults to your own
                            if not specified.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('favorites.json', {'user_id': user_id}, auth=True)
+        return {'user_id': user_id, 'limit': limit, 'page': page}
 
+    @endpoint('favorites.json', 'POST', auth=True)
     def favorite_add(self, post_id):
         """Add post to favorite (Requires login).
 
         Parameters:
             post_id (int): The post to favorite.
         """
-        return self._get('favorites.json', {'post_id': post_id}, 'POST',
-                         auth=True)
+        return {'post_id': post_id}
 
+    @endpoint('favorites/{post_id}.json', 'DELETE', auth=True)
     def favorite_remove(self, post_id):
         """Remove a post from favorites (Requires login).
 
         Parameters:
             post_id (int): Where post_id is the post id.
         """
-        return self._get('favorites/{0}.json'.format(post_id), method='DELETE',
-                         auth=True)
 
+    @endpoint('dmails.json', auth=True, pagination=CURSOR)
     def dmail_list(self, message_matches=None, to_name=None, to_id=None,
-                   from_name=None, from_id=None, read=None):
+                   from_name=None, from_id=None, read=None, limit=None,
+                   page=None, only=None):
         """Return list of Dmails. You can only view dmails you own
         (Requires login).
 
@@ -447,8 +501,14 @@ class DanbooruApi_Mixin(object):
             from_name (str): The sender's name.
             from_id (int): The sender's user id.
             read (bool): Can be: true, false.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[message_matches]': message_matches,
             'search[to_name]': to_name,
             'search[to_id]': to_id,
@@ -456,17 +516,20 @@ class DanbooruApi_Mixin(object):
             'search[from_id]': from_id,
             'search[read]': read
             }
-        return self._get('dmails.json', params, auth=True)
+        return params
 
-    def dmail_show(self, dmail_id):
+    @endpoint('dmails/{dmail_id}.json', auth=True)
+    def dmail_show(self, dmail_id, only=None):
         """Return a specific dmail. You can only view dmails you own
         (Requires login).
 
         Parameters:
             dmail_id (int): Where dmail_id is the dmail id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('dmails/{0}.json'.format(dmail_id), auth=True)
 
+    @endpoint('dmails.json', 'POST', auth=True)
     def dmail_create(self, to_name, title, body):
         """Create a dmail (Requires login)
 
@@ -480,20 +543,21 @@ class DanbooruApi_Mixin(object):
             'dmail[title]': title,
             'dmail[body]': body
             }
-        return self._get('dmails.json', params, 'POST', auth=True)
+        return params
 
+    @endpoint('dmails/{dmail_id}.json', 'DELETE', auth=True)
     def dmail_delete(self, dmail_id):
         """Delete a dmail. You can only delete dmails you own (Requires login).
 
         Parameters:
             dmail_id (int): where dmail_id is the dmail id.
         """
-        return self._get('dmails/{0}.json'.format(dmail_id), method='DELETE',
-                         auth=True)
 
+    @endpoint('artists.json', pagination=CURSOR)
     def artist_list(self, query=None, artist_id=None, creator_name=None,
                     creator_id=None, is_active=None, is_banned=None,
-                    empty_only=None, order=None):
+                    empty_only=None, order=None, limit=None, page=None,
+                    only=None):
         """Get an artist of a list of artists.
 
         Parameters:
@@ -521,8 +585,14 @@ class DanbooruApi_Mixin(object):
             empty_only (True): Search for artists that have 0 posts. Can be:
                                true
             order (str): Can be: name, updated_at.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[name]': query,
             'search[id]': artist_id,
             'search[creator_name]': creator_name,
@@ -532,16 +602,19 @@ class DanbooruApi_Mixin(object):
             'search[empty_only]': empty_only,
             'search[order]': order
             }
-        return self._get('artists.json', params)
+        return params
 
-    def artist_show(self, artist_id):
+    @endpoint('artists/{artist_id}.json')
+    def artist_show(self, artist_id, only=None):
         """Return a specific artist.
 
         Parameters:
             artist_id (int): Where artist_id is the artist id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('artists/{0}.json'.format(artist_id))
 
+    @endpoint('artists.json', 'POST', auth=True)
     def artist_create(self, name, other_names_comma=None, group_name=None,
                       url_string=None, body=None):
         """Function to create an artist (Requires login) (UNTESTED).
@@ -563,8 +636,9 @@ class DanbooruApi_Mixin(object):
             'artist[url_string]': url_string,
             'artist[body]': body,
             }
-        return self.get('artists.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('artists/{artist_id}.json', 'PUT', auth=True)
     def artist_update(self, artist_id, name=None, other_names_comma=None,
                       group_name=None, url_string=None, body=None):
         """Function to update artists (Requires login) (UNTESTED).
@@ -587,9 +661,9 @@ class DanbooruApi_Mixin(object):
             'artist[url_string]': url_string,
             'artist[body]': body
             }
-        return self .get('artists/{0}.json'.format(artist_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('artists/{artist_id}.json', 'DELETE', auth=True)
     def artist_delete(self, artist_id):
         """Action to lets you delete an artist (Requires login) (UNTESTED)
         (Only Builder+).
@@ -597,23 +671,21 @@ class DanbooruApi_Mixin(object):
         Parameters:
             artist_id (int): Where artist_id is the artist id.
         """
-        return self._get('artists/{0}.json'.format(artist_id), method='DELETE',
-                         auth=True)
 
+    @endpoint('artists/{artist_id}/undelete.json', 'POST', auth=True)
     def artist_undelete(self, artist_id):
         """Lets you undelete artist (Requires login) (UNTESTED) (Only Builder+).
 
         Parameters:
             artist_id (int):
         """
-        return self._get('artists/{0}/undelete.json'.format(artist_id),
-                         method='POST', auth=True)
 
+    @endpoint('artists/banned.json')
     def artist_banned(self):
         """This is a shortcut for an artist listing search with
         name=status:banned."""
-        return self._get('artists/banned.json')
 
+    @endpoint('artists/{artist_id}/revert.json', 'PUT', auth=True)
     def artist_revert(self, artist_id, version_id):
         """Revert an artist (Requires login) (UNTESTED).
 
@@ -622,12 +694,12 @@ class DanbooruApi_Mixin(object):
             version_id (int): The artist version id to revert to.
         """
         params = {'version_id': version_id}
-        return self._get('artists/{0}/revert.json'.format(artist_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('artist_versions.json', auth=True, pagination=CURSOR)
     def artist_versions(self, name=None, updater_name=None, updater_id=None,
                         artist_id=None, is_active=None, is_banned=None,
-                        order=None):
+                        order=None, limit=None, page=None, only=None):
         """Get list of artist versions (Requires login).
 
         Parameters:
@@ -638,8 +710,14 @@ class DanbooruApi_Mixin(object):
             is_active (bool): Can be: True, False.
             is_banned (bool): Can be: True, False.
             order (str): Can be: name (Defaults to ID)
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[name]': name,
             'search[updater_name]': updater_name,
             'search[updater_id]': updater_id,
@@ -648,11 +726,13 @@ class DanbooruApi_Mixin(object):
             'search[is_banned]': is_banned,
             'search[order]': order
             }
-        return self._get('artist_versions.json', params, auth=True)
+        return params
 
+    @endpoint('artist_commentaries.json', pagination=CURSOR)
     def artist_commentary_list(self, text_matches=None, post_id=None,
                                post_tags_match=None, original_present=None,
-                               translated_present=None):
+                               translated_present=None, limit=None, page=None,
+                               only=None):
         """list artist commentary.
 
         Parameters:
@@ -662,16 +742,23 @@ class DanbooruApi_Mixin(object):
                                    giventerms. Meta-tags not supported.
             original_present (str): Can be: yes, no.
             translated_present (str): Can be: yes, no.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[text_matches]': text_matches,
             'search[post_id]': post_id,
             'search[post_tags_match]': post_tags_match,
             'search[original_present]': original_present,
             'search[translated_present]': translated_present
             }
-        return self._get('artist_commentaries.json', params)
+        return params
 
+    @endpoint('artist_commentaries/create_or_update.json', 'POST', auth=True)
     def artist_commentary_create_update(self, post_id, original_title,
                                         original_description, translated_title,
                                         translated_description):
@@ -691,9 +778,9 @@ class DanbooruApi_Mixin(object):
             'artist_commentary[translated_title]': translated_title,
             'artist_commentary[translated_description]': translated_description
             }
-        return self._get('artist_commentaries/create_or_update.json', params,
-                         method='POST', auth=True)
+        return params
 
+    @endpoint('artist_commentaries/{id_}/revert.json', 'PUT', auth=True)
     def artist_commentary_revert(self, id_, version_id):
         """Revert artist commentary (Requires login) (UNTESTED).
 
@@ -703,32 +790,50 @@ class DanbooruApi_Mixin(object):
                               revert to.
         """
         params = {'version_id': version_id}
-        return self._get('artist_commentaries/{0}/revert.json'.format(id_),
-                         params, method='PUT', auth=True)
+        return params
 
-    def artist_commentary_versions(self, post_id, updater_id):
+    @endpoint('artist_commentary_versions.json', pagination=CURSOR)
+    def artist_commentary_versions(self, post_id, updater_id, limit=None,
+                                   page=None, only=None):
         """Return list of artist commentary versions.
 
         Parameters:
             updater_id (int):
             post_id (int):
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        params = {'search[updater_id]': updater_id, 'search[post_id]': post_id}
-        return self._get('artist_commentary_versions.json', params)
+        params = {
+            'limit': limit,
+            'page': page,
+            'search[updater_id]': updater_id,
+            'search[post_id]': post_id
+            }
+        return params
 
+    @endpoint('notes.json', pagination=CURSOR)
     def note_list(self, body_matches=None, post_id=None, post_tags_match=None,
-                  creator_name=None, creator_id=None, is_active=None):
+                  creator_name=None, creator_id=None, is_active=None,
+                  limit=None, page=None, only=None):
         """Return list of notes.
 
         Parameters:
+            limit (int): How many notes you want to retrieve.
+            page (int): The page number.
             body_matches (str): The note's body matches the given terms.
             post_id (int): A specific post.
             post_tags_match (str): The note's post's tags match the given terms.
             creator_name (str): The creator's name. Exact match.
             creator_id (int): The creator's user id.
             is_active (bool): Can be: True, False.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[body_matches]': body_matches,
             'search[post_id]': post_id,
             'search[post_tags_match]': post_tags_match,
@@ -736,16 +841,19 @@ class DanbooruApi_Mixin(object):
             'search[creator_id]': creator_id,
             'search[is_active]': is_active
             }
-        return self._get('notes.json', params)
+        return params
 
-    def note_show(self, note_id):
+    @endpoint('notes/{note_id}.json')
+    def note_show(self, note_id, only=None):
         """Get a specific note.
 
         Parameters:
             note_id (int): Where note_id is the note id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('notes/{0}.json'.format(note_id))
 
+    @endpoint('notes.json', 'POST', auth=True)
     def note_create(self, post_id, coor_x, coor_y, width, height, body):
         """Function to create a note (Requires login) (UNTESTED).
 
@@ -767,8 +875,9 @@ class DanbooruApi_Mixin(object):
             'note[height]': height,
             'note[body]': body
             }
-        return self._get('notes.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('notes/{note_id}.json', 'PUT', auth=True)
     def note_update(self, note_id, coor_x=None, coor_y=None, width=None,
                     height=None, body=None):
         """Function to update a note (Requires login) (UNTESTED).
@@ -790,18 +899,17 @@ class DanbooruApi_Mixin(object):
             'note[height]': height,
             'note[body]': body
             }
-        return self._get('notes/{0}.jso'.format(note_id), params, method='PUT',
-                         auth=True)
+        return params
 
+    @endpoint('notes/{note_id}.json', 'DELETE', auth=True)
     def note_delete(self, note_id):
         """delete a specific note (Requires login) (UNTESTED).
 
         Parameters:
             note_id (int): Where note_id is the note id.
         """
-        return self._get('notes/{0}.json'.format(note_id), method='DELETE',
-                         auth=True)
 
+    @endpoint('notes/{note_id}/revert.json', 'PUT', auth=True)
     def note_revert(self, note_id, version_id):
         """Function to revert a specific note (Requires login) (UNTESTED).
 
@@ -809,26 +917,35 @@ class DanbooruApi_Mixin(object):
             note_id (int): Where note_id is the note id.
             version_id (int): The note version id to revert to.
         """
-        return self._get('notes/{0}/revert.json'.format(note_id),
-                         {'version_id': version_id}, method='PUT', auth=True)
+        return {'version_id': version_id}
 
-    def note_versions(self, updater_id=None, post_id=None, note_id=None):
+    @endpoint('note_versions.json', pagination=CURSOR)
+    def note_versions(self, updater_id=None, post_id=None, note_id=None,
+                      limit=None, page=None, only=None):
         """Get list of note versions.
 
         Parameters:
             updater_id (int):
             post_id (int):
             note_id (int):
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[updater_id]': updater_id,
             'search[post_id]': post_id,
             'search[note_id]': note_id
             }
-        return self._get('note_versions.json', params)
+        return params
 
+    @endpoint('users.json', pagination=CURSOR)
     def user_list(self, name=None, name_matches=None, min_level=None,
-                  max_level=None, level=None, user_id=None, order=None):
+                  max_level=None, level=None, user_id=None, order=None,
+                  limit=None, page=None, only=None):
         """Function to get a list of users or a specific user.
 
         Levels:
@@ -847,8 +964,14 @@ class DanbooruApi_Mixin(object):
             user_id (int): The user id.
             order (str): Can be: 'name', 'post_upload_count', 'note_count',
                          'post_update_count', 'date'.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[name]': name,
             'search[name_matches]': name_matches,
             'search[min_level]': min_level,
@@ -857,19 +980,23 @@ class DanbooruApi_Mixin(object):
             'search[id]': user_id,
             'search[order]': order
             }
-        return self._get('users.json', params)
+        return params
 
-    def user_show(self, user_id):
+    @endpoint('users/{user_id}.json')
+    def user_show(self, user_id, only=None):
         """Get a specific user.
 
         Parameters:
             user_id (int): Where user_id is the user id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('users/{0}.json'.format(user_id))
 
+    @endpoint('pools.json', pagination=CURSOR)
     def pool_list(self, name_matches=None, pool_ids=None, category=None,
                   description_matches=None, creator_name=None, creator_id=None,
-                  is_deleted=None, is_active=None, order=None):
+                  is_deleted=None, is_active=None, order=None, limit=None,
+                  page=None, only=None):
         """Get a list of pools.
 
         Parameters:
@@ -883,8 +1010,14 @@ class DanbooruApi_Mixin(object):
             is_deleted (bool): Can be: True, False.
             order (str): Can be: name, created_at, post_count, date.
             category (str): Can be: series, collection.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[name_matches]': name_matches,
             'search[id]': pool_ids,
             'search[description_matches]': description_matches,
@@ -895,16 +1028,19 @@ class DanbooruApi_Mixin(object):
             'search[order]': order,
             'search[category]': category
             }
-        return self._get('pools.json', params)
+        return params
 
-    def pool_show(self, pool_id):
+    @endpoint('pools/{pool_id}.json')
+    def pool_show(self, pool_id, only=None):
         """Get a specific pool.
 
         Parameters:
             pool_id (int): Where pool_id is the pool id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('pools/{0}.json'.format(pool_id))
 
+    @endpoint('pools.json', 'POST', auth=True)
     def pool_create(self, name, description, category):
         """Function to create a pool (Requires login) (UNTESTED).
 
@@ -918,8 +1054,9 @@ class DanbooruApi_Mixin(object):
             'pool[description]': description,
             'pool[category]': category
             }
-        return self._get('pools.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('pools/{pool_id}.json', 'PUT', auth=True)
     def pool_update(self, pool_id, name=None, description=None, post_ids=None,
                     is_active=None, category=None):
         """Update a pool (Requires login) (UNTESTED).
@@ -939,27 +1076,25 @@ class DanbooruApi_Mixin(object):
             'pool[is_active]': is_active,
             'pool[category]': category
             }
-        return self._get('pools/{0}.json'.format(pool_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('pools/{pool_id}.json', 'DELETE', auth=True)
     def pool_delete(self, pool_id):
         """Delete a pool (Requires login) (UNTESTED) (Moderator+).
 
         Parameters:
             pool_id (int): Where pool_id is the pool id.
         """
-        return self._get('pools/{0}.json'.format(pool_id), method='DELETE',
-                         auth=True)
 
+    @endpoint('pools/{pool_id}/undelete.json', 'POST', auth=True)
     def pool_undelete(self, pool_id):
         """Undelete a specific poool (Requires login) (UNTESTED) (Moderator+).
 
         Parameters:
             pool_id (int): Where pool_id is the pool id.
         """
-        return self._get('pools/{0}/undelete.json'.format(pool_id),
-                         method='POST', auth=True)
 
+    @endpoint('pools/{pool_id}/revert.json', 'PUT', auth=True)
     def pool_revert(self, pool_id, version_id):
         """Function to revert a specific pool (Requires login) (UNTESTED).
 
@@ -967,26 +1102,35 @@ class DanbooruApi_Mixin(object):
             pool_id (int): Where pool_id is the pool id.
             version_id (int):
         """
-        return self._get('pools/{0}/revert.json'.format(pool_id),
-                         {'version_id': version_id}, method='PUT', auth=True)
+        return {'version_id': version_id}
 
-    def pool_versions(self, updater_id=None, updater_name=None, pool_id=None):
+    @endpoint('pool_versions.json', pagination=CURSOR)
+    def pool_versions(self, updater_id=None, updater_name=None, pool_id=None,
+                      limit=None, page=None, only=None):
         """Get list of pool versions.
 
         Parameters:
             updater_id (int):
             updater_name (str):
             pool_id (int):
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[updater_id]': updater_id,
             'search[updater_name]': updater_name,
             'search[pool_id]': pool_id
             }
-        return self._get('pool_versions.json', params)
+        return params
 
+    @endpoint('tags.json', pagination=CURSOR)
     def tag_list(self, name_matches=None, name=None, category=None,
-                 hide_empty=None, has_wiki=None, has_artist=None, order=None):
+                 hide_empty=None, has_wiki=None, has_artist=None, order=None,
+                 limit=None, page=None, only=None):
         """Get a list of tags.
 
         Parameters:
@@ -1002,8 +1146,14 @@ class DanbooruApi_Mixin(object):
             has_wiki (str): Can be: yes, no.
             has_artist (str): Can be: yes, no.
             order (str): Can be: name, date, count.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[name_matches]': name_matches,
             'search[name]': name,
             'search[category]': category,
@@ -1012,16 +1162,19 @@ class DanbooruApi_Mixin(object):
             'search[has_artist]': has_artist,
             'search[order]': order
             }
-        return self._get('tags.json', params)
+        return params
 
-    def tag_show(self, tag_id):
+    @endpoint('tags/{tag_id}.json')
+    def tag_show(self, tag_id, only=None):
         """Show a specific tag.
 
         Parameters:
             tag_id (int):
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('tags/{0}.json'.format(tag_id))
 
+    @endpoint('tags/{tag_id}.json', 'PUT', auth=True)
     def tag_update(self, tag_id, category):
         """Lets you update a tag (Requires login) (UNTESTED).
 
@@ -1031,41 +1184,57 @@ class DanbooruApi_Mixin(object):
                             character respectively).
         """
         param = {'tag[category]': category}
-        return self._get('pools/{0}.json'.format(tag_id), param, method='PUT',
-                         auth=True)
+        return param
 
+    @endpoint('tag_aliases.json', pagination=CURSOR)
     def tag_aliases(self, name_matches=None, antecedent_name=None,
-                    tag_id=None):
+                    tag_id=None, limit=None, page=None, only=None):
         """Get tags aliases.
 
         Parameters:
             name_matches (str): Match antecedent or consequent name.
             antecedent_name (str): Match antecedent name (exact match).
             tag_id (int): The tag alias id.
+            limit (int): How many records you want to retrieve.
+            page (str): The page number, or 'a<id>'/'b<id>' to get records
+                        after/before an id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
             'search[name_matches]': name_matches,
             'search[antecedent_name]': antecedent_name,
-            'search[id]': tag_id
+            'search[id]': tag_id,
+            'limit': limit,
+            'page': page
             }
-        return self._get('tag_aliases.json', params)
+        return params
 
+    @endpoint('tag_implications.json', pagination=CURSOR)
     def tag_implications(self, name_matches=None, antecedent_name=None,
-                         tag_id=None):
+                         tag_id=None, limit=None, page=None, only=None):
         """Get tags implications.
 
         Parameters:
             name_matches (str): Match antecedent or consequent name.
             antecedent_name (str): Match antecedent name (exact match).
             tag_id (int): Tag implication id.
+            limit (int): How many records you want to retrieve.
+            page (str): The page number, or 'a<id>'/'b<id>' to get records
+                        after/before an id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
             'search[name_matches]': name_matches,
             'search[antecedent_name]': antecedent_name,
-            'search[id]': tag_id
+            'search[id]': tag_id,
+            'limit': limit,
+            'page': page
             }
-        return self._get('tag_implications.json', params)
+        return params
 
+    @endpoint('related_tag.json')
     def tag_related(self, query, category=None):
         """Get related tags.
 
@@ -1076,14 +1245,18 @@ class DanbooruApi_Mixin(object):
                             3 and Character 4.
         """
         params = {'query': query, 'category': category}
-        return self._get('related_tag.json', params)
+        return params
 
+    @endpoint('wiki_pages.json', pagination=CURSOR)
     def wiki_list(self, title=None, creator_id=None, body_matches=None,
                   other_names_match=None, creator_name=None, hide_deleted=None,
-                  other_names_present=None, order=None):
+                  other_names_present=None, order=None, limit=None,
+                  page=None, only=None):
         """Function to retrieves a list of every wiki page.
 
         Parameters:
+            limit (int): How many pages you want to retrieve.
+            page (int): The page number.
             title (str): Page title.
             creator_id (int): Creator id.
             body_matches (str): Page content.
@@ -1092,8 +1265,12 @@ class DanbooruApi_Mixin(object):
             hide_deleted (str): Can be: yes, no.
             other_names_present (str): Can be: yes, no.
             order (str): Can be: date, title.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[title]': title,
             'search[creator_id]': creator_id,
             'search[body_matches]': body_matches,
@@ -1103,16 +1280,19 @@ class DanbooruApi_Mixin(object):
             'search[other_names_present]': other_names_present,
             'search[order]': order
             }
-        return self._get('wiki_pages.json', params)
+        return params
 
-    def wiki_show(self, wiki_page_id):
+    @endpoint('wiki_pages/{wiki_page_id}.json')
+    def wiki_show(self, wiki_page_id, only=None):
         """Retrieve a specific page of the wiki.
 
         Parameters:
             wiki_page_id (int): Where page_id is the wiki page id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('wiki_pages/{0}.json'.format(wiki_page_id))
 
+    @endpoint('wiki_pages.json', 'POST', auth=True)
     def wiki_create(self, title, body, other_names=None):
         """Action to lets you create a wiki page (Requires login) (UNTESTED).
 
@@ -1126,8 +1306,9 @@ class DanbooruApi_Mixin(object):
             'wiki_page[body]': body,
             'wiki_page[other_names]': other_names
             }
-        return self._get('wiki_pages.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('wiki_pages/{page_id}.json', 'PUT', auth=True)
     def wiki_update(self, page_id, title=None, body=None,
                     other_names=None, is_locked=None, is_deleted=None):
         """Action to lets you update a wiki page (Requires login) (UNTESTED).
@@ -1145,18 +1326,17 @@ class DanbooruApi_Mixin(object):
             'wiki_page[body]': body,
             'wiki_page[other_names]': other_names
             }
-        return self._get('wiki_pages/{0}.json'.format(page_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('wiki_pages/{page_id}.json', 'DELETE', auth=True)
     def wiki_delete(self, page_id):
         """Delete a specific page wiki (Requires login) (UNTESTED) (Builder+).
 
         Parameters:
             page_id (int):
         """
-        return self._get('wiki_pages/{0}.json'.format(page_id), auth=True,
-                         method='DELETE')
 
+    @endpoint('wiki_pages/{wiki_page_id}/revert.json', 'PUT', auth=True)
     def wiki_revert(self, wiki_page_id, version_id):
         """Revert page to a previeous version (Requires login) (UNTESTED).
 
@@ -1164,32 +1344,42 @@ class DanbooruApi_Mixin(object):
             wiki_page_id (int): Where page_id is the wiki page id.
             version_id (int):
         """
-        return self._get('wiki_pages/{0}/revert.json'.format(wiki_page_id),
-                         {'version_id': version_id}, method='PUT', auth=True)
+        return {'version_id': version_id}
 
-    def wiki_versions_list(self, page_id, updater_id):
+    @endpoint('wiki_page_versions.json', pagination=CURSOR)
+    def wiki_versions_list(self, page_id, updater_id, limit=None, page=None,
+                           only=None):
         """Return a list of wiki page version.
 
         Parameters:
             page_id (int):
             updater_id (int):
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
-            'earch[updater_id]': updater_id,
+            'limit': limit,
+            'page': page,
+            'search[updater_id]': updater_id,
             'search[wiki_page_id]': page_id
             }
-        return self._get('wiki_page_versions.json', params)
+        return params
 
-    def wiki_versions_show(self, page_id):
+    @endpoint('wiki_page_versions/{page_id}.json')
+    def wiki_versions_show(self, page_id, only=None):
         """Return a specific wiki page version.
 
         Parameters:
             page_id (int): Where page_id is the wiki page version id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('wiki_page_versions/{0}.json'.format(page_id))
 
+    @endpoint('forum_topics.json', pagination=CURSOR)
     def forum_topic_list(self, title_matches=None, title=None,
-                         category_id=None):
+                         category_id=None, limit=None, page=None, only=None):
         """Function to get forum topics.
 
         Parameters:
@@ -1197,22 +1387,31 @@ class DanbooruApi_Mixin(object):
             title (str): Exact title match.
             category_id (int): Can be: 0, 1, 2 (General, Tags, Bugs & Features
                                respectively).
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[title_matches]': title_matches,
             'search[title]': title,
             'search[category_id]': category_id
             }
-        return self._get('forum_topics.json', params)
+        return params
 
-    def forum_topic_show(self, topic_id):
+    @endpoint('forum_topics/{topic_id}.json')
+    def forum_topic_show(self, topic_id, only=None):
         """Retrieve a specific forum topic.
 
         Parameters:
             topic_id (int): Where topic_id is the forum topic id.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
-        return self._get('forum_topics/{0}.json'.format(topic_id))
 
+    @endpoint('forum_topics.json', 'POST', auth=True)
     def forum_topic_create(self, title, body, category=None):
         """Function to create topic (Requires login) (UNTESTED).
 
@@ -1227,8 +1426,9 @@ class DanbooruApi_Mixin(object):
             'forum_topic[original_post_attributes][body]': body,
             'forum_topic[category_id]': category
             }
-        return self._get('forum_topics.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('forum_topics/{topic_id}.json', 'PUT', auth=True)
     def forum_topic_update(self, topic_id, title=None, category=None):
         """Update a specific topic (Login Requires) (UNTESTED).
 
@@ -1242,30 +1442,29 @@ class DanbooruApi_Mixin(object):
             'forum_topic[title]': title,
             'forum_topic[category_id]': category
             }
-        return self._get('forum_topics/{0}.json'.format(topic_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('forum_topics/{topic_id}.json', 'DELETE', auth=True)
     def forum_topic_delete(self, topic_id):
         """Delete a topic (Login Requires) (Moderator+) (UNTESTED).
 
         Parameters:
             topic_id (int): Where topic_id is the topic id.
         """
-        return self._get('forum_topics/{0}.json'.format(topic_id),
-                         method='DELETE', auth=True)
 
+    @endpoint('forum_topics/{topic_id}/undelete.json', 'POST', auth=True)
     def forum_topic_undelete(self, topic_id):
         """Un delete a topic (Login requries) (Moderator+) (UNTESTED).
 
         Parameters:
             topic_id (int): Where topic_id is the topic id.
         """
-        return self._get('forum_topics/{0}/undelete.json'.format(topic_id),
-                         method='POST', auth=True)
 
+    @endpoint('forum_posts.json', pagination=CURSOR)
     def forum_post_list(self, creator_id=None, creator_name=None,
                         topic_id=None, topic_title_matches=None,
-                        topic_category_id=None, body_matches=None):
+                        topic_category_id=None, body_matches=None, limit=None,
+                        page=None, only=None):
         """Return a list of forum posts.
 
         Parameters:
@@ -1276,8 +1475,14 @@ class DanbooruApi_Mixin(object):
             topic_category_id (int): Can be: 0, 1, 2 (General, Tags, Bugs &
                                      Features respectively).
             body_matches (str): Can be part of the post content.
+            limit (int): How many records you want to retrieve.
+            page (int): The page number.
+            only (str or list): Attributes to return (nested attributes as
+                                dicts, see: Danbooru._get()).
         """
         params = {
+            'limit': limit,
+            'page': page,
             'search[creator_id]': creator_id,
             'search[creator_name]': creator_name,
             'search[topic_id]': topic_id,
@@ -1285,8 +1490,9 @@ class DanbooruApi_Mixin(object):
             'search[topic_category_id]': topic_category_id,
             'search[body_matches]': body_matches
             }
-        return self._get('forum_posts.json', params)
+        return params
 
+    @endpoint('forum_posts.json', 'POST', auth=True)
     def forum_post_create(self, topic_id, body):
         """Create a forum post (Requires login).
 
@@ -1295,8 +1501,9 @@ class DanbooruApi_Mixin(object):
             body (str): Post content.
         """
         params = {'forum_post[topic_id]': topic_id, 'forum_post[body]': body}
-        return self._get('forum_posts.json', params, method='POST', auth=True)
+        return params
 
+    @endpoint('forum_posts/{topic_id}.json', 'PUT', auth=True)
     def forum_post_update(self, topic_id, body):
         """Update a specific forum post (Requries login)(Moderator+)(UNTESTED).
 
@@ -1305,23 +1512,20 @@ class DanbooruApi_Mixin(object):
             body (str): Post content.
         """
         params = {'forum_post[body]': body}
-        return self._get('forum_posts/{0}.json'.format(topic_id), params,
-                         method='PUT', auth=True)
+        return params
 
+    @endpoint('forum_posts/{post_id}.json', 'DELETE', auth=True)
     def forum_post_delete(self, post_id):
         """Delete a specific forum post (Requires login)(Moderator+)(UNTESTED).
 
         Parameters:
             post_id (int): Forum post id.
         """
-        return self._get('forum_posts/{0}.json'.format(post_id),
-                         method='DELETE', auth=True)
 
+    @endpoint('forum_posts/{post_id}/undelete.json', 'POST', auth=True)
     def forum_post_undelete(self, post_id):
         """Undelete a specific forum post (Requires login)(Moderator+)(UNTESTED).
 
         Parameters:
             post_id (int): Forum post id.
         """
-        return self._get('forum_posts/{0}/undelete.json'.format(post_id),
-                         method='POST', auth=True)
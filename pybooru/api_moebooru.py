@@ -12,9 +12,15 @@ Classes:
 from __future__ import absolute_import
 
 # pybooru imports
+from .endpoints import (endpoint, PAGE)
 from .exceptions import PybooruAPIError
 
 
+def _favorited_users(response):
+    """Return list with the users of a favorite/list_users response."""
+    return response['favorited_users'].split(',')
+
+
 class MoebooruApi_Mixin(object):
     """Contains all Moebooru API calls.
 
@@ -22,6 +28,7 @@ class MoebooruApi_Mixin(object):
     * doc: https://yande.re/help/api or https://konachan.com/help/api
     """
 
+    @endpoint('post', pagination=PAGE)
     def post_list(self, **params):
         """Get a list of posts.
 
@@ -33,8 +40,9 @@ class MoebooruApi_Mixin(object):
                          of 100:param  posts per request.
             page (int): The page number.
         """
-        return self._get('post', params)
+        return params
 
+    @endpoint('post/create', 'POST', upload='post[file]')
     def post_create(self, tags, file_=None, rating=None, source=None,
                     rating_locked=None, note_locked=None, parent_id=None,
                     md5=None):
@@ -63,7 +71,7 @@ class MoebooruApi_Mixin(object):
             PybooruAPIError: When file or source are empty.
         """
         if file_ or source is not None:
-            params = {
+            return {
                 'post[tags]': tags,
                 'post[source]': source,
                 'post[rating]': rating,
@@ -71,11 +79,10 @@ class MoebooruApi_Mixin(object):
                 'post[is_note_locked]': note_locked,
                 'post[parent_id]': parent_id,
                 'md5': md5}
-            file_ = {'post[file]': open(file_, 'rb')}
-            return self._get('post/create', params, 'POST', file_)
         else:
             raise PybooruAPIError("'file_' or 'source' is required.")
 
+    @endpoint('post/update', 'PUT', upload='post[file]')
     def post_update(self, post_id, tags=None, file_=None, rating=None,
                     source=None, is_rating_locked=None, is_note_locked=None,
                     parent_id=None):
@@ -106,12 +113,9 @@ class MoebooruApi_Mixin(object):
             'post[is_note_locked]': is_note_locked,
             'post[parent_id]': parent_id
             }
-        if file_ is not None:
-            file_ = {'post[file]': open(file_, 'rb')}
-            return self._get('post/update', params, 'PUT', file_)
-        else:
-            return self._get('post/update', params, 'PUT')
+        return params
 
+    @endpoint('post/destroy', 'DELETE')
     def post_destroy(self, post_id):
         """Function to destroy a specific post.
 
@@ -121,8 +125,9 @@ class MoebooruApi_Mixin(object):
         Parameters:
             post_id (int): The id number of the post to delete.
         """
-        return self._get('post/destroy', {'id': post_id}, method='DELETE')
+        return {'id': post_id}
 
+    @endpoint('post/revert_tags', 'PUT')
     def post_revert_tags(self, post_id, history_id):
         """Function to reverts a post to a previous set of tags
         (Requires login) (UNTESTED).
@@ -132,8 +137,9 @@ class MoebooruApi_Mixin(object):
             history_id (int): The id number of the tag history.
         """
         params = {'id': post_id, 'history_id': history_id}
-        return self._get('post/revert_tags', params, 'PUT')
+        return params
 
+    @endpoint('post/vote', 'POST')
     def post_vote(self, post_id, score):
         """Action lets you vote for a post (Requires login).
 
@@ -149,11 +155,11 @@ class MoebooruApi_Mixin(object):
             PybooruAPIError: When score is > 3.
         """
         if score <= 3 and score >= 0:
-            params = {'id': post_id, 'score': score}
-            return self._get('post/vote', params, 'POST')
+            return {'id': post_id, 'score': score}
         else:
             raise PybooruAPIError("Value of 'score' only can be 0, 1, 2 or 3.")
 
+    @endpoint('tag', pagination=PAGE)
     def tag_list(self, **params):
         """Get a list of tags.
 
@@ -167,8 +173,9 @@ class MoebooruApi_Mixin(object):
             after_id (int): Return all tags that have an id number greater
                             than this.
         """
-        return self._get('tag', params)
+        return params
 
+    @endpoint('tag/update', 'PUT')
     def tag_update(self, name=None, tag_type=None, is_ambiguous=None):
         """Action to lets you update tag (Requires login) (UNTESTED).
 
@@ -187,8 +194,9 @@ class MoebooruApi_Mixin(object):
             'tag[tag_type]': tag_type,
             'tag[is_ambiguous]': is_ambiguous
             }
-        return self._get('tag/update', params, 'PUT')
+        return params
 
+    @endpoint('tag/related')
     def tag_related(self, **params):
         """Get a list of related tags.
 
@@ -197,8 +205,9 @@ class MoebooruApi_Mixin(object):
             type (str): Restrict results to this tag type. Can be general,
                         artist, copyright, or character.
         """
-        return self._get('tag/related', params)
+        return params
 
+    @endpoint('artist', pagination=PAGE)
     def artist_list(self, **params):
         """Get a list of artists.
 
@@ -207,8 +216,9 @@ class MoebooruApi_Mixin(object):
             order (str): Can be date or name.
             page (int): The page number.
         """
-        return self._get('artist', params)
+        return params
 
+    @endpoint('artist/create', 'POST')
     def artist_create(self, name, urls=None, alias=None, group=None):
         """Function to create an artist (Requires login) (UNTESTED).
 
@@ -227,8 +237,9 @@ class MoebooruApi_Mixin(object):
             'artist[alias]': alias,
             'artist[group]': group
             }
-        return self._get('artist/create', params, method='POST')
+        return params
 
+    @endpoint('artist/update', 'PUT')
     def artist_update(self, artist_id, name=None, urls=None, alias=None,
                       group=None):
         """Function to update artists (Requires Login) (UNTESTED).
@@ -253,24 +264,27 @@ class MoebooruApi_Mixin(object):
             'artist[alias]': alias,
             'artist[group]': group
             }
-        return self._get('artist/update', params, method='PUT')
+        return params
 
+    @endpoint('artist/destroy', 'POST')
     def artist_destroy(self, artist_id):
         """Action to lets you remove artist (Requires login) (UNTESTED).
 
         Parameters:
             artist_id (int): The id of the artist to destroy.
         """
-        return self._get('artist/destroy', {'id': artist_id}, method='POST')
+        return {'id': artist_id}
 
+    @endpoint('comment/show')
     def comment_show(self, comment_id):
         """Get a specific comment.
 
         Parameters:
             comment_id (str): The id number of the comment to retrieve.
         """
-        return self._get('comment/show', {'id': comment_id})
+        return {'id': comment_id}
 
+    @endpoint('comment/create', 'POST')
     def comment_create(self, post_id, comment_body, anonymous=None):
         """Action to lets you create a comment (Requires login).
 
@@ -285,16 +299,18 @@ class MoebooruApi_Mixin(object):
             'comment[body]': comment_body,
             'comment[anonymous]': anonymous
             }
-        return self._get('comment/create', params, method='POST')
+        return params
 
+    @endpoint('comment/destroy', 'DELETE')
     def comment_destroy(self, comment_id):
         """Remove a specific comment (Requires login).
 
         Parameters:
             comment_id (int): The id number of the comment to remove.
         """
-        return self._get('comment/destroy', {'id': comment_id}, 'DELETE')
+        return {'id': comment_id}
 
+    @endpoint('wiki', pagination=PAGE)
     def wiki_list(self, **params):
         """Function to retrieves a list of every wiki page.
 
@@ -304,8 +320,9 @@ class MoebooruApi_Mixin(object):
             limit (int): The number of pages to retrieve (Default: 100).
             page (int): The page number.
         """
-        return self._get('wiki', params)
+        return params
 
+    @endpoint('wiki/create', 'POST')
     def wiki_create(self, title, body):
         """Action to lets you create a wiki page (Requires login) (UNTESTED).
 
@@ -314,8 +331,9 @@ class MoebooruApi_Mixin(object):
             body (str): The body of the wiki page.
         """
         params = {'wiki_page[title]': title, 'wiki_page[body]': body}
-        return self._get('wiki/create', params, method='POST')
+        return params
 
+    @endpoint('wiki/update', 'PUT')
     def wiki_update(self, title, new_title=None, page_body=None):
         """Action to lets you update a wiki page (Requires login) (UNTESTED).
 
@@ -329,8 +347,9 @@ class MoebooruApi_Mixin(object):
             'wiki_page[title]': new_title,
             'wiki_page[body]': page_body
             }
-        return self._get('wiki/update', params, method='PUT')
+        return params
 
+    @endpoint('wiki/show')
     def wiki_show(self, **params):
         """Get a specific wiki page.
 
@@ -338,8 +357,9 @@ class MoebooruApi_Mixin(object):
             title (str): The title of the wiki page to retrieve.
             version (int): The version of the page to retrieve.
         """
-        return self._get('wiki/show', params)
+        return params
 
+    @endpoint('wiki/destroy', 'DELETE')
     def wiki_destroy(self, title):
         """Function to delete a specific wiki page (Requires login)
         (Only moderators) (UNTESTED).
@@ -347,8 +367,9 @@ class MoebooruApi_Mixin(object):
         Parameters:
             title (str): The title of the page to delete.
         """
-        return self._get('wiki/destroy', {'title': title}, method='DELETE')
+        return {'title': title}
 
+    @endpoint('wiki/lock', 'POST')
     def wiki_lock(self, title):
         """Function to lock a specific wiki page (Requires login)
         (Only moderators) (UNTESTED).
@@ -356,8 +377,9 @@ class MoebooruApi_Mixin(object):
         Parameters:
             title (str): The title of the page to lock.
         """
-        return self._get('wiki/lock', {'title': title}, 'POST')
+        return {'title': title}
 
+    @endpoint('wiki/unlock', 'POST')
     def wiki_unlock(self, title):
         """Function to unlock a specific wiki page (Requires login)
         (Only moderators) (UNTESTED).
@@ -365,8 +387,9 @@ class MoebooruApi_Mixin(object):
         Parameters:
             title (str): The title of the page to unlock.
         """
-        return self._get('wiki/unlock', {'title': title}, method='POST')
+        return {'title': title}
 
+    @endpoint('wiki/revert', 'PUT')
     def wiki_revert(self, title, version):
         """Function to revert a specific wiki page (Requires login) (UNTESTED).
 
@@ -375,32 +398,36 @@ class MoebooruApi_Mixin(object):
             version (int): The version to revert to.
         """
         params = {'title': title, 'version': version}
-        return self._get('wiki/revert', params, method='PUT')
+        return params
 
+    @endpoint('wiki/history')
     def wiki_history(self, title):
         """Get history of specific wiki page.
 
         Parameters:
             title (str): The title of the wiki page to retrieve versions for.
         """
-        return self._get('wiki/history', {'title': title})
+        return {'title': title}
 
+    @endpoint('note')
     def note_list(self, **params):
         """Get note list.
 
         Parameters:
             post_id (int): The post id number to retrieve notes for.
         """
-        return self._get('note', params)
+        return params
 
+    @endpoint('note/search')
     def note_search(self, query):
         """Search specific note.
 
         Parameters:
             query (str): A word or phrase to search for.
         """
-        return self._get('note/search', {'query': query})
+        return {'query': query}
 
+    @endpoint('note/history', pagination=PAGE)
     def note_history(self, **params):
         """Get history of notes.
 
@@ -410,8 +437,9 @@ class MoebooruApi_Mixin(object):
             limit (int): How many versions to retrieve (Default: 10).
             page (int): The note id number to retrieve versions for.
         """
-        return self._get('note/history', params)
+        return params
 
+    @endpoint('note/revert', 'PUT')
     def note_revert(self, note_id, version):
         """Function to revert a specific note (Requires login) (UNTESTED).
 
@@ -420,8 +448,9 @@ class MoebooruApi_Mixin(object):
             version (int): The version to revert to.
         """
         params = {'id': note_id, 'version': version}
-        return self._get('note/revert', params, method='PUT')
+        return params
 
+    @endpoint('note/update', 'POST')
     def note_create_update(self, post_id=None, coor_x=None, coor_y=None,
                            width=None, height=None, is_active=None, body=None,
                            note_id=None):
@@ -449,8 +478,9 @@ class MoebooruApi_Mixin(object):
             'note[body]': body,
             'note[is_active]': is_active
             }
-        return self._get('note/update', params, method='POST')
+        return params
 
+    @endpoint('user')
     def user_search(self, **params):
         """Search users.
 
@@ -460,8 +490,9 @@ class MoebooruApi_Mixin(object):
             id (int): The id number of the user.
             name (str): The name of the user.
         """
-        return self._get('user', params)
+        return params
 
+    @endpoint('forum')
     def forum_list(self, **params):
         """Function to get forum posts.
 
@@ -471,8 +502,9 @@ class MoebooruApi_Mixin(object):
             parent_id (int): The parent ID number. You'll return all the
                              responses to that forum post.
         """
-        return self._get('forum', params)
+        return params
 
+    @endpoint('pool', pagination=PAGE)
     def pool_list(self, **params):
         """Function to get pools.
 
@@ -482,8 +514,9 @@ class MoebooruApi_Mixin(object):
             query (str): The title.
             page (int): The page number.
         """
-        return self._get('pool', params)
+        return params
 
+    @endpoint('pool/show', pagination=PAGE)
     def pool_posts(self, **params):
         """Function to get pools posts.
 
@@ -493,8 +526,9 @@ class MoebooruApi_Mixin(object):
             id (int): The pool id number.
             page (int): The page number.
         """
-        return self._get('pool/show', params)
+        return params
 
+    @endpoint('pool/update', 'PUT')
     def pool_update(self, pool_id, name=None, is_public=None,
                     description=None):
         """Function to update a pool (Requires login) (UNTESTED).
@@ -511,8 +545,9 @@ class MoebooruApi_Mixin(object):
             'pool[is_public]': is_public,
             'pool[description]': description
             }
-        return self._get('pool/update', params, method='PUT')
+        return params
 
+    @endpoint('pool/create', 'POST')
     def pool_create(self, name, description, is_public):
         """Function to create a pool (Require login) (UNTESTED).
 
@@ -523,16 +558,18 @@ class MoebooruApi_Mixin(object):
         """
         params = {'pool[name]': name, 'pool[description]': description,
                   'pool[is_public]': is_public}
-        return self._get('pool/create', params, method='POST')
+        return params
 
+    @endpoint('pool/destroy', 'DELETE')
     def pool_destroy(self, pool_id):
         """Function to destroy a specific pool (Require login) (UNTESTED).
 
         Parameters:
             pool_id (int): The pool id number.
         """
-        return self._get('pool/destroy', {'id': pool_id}, method='DELETE')
+        return {'id': pool_id}
 
+    @endpoint('pool/add_post', 'PUT')
     def pool_add_post(self, **params):
         """Function to add a post (Require login) (UNTESTED).
 
@@ -540,8 +577,9 @@ class MoebooruApi_Mixin(object):
             pool_id (int): The pool to add the post to.
             post_id (int): The post to add.
         """
-        return self._get('pool/add_post', params, method='PUT')
+        return params
 
+    @endpoint('pool/remove_post', 'PUT')
     def pool_remove_post(self, **params):
         """Function to remove a post (Require login) (UNTESTED).
 
@@ -549,8 +587,9 @@ class MoebooruApi_Mixin(object):
             pool_id (int): The pool to remove the post to.
             post_id (int): The post to remove.
         """
-        return self._get('pool/remove_post', params, method='PUT')
+        return params
 
+    @endpoint('favorite/list_users', parse=_favorited_users)
     def favorite_list_users(self, post_id):
         """Function to return a list with all users who have added to favorites
         a specific post.
@@ -558,6 +597,4 @@ class MoebooruApi_Mixin(object):
         Parameters:
             post_id (int): The post id.
         """
-        response = self._get('favorite/list_users', {'id': post_id})
-        # Return list with users
-        return response['favorited_users'].split(',')
+        return {'id': post_id}
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.archive
+
+This module contains the shard archive used by the downloader to pack files
+into large tar files instead of writing one file per post.
+
+Every shard ('<prefix>-00000.tar') has a sidecar index
+('<prefix>-00000.idx.jsonl') with one JSON entry per file: post id, md5, name,
+shard, offset and length. The offset points to the data of the file inside the
+shard, so a file can be read with a single seek.
+
+Classes:
+    ShardWriter -- Writes files into rolling tar shards.
+
+Functions:
+    read_index -- Iterate over the index entries of a shard archive.
+    read_entry -- Read the content of an index entry.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import glob
+import json
+import os
+import re
+import tarfile
+import threading
+import time
+
+# pybooru imports
+from .exceptions import PybooruError
+
+
+def _shard_paths(dirname, prefix):
+    """Get the (tar, index) paths of the existing shards, sorted."""
+    pattern = os.path.join(dirname, "{0}-*.tar".format(prefix))
+    return [(path, "{0}.idx.jsonl".format(path[:-4]))
+            for path in sorted(glob.glob(pattern))]
+
+
+def read_index(dirname, prefix='shard'):
+    """Iterate over the index entries of a shard archive.
+
+    Parameters:
+        dirname (str): Directory of the archive.
+        prefix (str): Prefix of the shard files.
+
+    Returns:
+        Generator of entries (dict).
+    """
+    for _, index_path in _shard_paths(dirname, prefix):
+        if not os.path.exists(index_path):
+            continue
+        with open(index_path, 'r') as index:
+            for line in index:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_entry(dirname, entry):
+    """Read the content of an index entry.
+
+    Parameters:
+        dirname (str): Directory of the archive.
+        entry (dict): Entry returned by read_index() or ShardWriter.add().
+
+    Returns:
+        File content (bytes).
+    """
+    with open(os.path.join(dirname, entry['shard']), 'rb') as shard:
+        shard.seek(entry['offset'])
+        return shard.read(entry['length'])
+
+
+class ShardWriter(object):
+    """Writes files into rolling tar shards with a sidecar index.
+
+    A new shard is started when the current one would grow over
+    'shard_size'. Existing shards are never modified, writing again to the
+    same directory starts a new shard. A writer can be shared by the
+    download threads.
+
+    Attributes:
+        dirname (str): Directory of the archive.
+        prefix (str): Prefix of the shard files.
+        shard_size (int): Maximum size in bytes of a shard.
+    """
+
+    def __init__(self, dirname, prefix='shard', shard_size=1024 ** 3):
+        """Initialize ShardWriter.
+
+        Keyword arguments:
+            dirname (str): Directory of the archive.
+            prefix (str): Prefix of the shard files (Default: shard).
+            shard_size (int): Maximum size in bytes of a shard
+                              (Default: 1 GiB).
+        """
+        self.dirname = dirname
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self._tar = None
+        self._index = None
+        self._shard_name = None
+        self._lock = threading.Lock()
+
+        existing = _shard_paths(dirname, prefix)
+        if existing:
+            match = re.search(r'-(\d+)\.tar$', existing[-1][0])
+            self._number = int(match.group(1)) + 1
+        else:
+            self._number = 0
+
+    def __getstate__(self):
+        """Pickle support, every process has its own lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, name, fileobj, size, post=None):
+        """Add a file to the archive.
+
+        Parameters:
+            name (str): Name of the file inside the shard.
+            fileobj (file): File object to read the content from.
+            size (int): Size in bytes of the content.
+            post (dict): The post of the file, for the index entry.
+
+        Returns:
+            Index entry (dict).
+
+        Raises:
+            PybooruError: When the content is shorter than 'size'.
+        """
+        # Header block and data padded to full blocks
+        blocks = (size + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE
+        needed = (blocks + 1) * tarfile.BLOCKSIZE
+        post = post or {}
+        with self._lock:
+            if self._tar is None:
+                self._roll()
+            elif self._tar.offset:
+                if self._tar.offset + needed > self.shard_size:
+                    self._roll()
+
+            tarinfo = tarfile.TarInfo(name)
+            tarinfo.size = size
+            tarinfo.mtime = time.time()
+            try:
+                self._tar.addfile(tarinfo, fileobj)
+            except (IOError, OSError) as error:
+                raise PybooruError("Shard write error: {0}".format(error))
+
+            entry = {
+                'id': post.get('id'),
+                'md5': post.get('md5'),
+                'name': name,
+                'shard': self._shard_name,
+                'offset': self._tar.offset - blocks * tarfile.BLOCKSIZE,
+                'length': size
+                }
+            self._index.write(json.dumps(entry, sort_keys=True))
+            self._index.write('\n')
+        return entry
+
+    def flush(self):
+        """Flush the current shard and its index to disk."""
+        with self._lock:
+            if self._tar is not None:
+                self._tar.fileobj.flush()
+                self._index.flush()
+
+    def close(self):
+        """Close the current shard."""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        """Close the current shard (the lock is held)."""
+        if self._tar is not None:
+            self._tar.close()
+            self._index.close()
+            self._tar = None
+            self._index = None
+
+    def _roll(self):
+        """Close the current shard and start the next one (the lock is
+        held)."""
+        self._close()
+        if not os.path.isdir(self.dirname):
+            os.makedirs(self.dirname)
+
+        self._shard_name = "{0}-{1:05d}.tar".format(self.prefix, self._number)
+        path = os.path.join(self.dirname, self._shard_name)
+        self._tar = tarfile.open(path, 'w', format=tarfile.GNU_FORMAT)
+        self._index = open("{0}.idx.jsonl".format(path[:-4]), 'w')
+        self._number += 1
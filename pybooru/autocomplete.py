@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.autocomplete
+
+This module contains a local tag autocomplete index.
+
+Tag names and alias antecedents are kept in a sorted list, a prefix is a range
+of that list found with bisect. The results of the prefixes of one and two
+characters (the largest ranges) are precomputed when the index is built,
+longer prefixes only rank the few names of their range.
+
+Classes:
+    TagAutocomplete -- Prefix search of tags ranked by post count.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import heapq
+from array import array
+from bisect import bisect_left
+
+
+class TagAutocomplete(object):
+    """Prefix search of tags ranked by post count.
+
+    Build it with TagAutocomplete.build() from tag_list() results, a
+    MoebooruTagSnapshot, etc. and set it as the 'autocomplete' attribute of a
+    client to use client.tag_autocomplete().
+
+    Attributes:
+        keys (list): Sorted tag names and alias antecedents.
+        max_limit (int): Maximum results of the precomputed prefixes.
+    """
+
+    # Prefixes up to this length are precomputed
+    PRECOMPUTED_LENGTH = 2
+
+    def __init__(self, keys, names, counts, max_limit=20):
+        """Initialize TagAutocomplete.
+
+        Keyword arguments:
+            keys (list): Sorted tag names and alias antecedents.
+            names (list): Canonical tag name of every key.
+            counts (array): Post count of every key.
+            max_limit (int): Maximum results of the precomputed prefixes.
+        """
+        self.keys = keys
+        self.max_limit = max_limit
+        self._names = names
+        self._counts = counts
+        self._precomputed = {}
+
+        prefixes = set(key[:length] for key in keys
+                       for length in range(1, self.PRECOMPUTED_LENGTH + 1))
+        for prefix in prefixes:
+            self._precomputed[prefix] = self._rank(prefix, max_limit)
+
+    @classmethod
+    def build(cls, tags, aliases=None, max_limit=20):
+        """Build the index.
+
+        Parameters:
+            tags (iterable): Tags with 'name' and 'post_count' (Danbooru) or
+                             'count' (Moebooru).
+            aliases (dict): Antecedent name -> canonical name (e.g.
+                            TagGraph.aliases).
+            max_limit (int): Maximum results of the precomputed prefixes.
+
+        Returns:
+            TagAutocomplete.
+        """
+        counts = {}
+        for tag in tags:
+            count = tag.get('post_count', tag.get('count')) or 0
+            counts[tag['name']] = count
+
+        entries = [(name, name, count) for name, count in counts.items()]
+        for antecedent, name in (aliases or {}).items():
+            if antecedent not in counts:
+                entries.append((antecedent, name, counts.get(name, 0)))
+        entries.sort()
+
+        return cls([entry[0] for entry in entries],
+                   [entry[1] for entry in entries],
+                   array('l', [entry[2] for entry in entries]), max_limit)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix, limit=10):
+        """Get the tags that start with a prefix.
+
+        Aliases are returned as their canonical tag, with the matched
+        antecedent.
+
+        Parameters:
+            prefix (str): Start of the tag name.
+            limit (int): Maximum number of results (Default: 10).
+
+        Returns:
+            List of dicts (name, antecedent, post_count), ranked by post
+            count.
+        """
+        prefix = prefix.lower()
+        if prefix in self._precomputed and limit <= self.max_limit:
+            return self._precomputed[prefix][:limit]
+        return self._rank(prefix, limit)
+
+    def _rank(self, prefix, limit):
+        """Rank the keys that start with prefix."""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + u'\U0010ffff', start)
+
+        # Aliases of the same tag are merged, so take more candidates until
+        # there are enough distinct tags
+        candidates = limit * 2
+        while True:
+            best = heapq.nlargest(candidates, range(start, end),
+                                  key=lambda position: (
+                                      self._counts[position], -position))
+            results = []
+            seen = set()
+            for position in best:
+                name = self._names[position]
+                if name in seen:
+                    continue
+                seen.add(name)
+                key = self.keys[position]
+                results.append({'name': name,
+                                'antecedent': key if key != name else None,
+                                'post_count': self._counts[position]})
+                if len(results) == limit:
+                    return results
+            if candidates >= end - start:
+                return results
+            candidates *= 4
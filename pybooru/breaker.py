@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.breaker
+
+This module contains a circuit breaker for the requests of the clients.
+
+A circuit (one per host, or per host and endpoint) opens after 'threshold'
+consecutive failures: connection errors, timeouts, 5xx and 429 responses.
+While it's open the requests fail fast with PybooruCircuitOpenError. After
+'reset_timeout' seconds the circuit is half-open: 'trials' probe requests
+are sent, a successful probe closes the circuit and a failed one opens it
+again.
+
+Set a CircuitBreaker as the 'breaker' attribute of one or several clients
+(e.g. the clients of a crawl), the circuits are shared by every client of
+the same host.
+
+Classes:
+    CircuitBreaker -- Circuits of the hosts (or endpoints).
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import threading
+import time
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+# pybooru imports
+from .exceptions import PybooruCircuitOpenError
+
+
+# Circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def failure_status(status_code):
+    """True if an HTTP status code counts as a failure of the site."""
+    return status_code >= 500 or status_code == 429
+
+
+class CircuitBreaker(object):
+    """Circuits of the hosts (or endpoints).
+
+    Attributes:
+        threshold (int): Consecutive failures that open a circuit.
+        reset_timeout (float): Seconds before a half-open probe.
+        trials (int): Concurrent probes of a half-open circuit.
+        per_endpoint (bool): One circuit per host and endpoint.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30, trials=1,
+                 per_endpoint=False):
+        """Initialize CircuitBreaker.
+
+        Keyword arguments:
+            threshold (int): Consecutive failures that open a circuit
+                             (Default: 5).
+            reset_timeout (float): Seconds before a half-open probe
+                                   (Default: 30).
+            trials (int): Concurrent probes of a half-open circuit
+                          (Default: 1).
+            per_endpoint (bool): One circuit per host and endpoint
+                                 (Default: False, one per host).
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.trials = trials
+        self.per_endpoint = per_endpoint
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Pickle support, every process has its own lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, url, endpoint=None):
+        """Get the circuit key of a request.
+
+        Parameters:
+            url (str): URL of the request.
+            endpoint (str): Endpoint of the request (ids replaced by '{id}').
+        """
+        host = urlparse(url).netloc
+        if self.per_endpoint and endpoint:
+            return "{0}/{1}".format(host, endpoint.lstrip('/'))
+        return host
+
+    def state(self, key):
+        """Get the state of a circuit: 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return CLOSED
+            if circuit['state'] == OPEN and self._retry_after(circuit) == 0:
+                return HALF_OPEN
+            return circuit['state']
+
+    def acquire(self, url, endpoint=None):
+        """Get the circuit of a request, fails fast when it's open.
+
+        Parameters:
+            url (str): URL of the request.
+            endpoint (str): Endpoint of the request.
+
+        Returns:
+            The circuit key, pass it to success(), failure() or release().
+
+        Raises:
+            PybooruCircuitOpenError: When the circuit is open (or half-open
+                                     with all the probes in flight).
+        """
+        key = self.key(url, endpoint)
+        with self._lock:
+            circuit = self._circuits.setdefault(key, {
+                'state': CLOSED, 'failures': 0, 'opened': None, 'probes': 0})
+            if circuit['state'] == OPEN:
+                retry_after = self._retry_after(circuit)
+                if retry_after:
+                    raise PybooruCircuitOpenError(key, retry_after)
+                circuit['state'] = HALF_OPEN
+            if circuit['state'] == HALF_OPEN:
+                if circuit['probes'] >= self.trials:
+                    raise PybooruCircuitOpenError(key, self.reset_timeout)
+                circuit['probes'] += 1
+        return key
+
+    def success(self, key):
+        """Report a successful request, closes the circuit."""
+        with self._lock:
+            circuit = self._circuits[key]
+            circuit.update(state=CLOSED, failures=0, opened=None, probes=0)
+
+    def failure(self, key):
+        """Report a failed request, opens the circuit after 'threshold'
+        failures or after a failed probe."""
+        with self._lock:
+            circuit = self._circuits[key]
+            circuit['failures'] += 1
+            probe = circuit['state'] == HALF_OPEN
+            if probe or circuit['failures'] >= self.threshold:
+                circuit.update(state=OPEN, opened=time.time(), probes=0)
+
+    def release(self, key):
+        """Release the probe of a request without outcome (e.g. interrupted
+        or cancelled), the state of the circuit doesn't change."""
+        with self._lock:
+            circuit = self._circuits[key]
+            if circuit['state'] == HALF_OPEN and circuit['probes']:
+                circuit['probes'] -= 1
+
+    def result(self, key, status_code):
+        """Report the HTTP status code of a request."""
+        if failure_status(status_code):
+            self.failure(key)
+        else:
+            self.success(key)
+
+    def reset(self, key=None):
+        """Close a circuit (Default: all the circuits)."""
+        with self._lock:
+            if key is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(key, None)
+
+    def _retry_after(self, circuit):
+        """Seconds before an open circuit can be probed."""
+        return max(circuit['opened'] + self.reset_timeout - time.time(), 0)
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.cache
+
+This module contains the response cache of the GET requests.
+
+Set a ResponseCache as the 'cache' attribute of a client, the client
+'cache_mode' chooses how expired entries are served:
+
+    normal -- Expired entries are fetched again. When the circuit breaker
+              of the site is open, stale entries (up to 'max_stale' seconds
+              after they expire) are returned instead of failing.
+    stale-while-revalidate -- Expired entries (up to 'max_stale') are
+              returned immediately and refreshed in a background thread.
+    offline -- Only the cache answers, at any age. Missing entries raise
+               PybooruError, no request is sent.
+
+Entries are keyed by URL, parameters (including 'only') and username, and
+stored as JSON: every hit returns a new copy of the data.
+
+Writes (POST, PUT and DELETE calls) keep the cache correct: the resource
+(e.g. 'posts', id 123) of the call and the resources in DEPENDENCIES are
+looked up in the cached entries. Lists containing the record are removed,
+a cached record is replaced by the record returned by the write (or removed
+when the write doesn't return it). Writes without id (creates) remove every
+list of the resource.
+
+Classes:
+    ResponseCache -- LRU cache of the decoded responses.
+
+Functions:
+    target -- Get the resource of an API call.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import collections
+import json
+import threading
+import time
+
+# pybooru imports
+from .exceptions import (PybooruError, PybooruCircuitOpenError)
+
+
+# Cache modes
+NORMAL = 'normal'
+STALE_WHILE_REVALIDATE = 'stale-while-revalidate'
+OFFLINE = 'offline'
+MODES = (NORMAL, STALE_WHILE_REVALIDATE, OFFLINE)
+
+# Answer status -> counter of 'stats'
+_STATS = {'hit': 'hits', 'stale': 'stale', 'miss': 'misses'}
+
+# Parameters with the id of a resource (Moebooru)
+ID_PARAMS = ('id', 'title', 'name')
+
+# Write endpoint -> the resources it changes (resource, id parameter).
+# '{id}' is the id of the URL, None every list and '*' every entry of the
+# resource. The resource of the endpoint itself is always changed.
+DEPENDENCIES = {
+    # Danbooru
+    'favorites.json': (('posts', 'post_id'),),
+    'favorites/{id}.json': (('posts', '{id}'),),
+    'comments.json': (('posts', 'comment[post_id]'),),
+    'notes.json': (('posts', 'note[post_id]'),),
+    'post_flags.json': (('posts', 'post_flag[post_id]'),),
+    'post_appeals.json': (('posts', 'post_appeal[post_id]'),),
+    'post_versions/{id}/undo.json': (('posts', '*'),),
+    'uploads.json': (('posts', None),),
+    'artist_commentaries/create_or_update.json': (
+        ('artist_commentaries', '*'),),
+    # Moebooru
+    'comment/create': (('post', 'comment[post_id]'),),
+    'note/update': (('post', 'note[post]'),),
+    'pool/add_post': (('pool', 'pool_id'), ('post', 'post_id')),
+    'pool/remove_post': (('pool', 'pool_id'), ('post', 'post_id'))
+    }
+
+
+def target(api_call, params=None):
+    """Get the resource of an API call.
+
+    Danbooru calls have the id in the URL ('posts/123.json', 'posts/123/
+    votes.json'), Moebooru calls in the parameters ('post/update', id=123).
+
+    Parameters:
+        api_call (str): API function called.
+        params (dict): Parameters of the call.
+
+    Returns:
+        Tuple (resource name, id as str or None).
+    """
+    parts = api_call.split('/')
+    if api_call.endswith('.json'):
+        parts[-1] = parts[-1][:-5]
+        if len(parts) > 1:
+            return parts[0], parts[1]
+    for name in ID_PARAMS:
+        if params and params.get(name) is not None:
+            return parts[0], str(params[name])
+    return parts[0], None
+
+
+def _dependencies(api_call, params, resource=None):
+    """Get the resources changed by a write, list of (name, id)."""
+    name, id_ = target(api_call, params)
+    resources = [(resource or name, id_)]
+    endpoint = api_call if id_ is None else api_call.replace(
+        "/{0}".format(id_), '/{id}', 1)
+    for resource, source in DEPENDENCIES.get(endpoint, ()):
+        if source == '{id}':
+            resources.append((resource, id_))
+        elif source is None or source == '*':
+            resources.append((resource, source))
+        elif params and params.get(source) is not None:
+            resources.append((resource, str(params[source])))
+    return resources
+
+
+def _record_ids(data):
+    """Ids, titles and names of the records of a response (set)."""
+    records = data if isinstance(data, list) else [data]
+    ids = set()
+    for record in records:
+        if isinstance(record, dict):
+            ids.update(str(record[name]) for name in ID_PARAMS
+                       if record.get(name) is not None)
+    return ids
+
+
+class ResponseCache(object):
+    """LRU cache of the decoded responses.
+
+    Attributes:
+        ttl (float): Seconds an entry is fresh.
+        max_stale (float): Seconds an expired entry can be served (None: no
+                           limit).
+        max_entries (int): Maximum number of entries.
+        stats (dict): Hits, stale hits, misses and background refreshes.
+    """
+
+    def __init__(self, ttl=300, max_stale=3600, max_entries=10000):
+        """Initialize ResponseCache.
+
+        Keyword arguments:
+            ttl (float): Seconds an entry is fresh (Default: 300).
+            max_stale (float): Seconds an expired entry can be served
+                               (Default: 3600, None: no limit).
+            max_entries (int): Maximum number of entries (Default: 10000).
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'stale': 0, 'misses': 0, 'refreshes': 0}
+        self._entries = collections.OrderedDict()
+        self._resources = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Pickle support, every process has its own lock and background
+        refreshes."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_refreshing']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(url, params=None, username=''):
+        """Get the key of a request.
+
+        Parameters:
+            url (str): URL of the request.
+            params (dict): Parameters of the request.
+            username (str): User of the request.
+        """
+        params = dict((name, value) for name, value in (params or {}).items()
+                      if value is not None)
+        return "{0}?{1}#{2}".format(
+            url, json.dumps(params, sort_keys=True, default=str), username)
+
+    def get(self, key):
+        """Get an entry.
+
+        Returns:
+            Tuple (data, age in seconds) or None when it's not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.pop(key)
+            self._entries[key] = entry
+        return json.loads(entry[1]), time.time() - entry[0]
+
+    def set(self, key, data, resource=None):
+        """Store the data of a request.
+
+        Parameters:
+            key (str): Key of the request (see: key()).
+            data: Decoded response.
+            resource (tuple): (site, name, id) of the request, used by
+                              write() (see: target()).
+        """
+        ids = _record_ids(data)
+        if resource is not None and resource[2] is not None:
+            ids.add(resource[2])
+        entry = (time.time(), json.dumps(data), resource, ids,
+                 isinstance(data, dict))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            if resource is not None:
+                self._resources.setdefault(resource[:2], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key=None):
+        """Remove an entry (Default: all the entries)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._resources.clear()
+            else:
+                self._remove(key)
+
+    def write(self, site, api_call, params=None, record=None,
+              resource=None):
+        """Update the entries changed by a write call.
+
+        Parameters:
+            site (str): URL of the site.
+            api_call (str): API function called.
+            params (dict): Parameters of the call.
+            record: Response of the call (None: the call failed).
+            resource (str): Resource type of the call (Default: see
+                            target()).
+
+        Returns:
+            Number of entries removed or updated (int).
+        """
+        changed = 0
+        with self._lock:
+            for name, id_ in _dependencies(api_call, params, resource):
+                for key in list(self._resources.get((site, name), ())):
+                    changed += self._write(key, id_, record)
+        return changed
+
+    def _write(self, key, id_, record):
+        """Apply a write of the record 'id_' to an entry."""
+        stored, data, resource, ids, single = self._entries[key]
+        if id_ is None:
+            # Create: a list may now contain the record
+            if single:
+                return 0
+        elif id_ != '*' and id_ not in ids:
+            return 0
+        # Projected entries ('only') can't be replaced by a full record
+        projected = '"only":' in key
+        replace = single and not projected and isinstance(record, dict)
+        if replace and str(record.get('id')) in ids:
+            self._entries[key] = (time.time(), json.dumps(record), resource,
+                                  ids | _record_ids(record), single)
+        else:
+            self._remove(key)
+        return 1
+
+    def _remove(self, key):
+        """Remove an entry and its resource index."""
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry[2] is not None:
+            keys = self._resources.get(entry[2][:2])
+            keys.discard(key)
+            if not keys:
+                del self._resources[entry[2][:2]]
+
+    def fetch(self, key, function, mode=NORMAL, resource=None):
+        """Get the data of a request from the cache or from 'function'.
+
+        Parameters:
+            key (str): Key of the request (see: key()).
+            function (function): Sends the request and returns the data.
+            mode (str): Cache mode (see: MODES).
+            resource (tuple): (site, name, id) of the request (see: set()).
+
+        Returns:
+            Tuple (data, status), status is 'hit', 'stale' or 'miss'.
+
+        Raises:
+            PybooruError: When the mode is invalid or, in offline mode, when
+                          the request isn't cached.
+        """
+        if mode not in MODES:
+            raise PybooruError("Invalid cache mode: {0}".format(mode))
+
+        entry = self.get(key)
+        if entry is not None:
+            data, age = entry
+            if age < self.ttl or mode == OFFLINE:
+                return self._count(data, 'hit' if age < self.ttl else 'stale')
+            if mode == STALE_WHILE_REVALIDATE and self._servable(age):
+                self._refresh(key, function, resource)
+                return self._count(data, 'stale')
+        elif mode == OFFLINE:
+            raise PybooruError("Not cached (offline mode): {0}".format(key))
+
+        try:
+            data = function()
+        except PybooruCircuitOpenError:
+            if entry is None or not self._servable(entry[1]):
+                raise
+            return self._count(entry[0], 'stale')
+        self.set(key, data, resource)
+        return self._count(data, 'miss')
+
+    def _servable(self, age):
+        """True if an expired entry can still be served."""
+        return self.max_stale is None or age < self.ttl + self.max_stale
+
+    def _count(self, data, status):
+        """Count a cache answer."""
+        with self._lock:
+            self.stats[_STATS[status]] += 1
+        return data, status
+
+    def _refresh(self, key, function, resource):
+        """Refresh an entry in a background thread (once at a time)."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.stats['refreshes'] += 1
+
+        def run():
+            try:
+                self.set(key, function(), resource)
+            except Exception:
+                pass  # The entry stays stale, the next call retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
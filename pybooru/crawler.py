@@ -0,0 +1,643 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.crawler
+
+This module contains resumable crawl jobs over post_list().
+
+A crawl job walks the posts of a tag query from the newest to the oldest id.
+After every page the cursor (lowest id seen), the posts of the page and their
+download state are saved in a SQLite checkpoint file, so a job that dies can
+be started again and continues exactly where it stopped.
+
+Classes:
+    CrawlJob -- Resumable crawl of a tag query.
+    SharedRateLimiter -- Rate limiter shared by processes through SQLite.
+    ShardedCrawler -- Crawl of a tag query split in id ranges, run by a
+                      process pool.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import functools
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+from multiprocessing.pool import ThreadPool
+
+# pybooru imports
+from .moebooru import Moebooru
+from .exceptions import PybooruError
+
+
+# 'id:' metatag of a tag query
+_ID_METATAG = re.compile(r'(?:^|\s)id:(\S+)')
+
+
+def _id_range(tags):
+    """Split the 'id:' metatags of a tag query.
+
+    Supported values: N, low..high, ..high, low.., >N, >=N, <N and <=N.
+    Several metatags are intersected.
+
+    Returns:
+        Tuple (tags without the metatags, lowest id, highest id), a bound is
+        None when the query doesn't limit it.
+
+    Raises:
+        PybooruError: When an 'id:' value isn't supported.
+    """
+    low = high = None
+    for value in _ID_METATAG.findall(tags):
+        try:
+            if '..' in value:
+                first, last = value.split('..', 1)
+                bounds = (int(first) if first else None,
+                          int(last) if last else None)
+            elif value.startswith('>='):
+                bounds = (int(value[2:]), None)
+            elif value.startswith('>'):
+                bounds = (int(value[1:]) + 1, None)
+            elif value.startswith('<='):
+                bounds = (None, int(value[2:]))
+            elif value.startswith('<'):
+                bounds = (None, int(value[1:]) - 1)
+            else:
+                bounds = (int(value), int(value))
+        except ValueError:
+            raise PybooruError("Unsupported id metatag: id:{0}".format(value))
+        if bounds[0] is not None:
+            low = bounds[0] if low is None else max(low, bounds[0])
+        if bounds[1] is not None:
+            high = bounds[1] if high is None else min(high, bounds[1])
+    return ' '.join(_ID_METATAG.sub(' ', tags).split()), low, high
+
+
+def _inside(post_id, low, high):
+    """True if a post id is inside the range [low, high] (None: open)."""
+    if low is not None and post_id < low:
+        return False
+    return high is None or post_id <= high
+
+
+class CrawlJob(object):
+    """Resumable crawl of a tag query.
+
+    Attributes:
+        client (_Pybooru): Danbooru or Moebooru client.
+        tags (str): The tags to search for.
+        checkpoint (str): Path of the SQLite checkpoint file.
+        limit (int): Posts per page.
+        downloader (Downloader): Optional downloader for the posts.
+        dirname (str): Directory for the downloaded files.
+        tuner (AutoTuner): Optional auto-tuner of the page size and the
+                           download workers.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS job (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS posts (id INTEGER PRIMARY KEY, "
+        "state TEXT NOT NULL, post TEXT, result TEXT)"
+        )
+
+    # Throttled page requests retried in a row before run() gives up
+    MAX_RETRIES = 8
+
+    def __init__(self, client, tags='', checkpoint='crawl.sqlite', limit=100,
+                 downloader=None, dirname='.', tuner=None):
+        """Initialize CrawlJob.
+
+        Keyword arguments:
+            client (_Pybooru): Danbooru or Moebooru client.
+            tags (str): The tags to search for.
+            checkpoint (str): Path of the SQLite checkpoint file.
+            limit (int): Posts per page (Default: 100).
+            downloader (Downloader): Downloader for the posts (Default: None,
+                                     posts are only recorded).
+            dirname (str): Directory for the downloaded files.
+            tuner (AutoTuner): Auto-tuner (Default: None, 'limit' is used
+                               and posts are downloaded one by one).
+
+        Raises:
+            PybooruError: When the checkpoint belongs to another query.
+        """
+        self.client = client
+        self.tags = tags
+        self.checkpoint = checkpoint
+        self.limit = limit
+        self.downloader = downloader
+        self.dirname = dirname
+        self.tuner = tuner
+        if tuner is not None:
+            tuner.set_client(client)
+
+        self._db = sqlite3.connect(checkpoint)
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        saved_tags = self._state('tags')
+        if saved_tags is None:
+            self._set_state('tags', tags)
+            self._db.commit()
+        elif saved_tags != tags:
+            raise PybooruError("The checkpoint '{0}' belongs to the query "
+                               "'{1}'".format(checkpoint, saved_tags))
+
+    @property
+    def cursor(self):
+        """Lowest post id crawled (None if the job didn't start)."""
+        value = self._state('cursor')
+        return int(value) if value is not None else None
+
+    @property
+    def finished(self):
+        """True when the last page has been crawled."""
+        return self._state('finished') == '1'
+
+    def stats(self):
+        """Count posts by state.
+
+        Returns:
+            Dict {state: count}.
+        """
+        return dict(self._db.execute(
+            "SELECT state, COUNT(*) FROM posts GROUP BY state"))
+
+    def retry_failed(self):
+        """Mark failed posts as pending, the next run() processes them.
+
+        Returns:
+            Number of posts marked as pending (int).
+        """
+        with self._db:
+            return self._db.execute("UPDATE posts SET state = 'pending' "
+                                    "WHERE state = 'failed'").rowcount
+
+    def run(self, callback=None, max_pages=None, progress=None):
+        """Crawl pages until the query is exhausted or 'max_pages' is reached.
+
+        Posts left pending by a previous run are processed first. With a
+        tuner, throttled requests are retried after its backoff, up to
+        MAX_RETRIES times in a row.
+
+        Parameters:
+            callback (function): Called with the list of posts of every page
+                                 before they are marked as done.
+            max_pages (int): Maximum number of pages to crawl in this run.
+            progress (function): Called without arguments after every page
+                                 and every backoff (e.g. to renew a lease).
+
+        Returns:
+            Number of posts processed (int).
+
+        Raises:
+            PybooruError: When a page fails, or is still throttled after
+                          MAX_RETRIES retries.
+        """
+        processed = self._process(self._pending(), callback)
+        pages = 0
+        retries = 0
+        while not self.finished:
+            if max_pages is not None and pages >= max_pages:
+                break
+            try:
+                processed += self.step(callback)
+            except PybooruError as error:
+                if self.tuner is None:
+                    raise
+                backoff = self.tuner.page_failed(error)
+                if not backoff:
+                    raise
+                retries += 1
+                if retries > self.MAX_RETRIES:
+                    raise PybooruError("Still throttled after {0} retries: "
+                                       "{1}".format(self.MAX_RETRIES, error))
+                deadline = self.client._deadline()
+                if deadline is not None:
+                    deadline.sleep(backoff)
+                else:
+                    time.sleep(backoff)
+            else:
+                pages += 1
+                retries = 0
+            if progress is not None:
+                progress()
+        return processed
+
+    def step(self, callback=None):
+        """Crawl one page and save the checkpoint.
+
+        Parameters:
+            callback (function): Called with the list of posts of the page.
+
+        Returns:
+            Number of posts processed (int).
+        """
+        if self.finished:
+            return 0
+
+        limit = self.limit if self.tuner is None else self.tuner.limit
+        cursor = self.cursor
+        start = time.time()
+        posts = self.fetch_page(cursor, limit)
+        if self.tuner is not None:
+            self.tuner.page_done(time.time() - start)
+
+        # A page outside of the range would overlap other jobs (shards)
+        low, high = self._range(cursor)[1:]
+        outside = [post['id'] for post in posts
+                   if not _inside(post['id'], low, high)]
+        if outside:
+            raise PybooruError("Posts outside of the range {0}..{1} of the "
+                               "query: {2}".format(low, high, outside))
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO posts (id, state, post) "
+                "VALUES (?, 'pending', ?)",
+                [(post['id'], json.dumps(post)) for post in posts])
+            # Pages can be short (hidden posts, capped limit): only an
+            # empty page ends the query
+            if posts:
+                self._set_state('cursor', min(post['id'] for post in posts))
+            else:
+                self._set_state('finished', '1')
+        return self._process(self._pending(), callback)
+
+    def fetch_page(self, cursor, limit=None):
+        """Get the page of posts older than cursor.
+
+        Danbooru uses the 'b<id>' page cursor, Moebooru the 'id:' metatag
+        (the id range of the query cut at the cursor).
+
+        Parameters:
+            cursor (int): Lowest id already crawled (None for the first page).
+            limit (int): Posts per page (Default: 'limit' attribute).
+
+        Returns:
+            List of posts.
+        """
+        tags = self.tags
+        params = {'limit': limit or self.limit}
+        if cursor is not None:
+            if isinstance(self.client, Moebooru):
+                # Moebooru keeps only the last 'id:' metatag: narrow the
+                # range of the query instead of adding one
+                tags, low, high = self._range(cursor)
+                if low is None:
+                    tags = "{0} id:<={1}".format(tags, high).strip()
+                else:
+                    tags = "{0} id:{1}..{2}".format(tags, low, high).strip()
+            else:
+                params['page'] = "b{0}".format(cursor)
+        if tags:
+            params['tags'] = tags
+        return self.client.post_list(**params)
+
+    def close(self):
+        """Close the checkpoint file."""
+        self._db.close()
+
+    def _range(self, cursor):
+        """Get the tags and the id range of the query below cursor.
+
+        Returns:
+            Tuple (tags without 'id:' metatags, lowest id, highest id).
+        """
+        tags, low, high = _id_range(self.tags)
+        if cursor is not None and (high is None or high >= cursor):
+            high = cursor - 1
+        return tags, low, high
+
+    def _process(self, posts, callback):
+        """Run the callback and the downloader and mark posts as done."""
+        if not posts:
+            return 0
+        if callback is not None:
+            callback(posts)
+
+        if self.downloader is None:
+            results = [('done', None)] * len(posts)
+        elif self.tuner is None:
+            results = [self._download(post) for post in posts]
+        else:
+            start = time.time()
+            pool = ThreadPool(self.tuner.workers)
+            try:
+                # The deadline of the run covers the downloads
+                download = self.client._in_deadline(self._download)
+                results = pool.map(download, posts)
+            finally:
+                pool.close()
+                pool.join()
+            done = sum(1 for state, result in results if state == 'done')
+            self.tuner.downloads_done(time.time() - start, done,
+                                      len(posts) - done)
+
+        for post, (state, result) in zip(posts, results):
+            if isinstance(result, Exception):
+                result = str(result)
+            # Failed posts keep their data to be retried
+            data = json.dumps(post) if state == 'failed' else None
+            with self._db:
+                self._db.execute(
+                    "UPDATE posts SET state = ?, result = ?, post = ? "
+                    "WHERE id = ?",
+                    (state, json.dumps(result), data, post['id']))
+        return len(posts)
+
+    def _download(self, post):
+        """Download a post, returns (state, result or exception)."""
+        try:
+            return 'done', self.downloader.download(post, self.dirname)
+        except PybooruError as error:
+            return 'failed', error
+
+    def _pending(self):
+        """Get the posts left pending by a previous run."""
+        return [json.loads(row[0]) for row in self._db.execute(
+            "SELECT post FROM posts WHERE state = 'pending' ORDER BY id DESC")]
+
+    def _state(self, key):
+        row = self._db.execute("SELECT value FROM job WHERE key = ?",
+                               (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO job (key, value) "
+                         "VALUES (?, ?)", (key, str(value)))
+
+
+def _connect(path):
+    """Open a SQLite database shared by several processes."""
+    return sqlite3.connect(path, timeout=60, isolation_level=None)
+
+
+class SharedRateLimiter(object):
+    """Rate limiter shared by processes through a SQLite file.
+
+    The time of the next free request slot is stored in the file, every call
+    to wait() takes a slot in a write transaction and sleeps until it. Set it
+    as the 'rate_limiter' attribute of a client.
+
+    Attributes:
+        path (str): Path of the SQLite file.
+        rate (float): Maximum requests per second for all the processes.
+    """
+
+    def __init__(self, path, rate):
+        """Initialize SharedRateLimiter.
+
+        Keyword arguments:
+            path (str): Path of the SQLite file.
+            rate (float): Maximum requests per second.
+        """
+        self.path = path
+        self.rate = float(rate)
+        self._db = None
+
+    def __getstate__(self):
+        """Pickle support, every process opens its own connection."""
+        state = self.__dict__.copy()
+        state['_db'] = None
+        return state
+
+    def wait(self):
+        """Block until a request slot is available."""
+        if self._db is None:
+            self._db = _connect(self.path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS rate_limit "
+                             "(id INTEGER PRIMARY KEY, next REAL)")
+
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT next FROM rate_limit WHERE id = 0").fetchone()
+            now = time.time()
+            slot = max(now, row[0]) if row else now
+            self._db.execute("INSERT OR REPLACE INTO rate_limit (id, next) "
+                             "VALUES (0, ?)", (slot + 1 / self.rate,))
+        finally:
+            self._db.execute("COMMIT")
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _crawl_worker(crawler):
+    """Process pool entry point, see ShardedCrawler.work()."""
+    return crawler.work()
+
+
+class ShardedCrawler(object):
+    """Crawl of a tag query split in id ranges, run by a process pool.
+
+    The id space is split in shards ('id:N..M' metatag). Workers take shards
+    through leases stored in a SQLite file, so a shard is crawled by one
+    worker at a time and leases of dead workers expire and are taken again.
+    Every shard is a CrawlJob with its own checkpoint, so an interrupted
+    crawl can be resumed. A SharedRateLimiter keeps all the workers under the
+    same request rate.
+
+    Attributes:
+        client (_Pybooru): Danbooru or Moebooru client (copied to every
+                           process).
+        tags (str): The tags to search for.
+        dirname (str): Directory for the lease file and the checkpoints.
+        shard_size (int): Number of post ids per shard.
+        rate (float): Maximum API requests per second of all the workers.
+        lease_timeout (int): Seconds before the lease of a silent worker
+                             expires.
+        limit (int): Posts per page.
+        downloader (Downloader): Optional downloader for the posts.
+        callback (function): Optional function called with every page of
+                             posts (must be picklable).
+        tuner (AutoTuner): Optional auto-tuner (every process tunes its own
+                           copy).
+    """
+
+    def __init__(self, client, tags='', dirname='crawl', shard_size=100000,
+                 rate=2, lease_timeout=600, limit=100, downloader=None,
+                 callback=None, tuner=None):
+        """Initialize ShardedCrawler.
+
+        Keyword arguments:
+            client (_Pybooru): Danbooru or Moebooru client.
+            tags (str): The tags to search for.
+            dirname (str): Directory for the lease file and the checkpoints.
+            shard_size (int): Number of post ids per shard (Default: 100000).
+            rate (float): Maximum API requests per second (Default: 2).
+            lease_timeout (int): Seconds before a lease expires
+                                 (Default: 600).
+            limit (int): Posts per page (Default: 100).
+            downloader (Downloader): Downloader for the posts.
+            callback (function): Function called with every page of posts.
+            tuner (AutoTuner): Auto-tuner of the page size and the download
+                               workers (Default: None).
+        """
+        self.client = client
+        self.tags = tags
+        self.dirname = dirname
+        self.shard_size = shard_size
+        self.rate = rate
+        self.lease_timeout = lease_timeout
+        self.limit = limit
+        self.downloader = downloader
+        self.callback = callback
+        self.tuner = tuner
+        self.lease_path = os.path.join(dirname, 'leases.sqlite')
+
+    def partition(self, max_id=None):
+        """Create the shards of the query (only the first time).
+
+        Parameters:
+            max_id (int): Highest post id to crawl (Default: newest post of
+                          the query).
+
+        Returns:
+            Number of shards (int).
+        """
+        if not os.path.isdir(self.dirname):
+            os.makedirs(self.dirname)
+
+        db = _connect(self.lease_path)
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS shards (low INTEGER "
+                       "PRIMARY KEY, high INTEGER, state TEXT, owner TEXT, "
+                       "expires REAL)")
+            count = db.execute("SELECT COUNT(*) FROM shards").fetchone()[0]
+            if count:
+                return count
+
+            if max_id is None:
+                params = {'limit': 1}
+                if self.tags:
+                    params['tags'] = self.tags
+                newest = self.client.post_list(**params)
+                max_id = newest[0]['id'] if newest else 0
+
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany(
+                "INSERT OR IGNORE INTO shards (low, high, state) "
+                "VALUES (?, ?, 'free')",
+                [(low, min(low + self.shard_size - 1, max_id))
+                 for low in range(1, max_id + 1, self.shard_size)])
+            db.execute("COMMIT")
+            return db.execute("SELECT COUNT(*) FROM shards").fetchone()[0]
+        finally:
+            db.close()
+
+    def run(self, processes=None, max_id=None):
+        """Partition the query and crawl all the shards.
+
+        Parameters:
+            processes (int): Number of worker processes (Default: number of
+                             CPUs).
+            max_id (int): Highest post id to crawl.
+
+        Returns:
+            Merged post count by state of all the shards (dict).
+        """
+        self.partition(max_id)
+        processes = processes or multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes)
+        try:
+            pool.map(_crawl_worker, [self] * processes)
+        finally:
+            pool.close()
+            pool.join()
+        return self.stats()
+
+    def work(self):
+        """Crawl shards until there are no free shards left.
+
+        Returns:
+            Number of shards crawled by this worker (int).
+        """
+        owner = "{0}:{1}".format(os.getpid(), id(self))
+        self.client.rate_limiter = SharedRateLimiter(
+            os.path.join(self.dirname, 'rate.sqlite'), self.rate)
+
+        db = _connect(self.lease_path)
+        crawled = 0
+        try:
+            shard = self._lease(db, owner)
+            while shard is not None:
+                job = self.job(*shard)
+                try:
+                    job.run(self.callback, progress=functools.partial(
+                        self._renew, db, shard[0], owner))
+                finally:
+                    job.close()
+                db.execute("UPDATE shards SET state = 'done' WHERE low = ? "
+                           "AND owner = ?", (shard[0], owner))
+                crawled += 1
+                shard = self._lease(db, owner)
+        finally:
+            db.close()
+        return crawled
+
+    def job(self, low, high):
+        """Get the CrawlJob of the shard [low, high]."""
+        tags = "{0} id:{1}..{2}".format(self.tags, low, high).strip()
+        checkpoint = os.path.join(
+            self.dirname, "shard-{0}-{1}.sqlite".format(low, high))
+        return CrawlJob(self.client, tags, checkpoint, self.limit,
+                        self.downloader, tuner=self.tuner)
+
+    def stats(self):
+        """Merge the post count by state of all the shards.
+
+        Returns:
+            Dict {state: count}.
+        """
+        db = _connect(self.lease_path)
+        try:
+            shards = db.execute("SELECT low, high FROM shards").fetchall()
+        finally:
+            db.close()
+
+        merged = {}
+        for low, high in shards:
+            checkpoint = os.path.join(
+                self.dirname, "shard-{0}-{1}.sqlite".format(low, high))
+            if not os.path.exists(checkpoint):
+                continue
+            job = self.job(low, high)
+            try:
+                for state, count in job.stats().items():
+                    merged[state] = merged.get(state, 0) + count
+            finally:
+                job.close()
+        return merged
+
+    def _lease(self, db, owner):
+        """Take a free or expired shard, returns (low, high) or None."""
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT low, high FROM shards WHERE state = 'free' OR "
+                "(state = 'leased' AND expires < ?) ORDER BY low DESC LIMIT 1",
+                (now,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE shards SET state = 'leased', owner = ?, "
+                           "expires = ? WHERE low = ?",
+                           (owner, now + self.lease_timeout, row[0]))
+        finally:
+            db.execute("COMMIT")
+        return row
+
+    def _renew(self, db, low, owner):
+        """Extend the lease of a shard.
+
+        Raises:
+            PybooruError: When the lease expired and another worker took it.
+        """
+        cursor = db.execute("UPDATE shards SET expires = ? WHERE low = ? AND "
+                            "owner = ? AND state = 'leased'",
+                            (time.time() + self.lease_timeout, low, owner))
+        if cursor.rowcount != 1:
+            raise PybooruError("Lease of shard {0} lost".format(low))
@@ -13,6 +13,29 @@ Classes:
 from .pybooru import _Pybooru
 from .api_danbooru import DanbooruApi_Mixin
 from .exceptions import PybooruError
+from .mirror import MirrorSync
+
+
+def _projection(only):
+    """Build the value of the 'only' parameter from a list of attributes.
+
+    Parameters:
+        only (str or list): Attribute names, or dicts {attribute: list of
+                            nested attributes}.
+
+    Returns:
+        Comma separated attributes (str).
+    """
+    if isinstance(only, (str, type(u''))):
+        return only
+    fields = []
+    for field in only:
+        if isinstance(field, dict):
+            fields.extend("{0}[{1}]".format(name, _projection(nested))
+                          for name, nested in sorted(field.items()))
+        else:
+            fields.append(field)
+    return ','.join(fields)
 
 
 class Danbooru(_Pybooru, DanbooruApi_Mixin):
@@ -53,7 +76,7 @@ class Danbooru(_Pybooru, DanbooruApi_Mixin):
         self.api_key = api_key
 
     def _get(self, api_call, params=None, method='GET', auth=False,
-             file_=None):
+             file_=None, only=None, endpoint=None):
         """Function to preapre API call.
 
         Parameters:
@@ -62,10 +85,20 @@ class Danbooru(_Pybooru, DanbooruApi_Mixin):
             method (str): (Defauld: GET) HTTP method (GET, POST, PUT or
                            DELETE)
             file_ (file): File to upload (only uploads).
+            only (str or list): Attributes to return ('only' parameter).
+                                Nested attributes are dicts, e.g.
+                                ['id', {'uploader': ['id', 'name']}] is
+                                'id,uploader[id,name]'.
+            endpoint (Endpoint): Endpoint of the call (metadata).
 
         Raise:
             PybooruError: When 'username' or 'api_key' are not set.
         """
+        if only is not None or params and params.get('only') is not None:
+            params = dict(params or {})
+            params['only'] = _projection(only if only is not None
+                                         else params['only'])
+
         url = "{0}/{1}".format(self.site_url, api_call)
 
         if method == 'GET':
@@ -83,4 +116,20 @@ class Danbooru(_Pybooru, DanbooruApi_Mixin):
                                    "Danbooru are required.")
 
         # Do call
-        return self._request(url, api_call, request_args, method)
+        return self._request(url, api_call, request_args, method, endpoint)
+
+    def mirror_sync(self, mirror, limit=200, new_posts=True):
+        """Bring a local post mirror up to date.
+
+        Fetches the posts uploaded since the last sync and applies the post
+        versions created since the last sync (See: pybooru.mirror).
+
+        Parameters:
+            mirror (PostMirror): The local mirror.
+            limit (int): Records per request (Default: 200).
+            new_posts (bool): Mirror new uploads (Default: True).
+
+        Returns:
+            Dict with the number of new posts, updated posts and requests.
+        """
+        return MirrorSync(self, mirror, limit, new_posts).sync()
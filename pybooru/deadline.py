@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.deadline
+
+This module contains deadlines and cooperative cancellation of API calls.
+
+A deadline is opened with client.deadline() and covers every request made
+inside the 'with' block: single calls, retries and paginated iterators
+(iter_records(), CrawlJob.run()...) share the same time budget. Deadlines
+are stored per thread, the work the client hands to other threads (the
+download pool of CrawlJob, hedged requests, cache refreshes) takes the
+deadline of the thread that submitted it. The connect and read timeouts of every request are cut to the time
+left, and no request is sent after the deadline expires or after cancel() is
+called (e.g. from another thread).
+
+Nested deadlines can only shorten the enclosing one, cancelling a deadline
+also cancels the deadlines nested in it.
+
+Classes:
+    Deadline -- Time budget and cancellation flag of a group of calls.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import threading
+import time
+
+# pybooru imports
+from .exceptions import (PybooruCancelledError, PybooruTimeoutError)
+
+
+class Deadline(object):
+    """Time budget and cancellation flag of a group of calls.
+
+    Attributes:
+        expires (float): Time when the deadline expires (None: never).
+    """
+
+    def __init__(self, seconds=None, parent=None):
+        """Initialize Deadline.
+
+        Keyword arguments:
+            seconds (float): Time budget (Default: None, only cancellation).
+            parent (Deadline): Enclosing deadline.
+        """
+        self.expires = None if seconds is None else time.time() + seconds
+        if parent is not None and parent.expires is not None:
+            if self.expires is None or parent.expires < self.expires:
+                self.expires = parent.expires
+        self.parent = parent
+        self._event = threading.Event()
+        self._children = []
+        if parent is not None:
+            parent._children.append(self)
+            if parent.cancelled:
+                self._event.set()
+
+    @property
+    def cancelled(self):
+        """True when cancel() was called."""
+        return self._event.is_set()
+
+    @property
+    def expired(self):
+        """True when the time budget is exhausted."""
+        return self.expires is not None and time.time() >= self.expires
+
+    def cancel(self):
+        """Cancel the calls of the deadline (and of the nested ones)."""
+        self._event.set()
+        for child in list(self._children):
+            child.cancel()
+
+    def remaining(self):
+        """Seconds left (None: no time limit)."""
+        if self.expires is None:
+            return None
+        return max(self.expires - time.time(), 0)
+
+    def check(self):
+        """Raise if the deadline is cancelled or expired.
+
+        Raises:
+            PybooruCancelledError: When it's cancelled.
+            PybooruTimeoutError: When it's expired.
+        """
+        if self.cancelled:
+            raise PybooruCancelledError("Cancelled")
+        if self.expired:
+            raise PybooruTimeoutError("Deadline exceeded")
+
+    def timeout(self, timeout):
+        """Cut a requests timeout to the time left.
+
+        Parameters:
+            timeout (float or tuple): Timeout or (connect, read) timeouts.
+
+        Returns:
+            The timeout for the next request.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if value is None else min(value, remaining)
+                         for value in timeout)
+        return min(timeout, remaining)
+
+    def sleep(self, seconds):
+        """Sleep up to 'seconds', wakes up when cancelled.
+
+        Raises:
+            PybooruCancelledError: When it's cancelled.
+            PybooruTimeoutError: When the deadline expires before 'seconds'.
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            self._event.wait(remaining)
+            self.check()
+            raise PybooruTimeoutError("Deadline exceeded")
+        self._event.wait(seconds)
+        self.check()
+
+    def _close(self):
+        """Detach from the enclosing deadline."""
+        if self.parent is not None:
+            self.parent._children.remove(self)
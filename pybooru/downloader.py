@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.downloader
+
+This module contains the Pybooru downloader, it selects the image variant of
+a post (preview, sample, original...) and stores it in disk.
+
+Classes:
+    VariantPolicy -- Chooses which image variant of a post is downloaded.
+    Downloader -- Downloads posts of a Danbooru or Moebooru client.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import os
+import posixpath
+import socket
+import tempfile
+import threading
+import requests
+from requests.packages.urllib3 import exceptions as urllib3_exceptions
+
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+
+# pybooru imports
+from .moebooru import Moebooru
+from .exceptions import (PybooruError, PybooruHTTPError, PybooruTimeoutError)
+from .resources import IMAGE_VARIANTS
+
+
+# Errors of a download (checked in this order): timeouts, then connection
+# and stream errors of requests, urllib3 (raw reads), http.client
+# (incomplete bodies) and sockets
+_TIMEOUT_ERRORS = (requests.exceptions.Timeout,
+                   urllib3_exceptions.TimeoutError, socket.timeout)
+_STREAM_ERRORS = (requests.exceptions.RequestException,
+                  urllib3_exceptions.HTTPError, httplib.HTTPException,
+                  socket.error)
+
+
+def _preallocate(file_, length):
+    """Reserve length bytes in disk for file_, to avoid fragmentation."""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(file_.fileno(), 0, length)
+            return
+        except OSError:
+            # Not supported by the file system
+            pass
+    file_.truncate(length)
+
+
+class VariantPolicy(object):
+    """Chooses which image variant of a post is downloaded.
+
+    By default the smallest variant that meets the resolution target and the
+    'max_bytes' limit is preferred. The remaining variants are kept as
+    fallbacks (largest first), so a missing or restricted URL doesn't make
+    the download fail.
+
+    Attributes:
+        min_width (int): Minimum width of the image.
+        min_height (int): Minimum height of the image.
+        max_bytes (int): Maximum file size in bytes.
+        order (tuple): Names of the variants to consider, in preference order.
+        strict (bool): Don't fall back to variants below the resolution target.
+    """
+
+    def __init__(self, min_width=None, min_height=None, max_bytes=None,
+                 order=None, strict=False):
+        """Initialize VariantPolicy.
+
+        Keyword arguments:
+            min_width (int): Minimum width of the image.
+            min_height (int): Minimum height of the image.
+            max_bytes (int): Maximum file size in bytes.
+            order (tuple): Names of the variants to consider, in preference
+                           order (Default: smallest to largest).
+            strict (bool): Don't fall back to variants below the resolution
+                           target (Default: False).
+        """
+        self.min_width = min_width
+        self.min_height = min_height
+        self.max_bytes = max_bytes
+        self.order = order
+        self.strict = strict
+
+    def fits(self, variant):
+        """Check if a variant is under the 'max_bytes' limit.
+
+        Variants with unknown size are accepted, the downloader checks their
+        Content-Length before writing them and counts their bytes while
+        copying them.
+
+        Parameters:
+            variant (dict): Variant returned by Downloader.variants().
+        """
+        if self.max_bytes is None or variant['size'] is None:
+            return True
+        return variant['size'] <= self.max_bytes
+
+    def meets(self, variant):
+        """Check if a variant meets the resolution target.
+
+        Parameters:
+            variant (dict): Variant returned by Downloader.variants().
+        """
+        for target, value in ((self.min_width, variant['width']),
+                              (self.min_height, variant['height'])):
+            if target is not None and (value is None or value < target):
+                return False
+        return True
+
+    def rank(self, variants):
+        """Sort variants in download order.
+
+        Parameters:
+            variants (list): Variants returned by Downloader.variants(),
+                             from smallest to largest.
+
+        Returns:
+            List of variants, preferred variant first.
+        """
+        if self.order is not None:
+            by_name = dict((variant['name'], variant) for variant in variants)
+            variants = [by_name[name] for name in self.order
+                        if name in by_name]
+
+        variants = [variant for variant in variants if self.fits(variant)]
+        preferred = [variant for variant in variants if self.meets(variant)]
+        if self.strict:
+            return preferred
+
+        fallback = [variant for variant in reversed(variants)
+                    if variant not in preferred]
+        return preferred + fallback
+
+
+class Downloader(object):
+    """Downloads posts of a Danbooru or Moebooru client.
+
+    The downloader reuses the HTTP session of the client and applies the same
+    variant policy to the posts of both APIs. Response bodies are copied to
+    disk through a preallocated buffer (one per thread) with readinto(), and
+    files are preallocated when the server sends the Content-Length.
+
+    Attributes:
+        client (_Pybooru): Danbooru or Moebooru client.
+        policy (VariantPolicy): Policy used to choose the image variant.
+        chunk_size (int): Size in bytes of the chunks read from the network.
+        archive (ShardWriter): When it's set, files are packed into the
+                               archive shards instead of written to disk one
+                               by one.
+    """
+
+    # HTTP status codes that make the downloader try the next variant
+    FALLBACK_STATUS = (401, 403, 404, 410)
+
+    # Files up to this size are buffered in memory before being archived
+    SPOOL_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, client, policy=None, chunk_size=64 * 1024,
+                 archive=None):
+        """Initialize Downloader.
+
+        Keyword arguments:
+            client (_Pybooru): Danbooru or Moebooru client.
+            policy (VariantPolicy): Policy used to choose the image variant
+                                    (Default: the original image).
+            chunk_size (int): Size in bytes of the chunks read from the
+                              network.
+            archive (ShardWriter): Shard archive to pack the files into.
+        """
+        self.client = client
+        self.policy = policy or VariantPolicy(order=('original',))
+        self.chunk_size = chunk_size
+        self.archive = archive
+        self._local = threading.local()
+
+    def __getstate__(self):
+        """Pickle support (copy buffers aren't shared between processes)."""
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def api_name(self):
+        """Name of the API of the client ('danbooru' or 'moebooru')."""
+        if isinstance(self.client, Moebooru):
+            return 'moebooru'
+        return 'danbooru'
+
+    def variants(self, post):
+        """Get the image variants available for a post.
+
+        Parameters:
+            post (dict): A post returned by the API.
+
+        Returns:
+            List of dicts (name, url, width, height, size), from smallest to
+            largest.
+        """
+        table = IMAGE_VARIANTS[self.api_name]
+        original = table[-1]
+        width = post.get(original[2])
+        height = post.get(original[3])
+
+        variants = []
+        for name, url_key, width_key, height_key, size_key, box in table:
+            url = post.get(url_key)
+            if not url:
+                # Missing or restricted (e.g.: Danbooru hides file_url)
+                continue
+
+            variant = {'name': name, 'url': self._absolute_url(url),
+                       'width': post.get(width_key),
+                       'height': post.get(height_key),
+                       'size': post.get(size_key)}
+            if box is not None and width and height:
+                scale = min([1.0] + [float(limit) / value for limit, value
+                                     in zip(box, (width, height)) if limit])
+                variant['width'] = int(width * scale)
+                variant['height'] = int(height * scale)
+                if scale == 1.0:
+                    variant['size'] = post.get(original[4])
+            variants.append(variant)
+        return variants
+
+    def select(self, post):
+        """Get the variant that the policy prefers for a post.
+
+        Parameters:
+            post (dict): A post returned by the API.
+
+        Returns:
+            A variant (dict) or None.
+        """
+        ranked = self.policy.rank(self.variants(post))
+        return ranked[0] if ranked else None
+
+    def download(self, post, dirname='.'):
+        """Download a post following the variant policy.
+
+        Parameters:
+            post (dict): A post returned by the API.
+            dirname (str): Directory where the file is saved (ignored when
+                           'archive' is set).
+
+        Returns:
+            Path of the downloaded file (str) or the archive index entry
+            (dict) when 'archive' is set.
+
+        Raises:
+            PybooruError: When no variant of the post can be downloaded.
+            PybooruHTTPError: When the server returns an unexpected error.
+        """
+        for variant in self.policy.rank(self.variants(post)):
+            result = self._fetch(variant['url'], self._filename(post, variant),
+                                 post, dirname)
+            if result is not None:
+                return result
+        raise PybooruError("No downloadable variant for post: {0}".format(
+            post.get('id')))
+
+    def download_all(self, posts, dirname='.'):
+        """Download a list of posts.
+
+        Parameters:
+            posts (list): Posts returned by the API.
+            dirname (str): Directory where the files are saved.
+
+        Returns:
+            List of paths of the downloaded files (or archive entries).
+        """
+        return [self.download(post, dirname) for post in posts]
+
+    def _absolute_url(self, url):
+        """Prefix site url to relative urls (old Danbooru versions)."""
+        if url.startswith('//'):
+            return "https:{0}".format(url)
+        if url.startswith('/'):
+            return "{0}{1}".format(self.client.site_url, url)
+        return url
+
+    def _filename(self, post, variant):
+        """Build the file name of a variant: <post id>_<variant>.<ext>"""
+        path = variant['url'].split('?', 1)[0]
+        extension = posixpath.splitext(path)[1]
+        return "{0}_{1}{2}".format(post.get('id'), variant['name'], extension)
+
+    def _buffer(self):
+        """Get the copy buffer of the current thread."""
+        view = getattr(self._local, 'view', None)
+        if view is None or len(view) != self.chunk_size:
+            view = self._local.view = memoryview(bytearray(self.chunk_size))
+        return view
+
+    def _write(self, response, file_, max_bytes=None):
+        """Copy the response body to file_.
+
+        Identity encoded bodies are read into the buffer of the thread with
+        the readinto() of the urllib3 response, compressed ones are decoded
+        by iter_content().
+
+        Parameters:
+            max_bytes (int): Stop when the body is bigger (Default: None).
+
+        Returns:
+            Number of bytes written (int), None when the body is bigger than
+            max_bytes.
+        """
+        written = 0
+        if response.headers.get('content-encoding', 'identity') != 'identity':
+            for chunk in response.iter_content(self.chunk_size):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    return None
+                file_.write(chunk)
+            return written
+
+        view = self._buffer()
+        readinto = response.raw.readinto
+        count = readinto(view)
+        while count:
+            written += count
+            if max_bytes is not None and written > max_bytes:
+                return None
+            file_.write(view[:count])
+            count = readinto(view)
+        return written
+
+    def _fetch(self, url, name, post, dirname):
+        """Download url to the archive or to a file in dirname.
+
+        Files are written to a temporary '.part' file and renamed when they
+        are complete, the part file is removed when the download fails.
+
+        Returns:
+            Path or archive entry, None when the variant is restricted,
+            missing or bigger than 'max_bytes'.
+
+        Raises:
+            PybooruTimeoutError: When the download times out.
+            PybooruHTTPError: When the server returns an unexpected error.
+            PybooruError: When the download is incomplete or the connection
+                          fails.
+        """
+        try:
+            response = self.client.client.get(
+                url, stream=True, timeout=self.client._request_timeout())
+        except _TIMEOUT_ERRORS:
+            raise PybooruTimeoutError("Timeout! url: {0}".format(url))
+        except _STREAM_ERRORS as error:
+            raise PybooruError("Download error: {0}, url: {1}".format(
+                error, url))
+        try:
+            return self._save(response, url, name, post, dirname)
+        except _TIMEOUT_ERRORS:
+            raise PybooruTimeoutError("Timeout! url: {0}".format(url))
+        except _STREAM_ERRORS as error:
+            raise PybooruError("Download error: {0}, url: {1}".format(
+                error, url))
+        finally:
+            response.close()
+
+    def _save(self, response, url, name, post, dirname):
+        """Write a response to the archive or to a file (see _fetch())."""
+        if response.status_code in self.FALLBACK_STATUS:
+            return None
+        if response.status_code != 200:
+            raise PybooruHTTPError("In _fetch", response.status_code, url)
+
+        length = response.headers.get('content-length')
+        max_bytes = self.policy.max_bytes
+        if max_bytes is not None and length and int(length) > max_bytes:
+            return None
+
+        if self.archive is not None:
+            with tempfile.SpooledTemporaryFile(self.SPOOL_SIZE) as spool:
+                size = self._write(response, spool, max_bytes)
+                if size is None:
+                    return None
+                spool.seek(0)
+                return self.archive.add(name, spool, size, post)
+
+        path = os.path.join(dirname, name)
+        part = "{0}.part".format(path)
+        try:
+            with open(part, 'wb') as file_:
+                identity = response.headers.get(
+                    'content-encoding', 'identity') == 'identity'
+                if length and identity:
+                    _preallocate(file_, int(length))
+                written = self._write(response, file_, max_bytes)
+            if written is None:
+                return None
+            if length and identity and written != int(length):
+                raise PybooruError("Incomplete download: {0} of {1} bytes, "
+                                   "url: {2}".format(written, length, url))
+            os.rename(part, path)
+            return path
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
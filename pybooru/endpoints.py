@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.endpoints
+
+This module contains the declarative registry of the API endpoints.
+
+Every API function of the mixins is declared with the endpoint decorator:
+the path template, HTTP method, authentication and the metadata of the
+endpoint (idempotency, pagination style, cacheability and resource type).
+The function body only returns the parameters of the call, the decorator
+builds the URL (from a template compiled once) and sends the request.
+
+    @endpoint('posts/{post_id}.json', 'PUT', auth=True)
+    def post_update(self, post_id, rating=None):
+        return {'post[rating]': rating}
+
+Template fields are arguments of the function. The 'only' argument is
+passed to _get(), the 'file_' argument (a path) is opened and sent as the
+'upload' form field of the endpoint. The endpoint of a function is its
+'endpoint' attribute (client.post_list.endpoint), registry() returns all
+the endpoints of a client. Caching, hedging and pagination read their
+metadata instead of guessing from the HTTP method.
+
+Classes:
+    Endpoint -- Metadata and URL template of an API endpoint.
+
+Functions:
+    endpoint -- Decorator that declares an API function.
+    registry -- Get the endpoints of a client or mixin.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import functools
+import inspect
+import string
+
+# pybooru imports
+from .exceptions import PybooruError
+
+
+# Pagination styles
+CURSOR = 'cursor'  # Danbooru: page=b<id> / a<id> or page number
+PAGE = 'page'  # Moebooru: page number
+PAGINATIONS = (CURSOR, PAGE)
+
+try:
+    _getargspec = inspect.getfullargspec
+except AttributeError:
+    _getargspec = inspect.getargspec
+
+
+class Endpoint(object):
+    """Metadata and URL template of an API endpoint.
+
+    Attributes:
+        name (str): Name of the API function.
+        path (str): Path template, e.g. 'posts/{post_id}.json'.
+        method (str): HTTP method.
+        auth (bool): Requires authentication.
+        idempotent (bool): Can be sent twice (retries, hedging).
+        pagination (str): 'cursor', 'page' or None (not paginated).
+        cacheable (bool): Responses can be cached.
+        resource (str): Resource type, e.g. 'posts'.
+        upload (str): Form field of the uploaded file ('file_' argument).
+        fields (tuple): Fields of the path template.
+    """
+
+    __slots__ = ('name', 'path', 'method', 'auth', 'idempotent',
+                 'pagination', 'cacheable', 'resource', 'upload', 'fields',
+                 '_template')
+
+    def __init__(self, name, path, method='GET', auth=False, idempotent=None,
+                 pagination=None, cacheable=None, resource=None,
+                 upload=None):
+        """Initialize Endpoint.
+
+        Keyword arguments:
+            name (str): Name of the API function.
+            path (str): Path template.
+            method (str): HTTP method (Default: GET).
+            auth (bool): Requires authentication (Default: False).
+            idempotent (bool): Can be sent twice (Default: True for GET).
+            pagination (str): 'cursor', 'page' or None (Default: None).
+            cacheable (bool): Responses can be cached (Default: True for
+                              GET).
+            resource (str): Resource type (Default: first part of the path).
+            upload (str): Form field of the uploaded file (Default: None).
+
+        Raises:
+            PybooruError: When pagination is invalid.
+        """
+        if pagination is not None and pagination not in PAGINATIONS:
+            raise PybooruError("Invalid pagination: {0}".format(pagination))
+        self.name = name
+        self.path = path
+        self.method = method
+        self.auth = auth
+        self.idempotent = method == 'GET' if idempotent is None else idempotent
+        self.pagination = pagination
+        self.cacheable = method == 'GET' if cacheable is None else cacheable
+        self.resource = resource or path.split('/')[0].split('.')[0]
+        self.upload = upload
+
+        # Compile the template: 'posts/{post_id}.json' -> 'posts/%s.json'
+        template = []
+        fields = []
+        for literal, field, _, _ in string.Formatter().parse(path):
+            template.append(literal.replace('%', '%%'))
+            if field is not None:
+                template.append('%s')
+                fields.append(field)
+        self.fields = tuple(fields)
+        self._template = ''.join(template)
+
+    def __repr__(self):
+        return "Endpoint({0!r}, {1!r}, {2!r})".format(self.name, self.path,
+                                                      self.method)
+
+    def url(self, values):
+        """Get the API call of the endpoint.
+
+        Parameters:
+            values (dict): Values of the template fields.
+
+        Returns:
+            The path with the fields replaced (str).
+        """
+        if not self.fields:
+            return self.path
+        return self._template % tuple(values[field] for field in self.fields)
+
+
+def endpoint(path, method='GET', auth=False, parse=None, **metadata):
+    """Decorator that declares an API function.
+
+    The decorated function returns the parameters of the call (or None).
+
+    Parameters:
+        path (str): Path template, fields are arguments of the function.
+        method (str): HTTP method (Default: GET).
+        auth (bool): Requires authentication (Default: False).
+        parse (function): Converts the response (Default: None).
+        **metadata: idempotent, pagination, cacheable, resource and upload
+                    (see: Endpoint).
+    """
+    def decorator(function):
+        spec = Endpoint(function.__name__, path, method, auth, **metadata)
+        argspec = _getargspec(function)
+        names = argspec.args[1:]
+        varkw = argspec[2]  # **kwargs name (varkw / keywords)
+        only = 'only' in names
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            params = function(self, *args, **kwargs)
+            # Bind like the call does, with the defaults of the function
+            values = inspect.getcallargs(function, self, *args, **kwargs)
+            if varkw is not None:
+                values.update(values.pop(varkw))
+            options = {'endpoint': spec}
+            if spec.auth:
+                options['auth'] = True
+            if only:
+                options['only'] = values.get('only')
+            upload = None
+            if spec.upload is not None and values.get('file_') is not None:
+                upload = open(values['file_'], 'rb')
+                options['file_'] = {spec.upload: upload}
+            try:
+                response = self._get(spec.url(values), params, spec.method,
+                                     **options)
+            finally:
+                if upload is not None:
+                    upload.close()
+            return response if parse is None else parse(response)
+
+        wrapper.endpoint = spec
+        return wrapper
+    return decorator
+
+
+def registry(obj):
+    """Get the endpoints of a client or mixin.
+
+    Parameters:
+        obj (object): Client (or class) with API functions.
+
+    Returns:
+        Dict: function name -> Endpoint.
+    """
+    cls = obj if isinstance(obj, type) else type(obj)
+    endpoints = {}
+    for name in dir(cls):
+        spec = getattr(getattr(cls, name, None), 'endpoint', None)
+        if isinstance(spec, Endpoint):
+            endpoints[name] = spec
+    return endpoints
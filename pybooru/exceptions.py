@@ -8,6 +8,9 @@ Classes:
     * PybooruError -- Main Pybooru exception class.
     * PybooruHTTPError -- Manages HTTP status errors.
     * PybooruAPIError -- Manages all API errors.
+    * PybooruTimeoutError -- Request timeout or expired deadline.
+    * PybooruCancelledError -- Cancelled calls.
+    * PybooruCircuitOpenError -- Requests refused by an open circuit.
 """
 
 # __furute__ imports
@@ -34,9 +37,11 @@ class PybooruHTTPError(PybooruError):
             url (str): The URL.
         """
         super(PybooruHTTPError, self).__init__(msg, http_code, url)
+        self.http_code = http_code
+        self.url = url
         self._msg = "{0}: {1} - {2}, {3} - URL: {4}".format(
-            msg, http_code, HTTP_STATUS_CODE[http_code][0],
-            HTTP_STATUS_CODE[http_code][1], url)
+            msg, http_code, *HTTP_STATUS_CODE.get(
+                http_code, ('Undefined', 'undefined')) + (url,))
 
     def __str__(self):
         """Print exception."""
@@ -46,3 +51,33 @@ class PybooruHTTPError(PybooruError):
 class PybooruAPIError(PybooruError):
     """Class to catch all API errors."""
     pass
+
+
+class PybooruTimeoutError(PybooruError):
+    """Class to catch request timeouts and expired deadlines."""
+    pass
+
+
+class PybooruCancelledError(PybooruError):
+    """Class to catch calls cancelled through a deadline."""
+    pass
+
+
+class PybooruCircuitOpenError(PybooruError):
+    """Class to catch requests refused by an open circuit breaker."""
+
+    def __init__(self, circuit, retry_after):
+        """Initialize PybooruCircuitOpenError.
+
+        Keyword arguments:
+            circuit (str): The circuit key (host or host/endpoint).
+            retry_after (float): Seconds before the circuit is probed.
+        """
+        super(PybooruCircuitOpenError, self).__init__(circuit, retry_after)
+        self.circuit = circuit
+        self.retry_after = retry_after
+
+    def __str__(self):
+        """Print exception."""
+        return "Circuit open: {0} (retry after {1:.1f}s)".format(
+            self.circuit, self.retry_after)
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.export
+
+This module contains streaming exporters for the results of paginated list
+calls (post_list(), comment_list(), note_list(), wiki_list()...).
+
+Records are read page by page and written in batches, only one page and one
+batch are held in memory. Danbooru lists are paginated with the 'b<id>'
+cursor (stable while new records are created), Moebooru lists with page
+numbers (the pagination of the endpoint, see: pybooru.endpoints).
+
+Formats:
+    .jsonl -- One JSON record per line.
+    .jsonl.gz -- gzip-compressed JSONL.
+    .csv -- CSV, nested values are encoded as JSON.
+    .parquet -- Parquet, requires pyarrow (pip install Pybooru[parquet]).
+
+Classes:
+    JSONLExporter -- Writes records to a (gzip-compressed) JSONL file.
+    CSVExporter -- Writes records to a CSV file.
+    ParquetExporter -- Writes records to a Parquet file.
+
+Functions:
+    iter_pages -- Iterate over the pages of a list call.
+    iter_records -- Iterate over the records of a list call.
+    export -- Export the records of a list call to a file.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import csv
+import gzip
+import io
+import json
+import sys
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# pybooru imports
+from .moebooru import Moebooru
+from .endpoints import CURSOR
+from .exceptions import PybooruError
+
+
+def iter_pages(function, limit=100, max_pages=None, **params):
+    """Iterate over the pages of a list call.
+
+    Parameters:
+        function (method): List method of a client, e.g. client.post_list.
+        limit (int): Records per page (Default: 100).
+        max_pages (int): Maximum number of pages (Default: all).
+        **params: Other parameters of the list call (tags, post_id...).
+
+    Yields:
+        Lists of records.
+    """
+    spec = getattr(function, 'endpoint', None)
+    if spec is not None and spec.pagination is not None:
+        cursor = spec.pagination == CURSOR
+    else:
+        cursor = not isinstance(getattr(function, '__self__', None), Moebooru)
+    page = None if cursor else 1
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        records = function(limit=limit, page=page, **params)
+        pages += 1
+        if not records:
+            break
+        yield records
+        if cursor:
+            page = "b{0}".format(min(record['id'] for record in records))
+        else:
+            page += 1
+
+
+def iter_records(function, limit=100, max_pages=None, **params):
+    """Iterate over the records of a list call (see iter_pages())."""
+    for records in iter_pages(function, limit, max_pages, **params):
+        for record in records:
+            yield record
+
+
+# Python 2 csv writes UTF-8 byte strings to a binary file
+_PY2 = sys.version_info[0] == 2
+
+
+def _flat(value):
+    """Encode nested values (lists, dicts) as JSON."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _cell(value):
+    """Encode a CSV value (or column name) for the csv module."""
+    value = _flat(value)
+    if _PY2 and isinstance(value, type(u'')):
+        return value.encode('utf-8')
+    return value
+
+
+class _Exporter(object):
+    """Base class of the exporters: buffers records and writes batches.
+
+    The format is given by two functions of the exporter: 'write_batch'
+    writes a list of records, 'close' closes the file.
+
+    Attributes:
+        path (str): Path of the output file.
+        batch_size (int): Records written at once.
+        count (int): Records written.
+    """
+
+    def __init__(self, path, write_batch, close, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+        self._write_records = write_batch
+        self._close_file = close
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, record):
+        """Add a record, a full batch is written to the file."""
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def export(self, records):
+        """Write all the records of an iterable.
+
+        Returns:
+            Number of records written by this exporter (int).
+        """
+        for record in records:
+            self.write(record)
+        self.flush()
+        return self.count
+
+    def flush(self):
+        """Write the buffered records."""
+        if self._batch:
+            self._write_records(self._batch)
+            self.count += len(self._batch)
+            self._batch = []
+
+    def close(self):
+        """Write the buffered records and close the file."""
+        self.flush()
+        self._close_file()
+
+
+class JSONLExporter(_Exporter):
+    """Writes records to a JSONL file (gzip-compressed if 'compress')."""
+
+    def __init__(self, path, batch_size=1000, compress=False):
+        """Initialize JSONLExporter.
+
+        Keyword arguments:
+            path (str): Path of the output file.
+            batch_size (int): Records written at once (Default: 1000).
+            compress (bool): Write gzip (Default: False).
+        """
+        super(JSONLExporter, self).__init__(path, self._write_batch,
+                                            self._close, batch_size)
+        if compress:
+            self._file = gzip.open(path, 'wb')
+        else:
+            self._file = open(path, 'wb')
+
+    def _write_batch(self, batch):
+        lines = u''.join(u'{0}\n'.format(json.dumps(record))
+                         for record in batch)
+        self._file.write(lines.encode('utf-8'))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class CSVExporter(_Exporter):
+    """Writes records to a CSV file.
+
+    The columns are the keys of the first batch unless 'fields' is given,
+    keys missing in a column are dropped. Nested values are encoded as JSON.
+    """
+
+    def __init__(self, path, batch_size=1000, fields=None):
+        """Initialize CSVExporter.
+
+        Keyword arguments:
+            path (str): Path of the output file.
+            batch_size (int): Records written at once (Default: 1000).
+            fields (list): Columns (Default: keys of the first batch).
+        """
+        super(CSVExporter, self).__init__(path, self._write_batch,
+                                          self._close, batch_size)
+        self.fields = fields
+        if _PY2:
+            self._file = open(path, 'wb')
+        else:
+            self._file = io.open(path, 'w', newline='', encoding='utf-8')
+        self._writer = None
+
+    def _write_batch(self, batch):
+        if self._writer is None:
+            if self.fields is None:
+                self.fields = []
+                for record in batch:
+                    self.fields.extend(key for key in record
+                                       if key not in self.fields)
+            self._writer = csv.DictWriter(
+                self._file, [_cell(field) for field in self.fields],
+                extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerows(
+            dict((_cell(key), _cell(value)) for key, value in record.items())
+            for record in batch)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetExporter(_Exporter):
+    """Writes records to a Parquet file, every batch is a row group.
+
+    The schema is inferred from the first batch unless 'schema' is given,
+    columns without values in the first batch are strings. Nested values of
+    string columns are encoded as JSON.
+    """
+
+    def __init__(self, path, batch_size=10000, schema=None):
+        """Initialize ParquetExporter.
+
+        Keyword arguments:
+            path (str): Path of the output file.
+            batch_size (int): Records per row group (Default: 10000).
+            schema (pyarrow.Schema): Schema (Default: inferred).
+
+        Raises:
+            PybooruError: When pyarrow isn't installed.
+        """
+        if pyarrow is None:
+            raise PybooruError("Parquet export requires pyarrow.")
+        super(ParquetExporter, self).__init__(path, self._write_batch,
+                                              self._close, batch_size)
+        self.schema = schema
+        self._writer = None
+
+    def _write_batch(self, batch):
+        if self.schema is None:
+            fields = []
+            for field in pyarrow.Table.from_pylist(batch).schema:
+                if pyarrow.types.is_null(field.type):
+                    field = field.with_type(pyarrow.string())
+                fields.append(field)
+            self.schema = pyarrow.schema(fields)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path,
+                                                         self.schema)
+
+        columns = {}
+        for field in self.schema:
+            values = [record.get(field.name) for record in batch]
+            if pyarrow.types.is_string(field.type):
+                values = [value if value is None or isinstance(value, str)
+                          else json.dumps(value) for value in values]
+            columns[field.name] = values
+        self._writer.write_table(
+            pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# Extension -> (exporter, keyword arguments)
+EXPORTERS = {
+    '.jsonl': (JSONLExporter, {}),
+    '.jsonl.gz': (JSONLExporter, {'compress': True}),
+    '.csv': (CSVExporter, {}),
+    '.parquet': (ParquetExporter, {})
+    }
+
+
+def export(function, path, limit=100, max_pages=None, batch_size=None,
+           **params):
+    """Export the records of a list call to a file.
+
+    The format is chosen by the extension of 'path' (see EXPORTERS).
+
+    Parameters:
+        function (method): List method of a client, e.g. client.post_list.
+        path (str): Path of the output file.
+        limit (int): Records per page (Default: 100).
+        max_pages (int): Maximum number of pages (Default: all).
+        batch_size (int): Records written at once (Default: the exporter
+                          default).
+        **params: Other parameters of the list call (tags, post_id...).
+
+    Returns:
+        Number of records written (int).
+
+    Raises:
+        PybooruError: When the extension is not supported.
+    """
+    for extension in sorted(EXPORTERS, key=len, reverse=True):
+        if path.endswith(extension):
+            exporter, kwargs = EXPORTERS[extension]
+            break
+    else:
+        raise PybooruError("Unsupported export format: {0}".format(path))
+
+    kwargs = dict(kwargs)
+    if batch_size is not None:
+        kwargs['batch_size'] = batch_size
+    with exporter(path, **kwargs) as writer:
+        return writer.export(iter_records(function, limit, max_pages,
+                                          **params))
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.federated
+
+This module contains a federated search over several Danbooru and Moebooru
+sites.
+
+The query is sent to every site at the same time (one thread per client).
+The posts are normalized to a single schema, duplicates (same md5) are
+merged and the result is ordered by score or date. The search returns when
+'quorum' sites have answered or 'deadline' seconds have passed, whichever
+comes first; late answers are discarded. The queries run in the deadlines
+the clients have open in the calling thread (see client.deadline()), the
+search also stops waiting when they expire.
+
+Classes:
+    FederatedSearch -- Searches several sites at the same time.
+
+Functions:
+    normalize_post -- Convert a Danbooru or Moebooru post to a common schema.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+# pybooru imports
+from .moebooru import Moebooru
+from .exceptions import PybooruError
+from .poststore import _timestamp
+from .tagindex import post_tags
+
+
+# Normalized field -> (Danbooru field, Moebooru field)
+POST_FIELDS = {
+    'id': ('id', 'id'),
+    'md5': ('md5', 'md5'),
+    'score': ('score', 'score'),
+    'fav_count': ('fav_count', 'fav_count'),
+    'rating': ('rating', 'rating'),
+    'width': ('image_width', 'width'),
+    'height': ('image_height', 'height'),
+    'file_size': ('file_size', 'file_size'),
+    'file_url': ('file_url', 'file_url'),
+    'sample_url': ('large_file_url', 'sample_url'),
+    'preview_url': ('preview_file_url', 'preview_url'),
+    'source': ('source', 'source')
+    }
+
+
+def _site(client):
+    """Name of the site of a client."""
+    return client.site_name or client.site_url
+
+
+def normalize_post(client, post):
+    """Convert a Danbooru or Moebooru post to a common schema.
+
+    Parameters:
+        client (_Pybooru): Client that returned the post.
+        post (dict): The post.
+
+    Returns:
+        Dict with the POST_FIELDS, 'tags' (list), 'created_at' (seconds
+        since the epoch), 'site', 'sites' (list of (site, post id)) and
+        'post' (the original post).
+    """
+    moebooru = isinstance(client, Moebooru)
+    normalized = {}
+    for field, names in POST_FIELDS.items():
+        normalized[field] = post.get(names[1] if moebooru else names[0])
+    for field in ('file_url', 'sample_url', 'preview_url'):
+        url = normalized[field]
+        if url and url.startswith('//'):
+            normalized[field] = "https:{0}".format(url)
+        elif url and url.startswith('/'):
+            normalized[field] = "{0}{1}".format(client.site_url, url)
+    normalized['score'] = normalized['score'] or 0
+    normalized['tags'] = post_tags(post)
+    normalized['created_at'] = _timestamp(post.get('created_at'))
+    normalized['site'] = _site(client)
+    normalized['sites'] = [(normalized['site'], post.get('id'))]
+    normalized['post'] = post
+    return normalized
+
+
+class FederatedSearch(object):
+    """Searches several sites at the same time.
+
+    Attributes:
+        clients (list): Danbooru and Moebooru clients.
+        quorum (int): Sites that must answer before returning.
+        deadline (float): Maximum seconds to wait for the sites.
+        last_search (dict): Answered, failed and pending sites of the last
+                            search.
+    """
+
+    ORDERS = ('score', 'date')
+
+    def __init__(self, clients, quorum=None, deadline=None):
+        """Initialize FederatedSearch.
+
+        Keyword arguments:
+            clients (list): Danbooru and Moebooru clients.
+            quorum (int): Sites that must answer (Default: all).
+            deadline (float): Maximum seconds to wait (Default: no limit).
+        """
+        self.clients = list(clients)
+        self.quorum = quorum
+        self.deadline = deadline
+        self.last_search = {}
+
+    def search(self, tags='', limit=20, order='score'):
+        """Search posts in all the sites.
+
+        Parameters:
+            tags (str): The tags to search for.
+            limit (int): Posts per site and maximum posts returned.
+            order (str): Can be: score, date (Default: score).
+
+        Returns:
+            List of normalized posts (see normalize_post()).
+
+        Raises:
+            PybooruError: When order is invalid.
+        """
+        if order not in self.ORDERS:
+            raise PybooruError("Invalid order: {0}".format(order))
+
+        answers = queue.Queue()
+        for client in self.clients:
+            thread = threading.Thread(target=client._in_deadline(self._query),
+                                      args=(client, tags, limit, answers))
+            thread.daemon = True
+            thread.start()
+
+        results, errors = self._collect(answers, self._expires())
+        answered = [_site(client) for client in results]
+        self.last_search = {
+            'answered': answered,
+            'failed': errors,
+            'pending': [_site(client) for client in self.clients
+                        if _site(client) not in answered + list(errors)]
+            }
+
+        posts = self._merge(results.values())
+        if order == 'score':
+            key = (lambda post: (post['score'], post['created_at']))
+        else:
+            key = (lambda post: (post['created_at'], post['score']))
+        return sorted(posts, key=key, reverse=True)[:limit]
+
+    @staticmethod
+    def _query(client, tags, limit, answers):
+        """Search one site and put (client, posts, error) in answers."""
+        try:
+            posts = client.post_list(tags=tags, limit=limit)
+            answers.put((client, [normalize_post(client, post)
+                                  for post in posts], None))
+        except Exception as error:
+            answers.put((client, None, str(error)))
+
+    def _expires(self):
+        """Time when the deadlines of the clients expire (None: never).
+
+        A site can answer until the deadline of its client expires: the
+        search waits for the latest one.
+        """
+        expires = []
+        for client in self.clients:
+            deadline = client._deadline()
+            if deadline is None or deadline.expires is None:
+                return None
+            expires.append(deadline.expires)
+        return max(expires) if expires else None
+
+    def _collect(self, answers, expires=None):
+        """Wait for the answers until the quorum or the deadline.
+
+        Parameters:
+            answers (Queue): Answers of the sites (see _query()).
+            expires (float): Time when the deadlines of the clients expire.
+        """
+        quorum = self.quorum or len(self.clients)
+        end = None if self.deadline is None else time.time() + self.deadline
+        if expires is not None and (end is None or expires < end):
+            end = expires
+        results = {}
+        errors = {}
+        while len(results) < quorum:
+            if len(results) + len(errors) == len(self.clients):
+                break
+            timeout = None if end is None else end - time.time()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                client, posts, error = answers.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if error is None:
+                results[client] = posts
+            else:
+                errors[_site(client)] = error
+        return results, errors
+
+    @staticmethod
+    def _merge(site_posts):
+        """Merge the posts of the sites.
+
+        Posts with the same md5 are merged into the first one: its 'sites'
+        lists every copy and its score is the highest score.
+        """
+        merged = []
+        by_md5 = {}
+        for posts in site_posts:
+            for post in posts:
+                md5 = post['md5']
+                if md5 is None:
+                    merged.append(post)
+                elif md5 in by_md5:
+                    first = by_md5[md5]
+                    first['sites'].extend(post['sites'])
+                    first['score'] = max(first['score'], post['score'])
+                else:
+                    by_md5[md5] = post
+                    merged.append(post)
+        return merged
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.hedging
+
+This module contains request hedging for idempotent (GET) API calls.
+
+When the first attempt of a call is slower than a percentile of the recent
+latencies, a second copy of the request is sent and the first response
+wins. A budget keeps the hedged requests under a small fraction of the
+traffic: every call earns 'budget' tokens and every hedge spends one.
+
+Set a Hedging object as the 'hedging' attribute of a client, only GET
+requests are hedged.
+
+Classes:
+    Hedging -- Hedging policy and latency tracker.
+"""
+
+# __future__ imports
+from __future__ import absolute_import, division
+
+# External imports
+import collections
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+class Hedging(object):
+    """Hedging policy and latency tracker.
+
+    Attributes:
+        percentile (float): Latency percentile that triggers the hedge.
+        budget (float): Maximum fraction of hedged requests.
+        min_samples (int): Latencies needed before hedging.
+        stats (dict): Requests, hedged requests and hedges that won.
+    """
+
+    def __init__(self, percentile=95, budget=0.05, window=200,
+                 min_samples=20):
+        """Initialize Hedging.
+
+        Keyword arguments:
+            percentile (float): Latency percentile that triggers the hedge
+                                (Default: 95).
+            budget (float): Maximum fraction of hedged requests
+                            (Default: 0.05, 5%).
+            window (int): Number of recent latencies kept (Default: 200).
+            min_samples (int): Latencies needed before hedging
+                               (Default: 20).
+        """
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Pickle support, every process has its own lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def threshold(self):
+        """Latency that triggers a hedge (None: not enough samples)."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        position = int(round(self.percentile / 100 * (len(latencies) - 1)))
+        return latencies[position]
+
+    def record(self, latency):
+        """Add the latency of a request."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def execute(self, send, before_hedge=None):
+        """Send a request, hedged if it is slow.
+
+        Parameters:
+            send (function): Sends the request and returns the response.
+            before_hedge (function): Called in the hedge thread before the
+                                     second copy is sent (e.g. the rate
+                                     limiter).
+
+        Returns:
+            The first response.
+
+        Raises:
+            The exception of the attempts when all of them fail.
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            self._tokens = min(self._tokens + self.budget, 1.0)
+
+        threshold = self.threshold()
+        if threshold is None:
+            return self._timed(send)
+
+        answers = queue.Queue()
+        self._start(send, 0, answers)
+        try:
+            return self._answer(answers.get(timeout=threshold))
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            hedge = self._tokens >= 1.0
+            if hedge:
+                self._tokens -= 1.0
+                self.stats['hedged'] += 1
+        if hedge:
+            self._start(send, 1, answers, before_hedge)
+
+        attempts = 2 if hedge else 1
+        error = None
+        for _ in range(attempts):
+            attempt, response, exception = answers.get()
+            if exception is None:
+                if attempt == 1:
+                    with self._lock:
+                        self.stats['hedge_wins'] += 1
+                return response
+            error = exception
+        raise error
+
+    def _timed(self, send):
+        """Send a request and record its latency."""
+        start = time.time()
+        response = send()
+        self.record(time.time() - start)
+        return response
+
+    def _start(self, send, attempt, answers, before=None):
+        """Send a request in a new thread, the answer is put in answers."""
+        def run():
+            try:
+                if before is not None:
+                    before()
+                answers.put((attempt, self._timed(send), None))
+            except Exception as exception:
+                answers.put((attempt, None, exception))
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def _answer(answer):
+        """Return the response of an answer or raise its exception."""
+        attempt, response, exception = answer
+        if exception is not None:
+            raise exception
+        return response
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.mirror
+
+This module contains a local post mirror and the engine that keeps it in sync
+with a Danbooru site.
+
+The sync engine stores two high-water marks in the mirror: the newest post id
+and the newest post version id. Every sync fetches the posts uploaded after
+the first one and tails post_versions_list() after the second one, applying
+only the fields changed by every version to the mirrored posts.
+
+Classes:
+    PostMirror -- Local post store (SQLite).
+    MirrorSync -- Keeps a PostMirror in sync with a Danbooru site.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import json
+import sqlite3
+
+
+class PostMirror(object):
+    """Local post store (SQLite).
+
+    Posts are stored as JSON by id. It can be filled by a crawl, e.g.:
+    CrawlJob(...).run(callback=mirror.add).
+
+    Attributes:
+        path (str): Path of the SQLite file.
+    """
+
+    def __init__(self, path='mirror.sqlite'):
+        """Initialize PostMirror.
+
+        Keyword arguments:
+            path (str): Path of the SQLite file.
+        """
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS posts "
+                         "(id INTEGER PRIMARY KEY, post TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta "
+                         "(key TEXT PRIMARY KEY, value INTEGER)")
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def __contains__(self, post_id):
+        return self._db.execute("SELECT 1 FROM posts WHERE id = ?",
+                                (post_id,)).fetchone() is not None
+
+    def __iter__(self):
+        for row in self._db.execute("SELECT post FROM posts ORDER BY id"):
+            yield json.loads(row[0])
+
+    def get(self, post_id):
+        """Get a mirrored post.
+
+        Parameters:
+            post_id (int): The post id.
+
+        Returns:
+            The post (dict) or None.
+        """
+        row = self._db.execute("SELECT post FROM posts WHERE id = ?",
+                               (post_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add(self, posts):
+        """Add or replace posts.
+
+        Parameters:
+            posts (list): Posts returned by the API.
+        """
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO posts (id, post) VALUES (?, ?)",
+                [(post['id'], json.dumps(post)) for post in posts])
+
+    def update(self, post_id, fields):
+        """Update some fields of a mirrored post.
+
+        Parameters:
+            post_id (int): The post id.
+            fields (dict): Fields to update.
+
+        Returns:
+            True if the post is mirrored.
+        """
+        post = self.get(post_id)
+        if post is None:
+            return False
+        post.update(fields)
+        with self._db:
+            self._db.execute("UPDATE posts SET post = ? WHERE id = ?",
+                             (json.dumps(post), post_id))
+        return True
+
+    def max_id(self):
+        """Get the highest mirrored post id (0 if empty)."""
+        return self._db.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM posts").fetchone()[0]
+
+    def get_mark(self, key):
+        """Get a high-water mark (None if it isn't set)."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?",
+                               (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_mark(self, key, value):
+        """Set a high-water mark."""
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) "
+                             "VALUES (?, ?)", (key, value))
+
+    def close(self):
+        """Close the SQLite file."""
+        self._db.close()
+
+
+class MirrorSync(object):
+    """Keeps a PostMirror in sync with a Danbooru site.
+
+    Attributes:
+        client (Danbooru): Danbooru client.
+        mirror (PostMirror): The local mirror.
+        limit (int): Records per request.
+        new_posts (bool): Also mirror posts uploaded after the newest
+                          mirrored post.
+    """
+
+    # (post version field, post field, version flag set when it changed)
+    VERSION_FIELDS = (
+        ('rating', 'rating', 'rating_changed'),
+        ('source', 'source', 'source_changed'),
+        ('parent_id', 'parent_id', 'parent_changed')
+        )
+
+    def __init__(self, client, mirror, limit=200, new_posts=True):
+        """Initialize MirrorSync.
+
+        Keyword arguments:
+            client (Danbooru): Danbooru client.
+            mirror (PostMirror): The local mirror.
+            limit (int): Records per request (Default: 200).
+            new_posts (bool): Mirror new uploads (Default: True).
+        """
+        self.client = client
+        self.mirror = mirror
+        self.limit = limit
+        self.new_posts = new_posts
+
+    def sync(self):
+        """Fetch new uploads and apply the new post versions.
+
+        The first sync only sets the version high-water mark to the newest
+        version of the site, and on an empty mirror the post high-water mark
+        to the newest post.
+
+        Returns:
+            Dict with the number of new posts, updated posts and requests.
+        """
+        stats = {'new': 0, 'updated': 0, 'requests': 0}
+        if self.new_posts:
+            self._sync_uploads(stats)
+        self._sync_versions(stats)
+        return stats
+
+    def _sync_uploads(self, stats):
+        """Fetch posts newer than the post high-water mark."""
+        mark = self.mirror.get_mark('post_id')
+        if mark is None:
+            mark = self.mirror.max_id()
+        if not mark:
+            # Empty mirror: start at the newest post instead of walking the
+            # whole site (fill the mirror with a crawl)
+            newest = self.client.post_list(limit=1)
+            stats['requests'] += 1
+            self.mirror.set_mark('post_id', newest[0]['id'] if newest else 0)
+            return
+
+        while True:
+            posts = self.client.post_list(limit=self.limit,
+                                          page="a{0}".format(mark))
+            stats['requests'] += 1
+            if not posts:
+                break
+            self.mirror.add(posts)
+            stats['new'] += len(posts)
+            mark = max(post['id'] for post in posts)
+            self.mirror.set_mark('post_id', mark)
+
+    def _sync_versions(self, stats):
+        """Apply post versions newer than the version high-water mark."""
+        mark = self.mirror.get_mark('version_id')
+        if mark is None:
+            newest = self.client.post_versions_list(limit=1)
+            stats['requests'] += 1
+            self.mirror.set_mark('version_id',
+                                 newest[0]['id'] if newest else 0)
+            return
+
+        while True:
+            versions = self.client.post_versions_list(
+                limit=self.limit, page="a{0}".format(mark))
+            stats['requests'] += 1
+            if not versions:
+                break
+            for version in sorted(versions, key=lambda item: item['id']):
+                fields = self.changes(version)
+                if fields and self.mirror.update(version['post_id'], fields):
+                    stats['updated'] += 1
+            mark = max(version['id'] for version in versions)
+            self.mirror.set_mark('version_id', mark)
+
+    def changes(self, version):
+        """Get the post fields changed by a post version.
+
+        Parameters:
+            version (dict): A post version returned by the API.
+
+        Returns:
+            Dict of changed post fields.
+        """
+        fields = {}
+        if version.get('added_tags', True) or version.get('removed_tags'):
+            if 'tags' in version:
+                fields['tag_string'] = version['tags']
+        for version_key, post_key, flag in self.VERSION_FIELDS:
+            if version_key in version and version.get(flag, True):
+                fields[post_key] = version[version_key]
+        if fields and 'updated_at' in version:
+            fields['updated_at'] = version['updated_at']
+        return fields
@@ -112,7 +112,7 @@ class Moebooru(_Pybooru, MoebooruApi_Mixin):
                 "Specify the 'hash_string' parameter of the Pybooru"
                 " object, for the functions that requires login.")
 
-    def _get(self, api_call, params, method='GET', file_=None):
+    def _get(self, api_call, params, method='GET', file_=None, endpoint=None):
         """Function to preapre API call.
 
         Parameters:
@@ -120,6 +120,7 @@ class Moebooru(_Pybooru, MoebooruApi_Mixin):
             params (dict): API function parameters.
             method (str): (Defauld: GET) HTTP method 'GET' or 'POST'
             file_ (file): File to upload.
+            endpoint (Endpoint): Endpoint of the call (metadata).
         """
         url = self._build_url(api_call)
 
@@ -135,4 +136,4 @@ class Moebooru(_Pybooru, MoebooruApi_Mixin):
             request_args = {'data': params, 'files': file_}
 
         # Do call
-        return self._request(url, api_call, request_args, method)
+        return self._request(url, api_call, request_args, method, endpoint)
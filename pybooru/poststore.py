@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.poststore
+
+This module contains a memory-mapped binary store of post metadata.
+
+The numeric fields of every post are stored in a fixed-width record, strings
+and tag ids in variable-length sections found through offset tables. The
+file is opened with mmap: nothing is decoded until a field is read, opening
+a store of millions of posts is instant and all the processes that open the
+same file share its pages.
+
+File format (native byte order):
+    header -- b'PBPS', version, flags, post count, names size (5 x u32).
+    names -- JSON list of tag names, the position is the tag id.
+    records -- One RECORD per post.
+    string offsets -- Start of every string (post count x STRING_FIELDS + 1
+                      x u64) in the strings section.
+    tag offsets -- Start of the tags of every post (post count + 1 x u64).
+    tags -- Tag ids (u32) of all the posts.
+    strings -- UTF-8 strings of all the posts.
+
+Classes:
+    PostStore -- Memory-mapped post metadata.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import calendar
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# pybooru imports
+from .exceptions import PybooruError
+from .tagdict import TagDictionary
+from .tagindex import (post_tags, _array, _cast, _release, _tobytes)
+
+
+_MAGIC = b'PBPS'
+_VERSION = 1
+_HEADER = struct.Struct('=4sIIII')
+
+# Header flags
+_SORTED = 1
+
+# (field, struct format), padded to 8 bytes
+RECORD_FIELDS = (
+    ('id', 'I'),
+    ('parent_id', 'I'),
+    ('score', 'i'),
+    ('fav_count', 'i'),
+    ('width', 'I'),
+    ('height', 'I'),
+    ('file_size', 'Q'),
+    ('created_at', 'q'),
+    ('updated_at', 'q'),
+    ('rating', 'B')
+    )
+RECORD = struct.Struct('={0}7x'.format(
+    ''.join(code for _, code in RECORD_FIELDS)))
+
+STRING_FIELDS = ('md5', 'file_ext', 'source', 'file_url')
+
+# Post fields read for every record field: Danbooru names first, Moebooru
+# names second
+_POST_FIELDS = {
+    'width': ('image_width', 'width'),
+    'height': ('image_height', 'height')
+    }
+
+_TIMESTAMP = re.compile(r'(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)'
+                        r'(?:\.\d+)?(?:(Z)|([+-])(\d\d):?(\d\d))?')
+
+
+def _padding(size):
+    """Bytes to align a section of 'size' bytes to 8 bytes."""
+    return -size % 8
+
+
+def _timestamp(value):
+    """Convert a post timestamp to seconds since the epoch.
+
+    Danbooru returns ISO 8601 strings, Moebooru seconds since the epoch
+    (older versions a dict with 's').
+    """
+    if not value:
+        return 0
+    if isinstance(value, dict):
+        value = value.get('s', 0)
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _TIMESTAMP.match(value)
+    if match is None:
+        return 0
+    fields = match.groups()
+    seconds = calendar.timegm(tuple(int(field) for field in fields[:6]))
+    if fields[7]:
+        offset = int(fields[8]) * 3600 + int(fields[9]) * 60
+        seconds -= offset if fields[7] == '+' else -offset
+    return seconds
+
+
+def _record(post):
+    """Pack the numeric fields of a post."""
+    values = []
+    for field, _ in RECORD_FIELDS:
+        if field == 'rating':
+            values.append(ord((post.get('rating') or '\0')[0]))
+        elif field in ('created_at', 'updated_at'):
+            values.append(_timestamp(post.get(field)))
+        else:
+            value = None
+            for name in _POST_FIELDS.get(field, (field,)):
+                value = post.get(name)
+                if value is not None:
+                    break
+            values.append(int(value or 0))
+    return RECORD.pack(*values)
+
+
+class _Column(object):
+    """Read-only sequence of one record field (used for bisect)."""
+
+    def __init__(self, data, start, count, index):
+        self._data = data
+        self._start = start
+        self._count = count
+        self._index = index
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, row):
+        return RECORD.unpack_from(
+            self._data, self._start + row * RECORD.size)[self._index]
+
+
+class PostStore(object):
+    """Memory-mapped post metadata.
+
+    Write a store with PostStore.write() and open it with PostStore(path).
+    Rows are numbered in the order posts were written.
+
+    Attributes:
+        path (str): Path of the store file.
+        names (list): Tag names, the position is the tag id.
+    """
+
+    def __init__(self, path):
+        """Open a store.
+
+        Keyword arguments:
+            path (str): Path of the store file.
+
+        Raises:
+            PybooruError: When the file isn't a post store.
+        """
+        self.path = path
+        with open(path, 'rb') as file_:
+            self._mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._mmap
+
+        magic, version, flags, count, names_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            data.close()
+            raise PybooruError("Invalid post store: {0}".format(path))
+        self._count = count
+        self._sorted = bool(flags & _SORTED)
+
+        start = _HEADER.size
+        self.names = json.loads(data[start:start + names_size].decode('utf-8'))
+        start += names_size + _padding(_HEADER.size + names_size)
+
+        self._records = start
+        start += count * RECORD.size
+        strings = count * len(STRING_FIELDS) + 1
+        self._string_offsets = _cast(data, start, strings, 'Q')
+        start += strings * 8
+        self._tag_offsets = _cast(data, start, count + 1, 'Q')
+        start += (count + 1) * 8
+        tags = self._tag_offsets[count]
+        self._tags = _cast(data, start, tags, 'I')
+        start += tags * 4 + _padding(tags * 4)
+        self._strings = start
+
+        self._ids = _Column(data, self._records, count, 0)
+        self._order = None
+
+    @classmethod
+    def write(cls, path, posts, dictionary=None):
+        """Write posts to a store file.
+
+        Posts are streamed: records, tags and strings are spooled to
+        temporary files, so 'posts' can be a whole PostMirror.
+
+        Parameters:
+            path (str): Path of the store file.
+            posts (iterable): Danbooru or Moebooru posts.
+            dictionary (TagDictionary): Tag ids to use, e.g.
+                                        client.tag_dictionary
+                                        (Default: a new one).
+
+        Returns:
+            Number of posts written (int).
+        """
+        if dictionary is None:
+            dictionary = TagDictionary()
+        string_offsets = _array('Q', [0])
+        tag_offsets = _array('Q', [0])
+        count = 0
+        is_sorted = True
+        last_id = -1
+
+        with tempfile.TemporaryFile() as records, \
+                tempfile.TemporaryFile() as tags, \
+                tempfile.TemporaryFile() as strings:
+            for post in posts:
+                records.write(_record(post))
+                tag_ids = dictionary.encode(post_tags(post))
+                tags.write(_tobytes(tag_ids))
+                tag_offsets.append(tag_offsets[-1] + len(tag_ids))
+                for field in STRING_FIELDS:
+                    value = (post.get(field) or u'').encode('utf-8')
+                    strings.write(value)
+                    string_offsets.append(string_offsets[-1] + len(value))
+                if post['id'] <= last_id:
+                    is_sorted = False
+                last_id = post['id']
+                count += 1
+
+            names = json.dumps(dictionary.names).encode('utf-8')
+            temp = "{0}.tmp".format(path)
+            with open(temp, 'wb') as file_:
+                file_.write(_HEADER.pack(_MAGIC, _VERSION,
+                                         _SORTED if is_sorted else 0, count,
+                                         len(names)))
+                file_.write(names)
+                file_.write(b'\0' * _padding(_HEADER.size + len(names)))
+                records.seek(0)
+                shutil.copyfileobj(records, file_)
+                file_.write(_tobytes(string_offsets))
+                file_.write(_tobytes(tag_offsets))
+                tags.seek(0)
+                shutil.copyfileobj(tags, file_)
+                file_.write(b'\0' * _padding(tag_offsets[-1] * 4))
+                strings.seek(0)
+                shutil.copyfileobj(strings, file_)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(temp, path)
+        return count
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, post_id):
+        return self.find(post_id) is not None
+
+    def __iter__(self):
+        """Iterate over the posts (see post()), in row order."""
+        for row in range(self._count):
+            yield self.post(row)
+
+    def find(self, post_id):
+        """Get the row of a post (None if it isn't stored).
+
+        Stores written in id order are searched with bisect, others with an
+        index of the rows built on the first call.
+        """
+        if self._sorted:
+            ids = self._ids
+        else:
+            if self._order is None:
+                rows = sorted(range(self._count), key=self._ids.__getitem__)
+                self._order = (array('I', [self._ids[row] for row in rows]),
+                               array('I', rows))
+            ids = self._order[0]
+        position = bisect_left(ids, post_id)
+        if position < len(ids) and ids[position] == post_id:
+            return position if self._sorted else self._order[1][position]
+        return None
+
+    def record(self, row):
+        """Get the numeric fields of a row.
+
+        Returns:
+            Dict (id, parent_id, score, fav_count, width, height, file_size,
+            created_at, updated_at, rating).
+        """
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        values = RECORD.unpack_from(self._mmap,
+                                    self._records + row * RECORD.size)
+        record = dict(zip((field for field, _ in RECORD_FIELDS), values))
+        record['rating'] = chr(record['rating']) if record['rating'] else None
+        record['parent_id'] = record['parent_id'] or None
+        return record
+
+    def string(self, row, field):
+        """Get a string field (one of STRING_FIELDS) of a row."""
+        position = row * len(STRING_FIELDS) + STRING_FIELDS.index(field)
+        start = self._strings + self._string_offsets[position]
+        end = self._strings + self._string_offsets[position + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def tag_ids(self, row):
+        """Get the tag ids of a row (memoryview of the mapped file, a copy on
+        Python 2)."""
+        return self._tags[self._tag_offsets[row]:self._tag_offsets[row + 1]]
+
+    def tags(self, row):
+        """Get the tag names of a row."""
+        return [self.names[tag_id] for tag_id in self.tag_ids(row)]
+
+    def post(self, row):
+        """Get a row as a post dict (record, strings and 'tag_string')."""
+        post = self.record(row)
+        for field in STRING_FIELDS:
+            post[field] = self.string(row, field)
+        post['tag_string'] = ' '.join(self.tags(row))
+        return post
+
+    def get(self, post_id):
+        """Get a post by id (see post()), None if it isn't stored."""
+        row = self.find(post_id)
+        return None if row is None else self.post(row)
+
+    def column(self, field):
+        """Get a numeric field of every row.
+
+        Returns:
+            numpy array (a view of the mapped file) when NumPy is installed,
+            otherwise a list.
+        """
+        if field not in dict(RECORD_FIELDS):
+            raise PybooruError("Unknown field: {0}".format(field))
+        if numpy is not None:
+            return self.records()[field]
+        index = [name for name, _ in RECORD_FIELDS].index(field)
+        column = _Column(self._mmap, self._records, self._count, index)
+        return [column[row] for row in range(self._count)]
+
+    def records(self):
+        """Get all the records as a NumPy structured array (a view of the
+        mapped file).
+
+        Raises:
+            PybooruError: When NumPy isn't installed.
+        """
+        if numpy is None:
+            raise PybooruError("PostStore.records() requires NumPy.")
+        dtype = numpy.dtype({
+            'names': [field for field, _ in RECORD_FIELDS],
+            'formats': [code for _, code in RECORD_FIELDS],
+            'offsets': [struct.calcsize('=' + ''.join(
+                code for _, code in RECORD_FIELDS[:position]))
+                for position in range(len(RECORD_FIELDS))],
+            'itemsize': RECORD.size})
+        return numpy.frombuffer(self._mmap, dtype=dtype, count=self._count,
+                                offset=self._records)
+
+    def close(self):
+        """Release the mapped file.
+
+        Arrays returned by column() and records() and the tag ids returned
+        by tag_ids() must be deleted first.
+        """
+        if self._mmap is not None:
+            # The map can't be closed while views of it exist
+            _release((self._string_offsets, self._tag_offsets, self._tags))
+            self._string_offsets = self._tag_offsets = self._tags = None
+            self._mmap.close()
+            self._mmap = None
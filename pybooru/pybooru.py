@@ -13,13 +13,32 @@ Classes:
 from __future__ import absolute_import
 
 # External imports
+import functools
 import re
+import threading
+from contextlib import contextmanager
 import requests
+from requests.packages.urllib3.util import make_headers
 
 # pybooru imports
 from . import __version__
-from .exceptions import (PybooruError, PybooruHTTPError)
+from .cache import target
+from .deadline import Deadline
+from .exceptions import (PybooruError, PybooruHTTPError, PybooruTimeoutError)
 from .resources import (SITE_LIST, HTTP_STATUS_CODE)
+from .tagdict import TagDictionary
+
+
+def _endpoint(api_call):
+    """Endpoint of an API call, ids are replaced by '{id}'."""
+    return re.sub(r'/\d+(?=[/.]|$)', '/{id}', api_call)
+
+
+def _ratio(stats):
+    """Compression ratio of transfer statistics (bytes / wire bytes)."""
+    if not stats['wire_bytes']:
+        return None
+    return stats['bytes'] / float(stats['wire_bytes'])
 
 
 class _Pybooru(object):
@@ -30,8 +49,28 @@ class _Pybooru(object):
         site_url (str): Get or set the URL of Moebooru/Danbooru based site.
         username (str): Return user name.
         last_call (dict): Return last call.
+        rate_limiter (object): Optional object whose wait() method is called
+                               before every request (e.g. SharedRateLimiter).
+        hedging (Hedging): Optional hedging of the GET requests (a second
+                           copy of a slow request is sent, see: Hedging).
+        breaker (CircuitBreaker): Optional circuit breaker, requests to a
+                                  failing site fail fast.
+        cache (ResponseCache): Optional cache of the GET requests.
+        cache_mode (str): How the cache serves expired entries: 'normal',
+                          'stale-while-revalidate' or 'offline' (See:
+                          pybooru.cache).
+        autocomplete (TagAutocomplete): Local index for tag_autocomplete().
+        tag_dictionary (TagDictionary): Tag ids shared by the PostSet
+                                        objects of the session.
+        transfer_stats (dict): Requests and bytes by endpoint (See:
+                               statistics()).
+        timeout (float or tuple): Connect and read timeouts of every request
+                                  (seconds, None: no timeout).
     """
 
+    # Default (connect, read) timeouts
+    TIMEOUT = (10, 60)
+
     def __init__(self, site_name='', site_url='', username=''):
         """Initialize Pybooru.
 
@@ -49,11 +88,24 @@ class _Pybooru(object):
         self.__site_url = ''  # for site_url property
         self.username = username
         self.last_call = {}
+        self.rate_limiter = None
+        self.hedging = None
+        self.breaker = None
+        self.cache = None
+        self.cache_mode = 'normal'
+        self.autocomplete = None
+        self.tag_dictionary = TagDictionary()
+        self.transfer_stats = {}
+        self.timeout = self.TIMEOUT
+        self._deadlines = threading.local()
 
         # Set HTTP Client
         self.client = requests.Session()
+        # gzip and deflate, brotli/zstd if their decoders are installed
+        encodings = make_headers(accept_encoding=True)['accept-encoding']
         headers = {'user-agent': 'Pybooru/{0}'.format(__version__),
-                   'content-type': 'application/json; charset=utf-8'}
+                   'content-type': 'application/json; charset=utf-8',
+                   'accept-encoding': encodings}
         self.client.headers = headers
 
         # Validate site_name or site_url
@@ -65,6 +117,17 @@ class _Pybooru(object):
             raise PybooruError("Unexpected empty arguments, specify parameter "
                                "'site_name' or 'site_url'.")
 
+    def __getstate__(self):
+        """Pickle support (e.g. ShardedCrawler workers), deadlines belong to
+        the threads of a process."""
+        state = self.__dict__.copy()
+        del state['_deadlines']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._deadlines = threading.local()
+
     @property
     def site_name(self):
         """Get or set site name.
@@ -137,6 +200,150 @@ class _Pybooru(object):
             raise PybooruError(
                 "Invalid URL scheme, use HTTP or HTTPS: {0}".format(url))
 
+    def tag_autocomplete(self, prefix, limit=10):
+        """Complete a tag name with the local 'autocomplete' index.
+
+        Parameters:
+            prefix (str): Start of the tag name.
+            limit (int): Maximum number of results (Default: 10).
+
+        Returns:
+            List of dicts (name, antecedent, post_count).
+
+        Raises:
+            PybooruError: When the 'autocomplete' attribute isn't set.
+        """
+        if self.autocomplete is None:
+            raise PybooruError("Set the 'autocomplete' attribute (a "
+                               "TagAutocomplete index) to complete tags.")
+        return self.autocomplete.complete(prefix, limit)
+
+    @contextmanager
+    def deadline(self, seconds=None):
+        """Bound the time of the calls made inside a 'with' block.
+
+        Every request of the block (in the current thread) has its timeouts
+        cut to the time left, no request is sent once the deadline expires
+        or is cancelled (See: pybooru.deadline).
+
+        Usage:
+            with client.deadline(30) as deadline:
+                posts = client.post_list(tags='...')
+
+        Parameters:
+            seconds (float): Time budget (Default: None, no time limit but
+                             the block can be cancelled).
+
+        Yields:
+            Deadline, call its cancel() method to stop the calls.
+        """
+        stack = self._deadline_stack()
+        deadline = Deadline(seconds, stack[-1] if stack else None)
+        stack.append(deadline)
+        try:
+            yield deadline
+        finally:
+            stack.pop()
+            deadline._close()
+
+    def _deadline_stack(self):
+        """Get the deadlines opened in the current thread (list)."""
+        stack = getattr(self._deadlines, 'stack', None)
+        if stack is None:
+            stack = self._deadlines.stack = []
+        return stack
+
+    def _deadline(self):
+        """Get the innermost deadline of the current thread (or None)."""
+        stack = self._deadline_stack()
+        return stack[-1] if stack else None
+
+    def _in_deadline(self, function):
+        """Bind a function to the deadline of the current thread.
+
+        Deadlines are thread-local: work handed to other threads (download
+        pools, hedged requests, cache refreshes) is wrapped when it's
+        submitted, the wrapper enters the deadline in the thread that runs
+        it.
+
+        Returns:
+            The wrapped function (function itself when there's no deadline).
+        """
+        deadline = self._deadline()
+        if deadline is None:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            stack = self._deadline_stack()
+            stack.append(deadline)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stack.pop()
+        return wrapper
+
+    def _request_timeout(self):
+        """Get the timeout of the next request.
+
+        Raises:
+            PybooruTimeoutError: When the deadline expired.
+            PybooruCancelledError: When the deadline was cancelled.
+        """
+        deadline = self._deadline()
+        if deadline is None:
+            return self.timeout
+        deadline.check()
+        return deadline.timeout(self.timeout)
+
+    def statistics(self):
+        """Get the requests and transferred bytes of the session.
+
+        'wire_bytes' are the bytes received (compressed), 'bytes' the bytes
+        after decompression.
+
+        Returns:
+            Dict with the totals ('requests', 'wire_bytes', 'bytes',
+            'ratio') and 'endpoints' (the same counters by endpoint plus the
+            'encodings' used). 'hedging' and 'cache' have the counters
+            of the hedging and of the cache when they are set.
+        """
+        total = {'requests': 0, 'wire_bytes': 0, 'bytes': 0}
+        endpoints = {}
+        for endpoint, stats in self.transfer_stats.items():
+            for key in total:
+                total[key] += stats[key]
+            endpoints[endpoint] = dict(stats, encodings=dict(
+                stats['encodings']), ratio=_ratio(stats))
+        total['ratio'] = _ratio(total)
+        total['endpoints'] = endpoints
+        if self.hedging is not None:
+            total['hedging'] = dict(self.hedging.stats)
+        if self.cache is not None:
+            total['cache'] = dict(self.cache.stats)
+        return total
+
+    def _record_transfer(self, api_call, response, size):
+        """Add a response to the transfer statistics.
+
+        Parameters:
+            api_call (str): API function called, ids are replaced by '{id}'.
+            response (requests.Response): A consumed response.
+            size (int): Decompressed size of the body.
+        """
+        stats = self.transfer_stats.setdefault(_endpoint(api_call), {
+            'requests': 0, 'wire_bytes': 0, 'bytes': 0, 'encodings': {}})
+        try:
+            wire_bytes = response.raw.tell()
+        except AttributeError:
+            wire_bytes = size
+        encoding = response.headers.get('content-encoding', 'identity')
+        stats['requests'] += 1
+        stats['wire_bytes'] += wire_bytes
+        stats['bytes'] += size
+        stats['encodings'][encoding] = stats['encodings'].get(encoding, 0) + 1
+        self.last_call.update({'wire_bytes': wire_bytes, 'bytes': size})
+
     @staticmethod
     def _get_status(status_code):
         """Get status message for status code.
@@ -150,25 +357,142 @@ class _Pybooru(object):
         return "{0}, {1}".format(*HTTP_STATUS_CODE.get(
             status_code, ('Undefined', 'undefined')))
 
-    def _request(self, url, api_call, request_args, method='GET'):
+    def _send(self, method, url, api_call, request_args, endpoint=None):
+        """Send a request (hedged and through the circuit breaker if they
+        are set). Only idempotent endpoints are hedged (Default: GET).
+
+        Returns:
+            The response (requests.Response).
+
+        Raises:
+            PybooruCircuitOpenError: When the circuit breaker is open.
+        """
+        circuit = None
+        if self.breaker is not None:
+            circuit = self.breaker.acquire(url, _endpoint(api_call))
+        try:
+            if endpoint is not None:
+                idempotent = endpoint.idempotent
+            else:
+                idempotent = method == 'GET'
+            if self.hedging is not None and idempotent:
+                def send():
+                    # The hedge is sent later: check the deadline again and
+                    # cut the timeout to the time left
+                    args = dict(request_args, timeout=self._request_timeout())
+                    return self.client.request(method, url, **args)
+
+                response = self.hedging.execute(
+                    self._in_deadline(send),
+                    self.rate_limiter and self.rate_limiter.wait)
+            else:
+                response = self.client.request(method, url, **request_args)
+        except requests.exceptions.RequestException:
+            if circuit is not None:
+                self.breaker.failure(circuit)
+            raise
+        except BaseException:
+            # No answer from the site: free the half-open probe
+            if circuit is not None:
+                self.breaker.release(circuit)
+            raise
+        if circuit is not None:
+            self.breaker.result(circuit, response.status_code)
+        return response
+
+    def _request(self, url, api_call, request_args, method='GET',
+                 endpoint=None):
         """Function to request and returning JSON data.
 
+        Cacheable requests (Default: GET) are answered by the cache if it's
+        set (see: ResponseCache and 'cache_mode'), writes update it.
+
         Parameters:
             url (str): Base url call.
             api_call (str): API function to be called.
             request_args (dict): All requests parameters.
             method (str): (Defauld: GET) HTTP method 'GET' or 'POST'
+            endpoint (Endpoint): Endpoint of the call (metadata).
+
+        Raises:
+            PybooruError: When the request isn't cached in offline mode.
+            (and the exceptions of _fetch())
+        """
+        def fetch():
+            return self._fetch(url, api_call, request_args, method, endpoint)
+
+        if self.cache is None:
+            return fetch()
+        name = None if endpoint is None else endpoint.resource
+        if method != 'GET':
+            return self._write(fetch, api_call, request_args, name)
+        if endpoint is not None and not endpoint.cacheable:
+            return fetch()
+
+        params = request_args.get('params')
+        key = self.cache.key(url, params, self.username)
+        resource, id_ = target(api_call, params)
+        # Stale entries may be refreshed in a background thread
+        data, status = self.cache.fetch(key, self._in_deadline(fetch),
+                                        self.cache_mode,
+                                        (self.site_url, name or resource, id_))
+        if status == 'miss':
+            self.last_call['cache'] = status
+        else:
+            self.last_call.update({'API': api_call, 'url': url,
+                                   'cache': status})
+        return data
+
+    def _write(self, fetch, api_call, request_args, resource=None):
+        """Send a write request and update the cached entries it changes.
+
+        The entries are also removed when the request fails: the site may
+        have applied the write.
+
+        Parameters:
+            fetch (function): Sends the request.
+            api_call (str): API function to be called.
+            request_args (dict): All requests parameters.
+            resource (str): Resource type of the endpoint.
+        """
+        params = request_args.get('data')
+        try:
+            data = fetch()
+        except Exception:
+            self.cache.write(self.site_url, api_call, params,
+                             resource=resource)
+            raise
+        self.cache.write(self.site_url, api_call, params, data, resource)
+        return data
+
+    def _fetch(self, url, api_call, request_args, method='GET',
+               endpoint=None):
+        """Send a request and decode the JSON data.
+
+        Parameters:
+            url (str): Base url call.
+            api_call (str): API function to be called.
+            request_args (dict): All requests parameters.
+            method (str): (Defauld: GET) HTTP method 'GET' or 'POST'
+            endpoint (Endpoint): Endpoint of the call (metadata).
 
         Raises:
             PybooruHTTPError: HTTP Error.
-            requests.exceptions.Timeout: When HTTP Timeout.
-            ValueError: When can't decode JSON response.
+            PybooruTimeoutError: When HTTP Timeout or expired deadline.
+            PybooruCancelledError: When the deadline was cancelled.
+            PybooruCircuitOpenError: When the circuit breaker is open.
+            PybooruError: When can't decode JSON response.
         """
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        request_args = dict(request_args, timeout=self._request_timeout())
+
         try:
             if method != 'GET':
                 # Reset content-type for data encoded as a multipart form
                 self.client.headers.update({'content-type': None})
-            response = self.client.request(method, url, **request_args)
+            response = self._send(method, url, api_call, request_args,
+                                  endpoint)
 
             self.last_call.update({
                 'API': api_call,
@@ -177,6 +501,7 @@ class _Pybooru(object):
                 'status': self._get_status(response.status_code),
                 'headers': response.headers
                 })
+            self._record_transfer(api_call, response, len(response.content))
 
             if response.status_code in (200, 201, 202, 204):
                 return response.json()
@@ -184,7 +509,7 @@ class _Pybooru(object):
                 raise PybooruHTTPError("In _request", response.status_code,
                                        response.url)
         except requests.exceptions.Timeout:
-            raise PybooruError("Timeout! url: {0}".format(response.url))
+            raise PybooruTimeoutError("Timeout! url: {0}".format(url))
         except ValueError as e:
             raise PybooruError("JSON Error: {0} in line {1} column {2}".format(
                 e.msg, e.lineno, e.colno))
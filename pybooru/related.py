@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.related
+
+This module contains a local related tags engine for mirrored posts.
+
+The tags of every post are stored as a sparse post x tag matrix (CSR: row
+offsets and tag ids) and its transpose (the posts of every tag). The related
+tags of a query are the tags that co-occur with the posts that have all the
+query tags, scored with cosine similarity or the Jaccard index.
+
+NumPy is used to count and score when it's installed
+(pip install Pybooru[numpy]), otherwise a pure Python path is used.
+
+Classes:
+    RelatedTags -- Related tags of a tag or tag combination.
+"""
+
+# __future__ imports
+from __future__ import absolute_import, division
+
+# External imports
+import math
+from array import array
+from collections import Counter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# pybooru imports
+from .exceptions import PybooruError
+from .resources import TAG_CATEGORIES
+from .tagindex import (intersect, post_tags)
+
+
+# Danbooru post fields with the tags of a category
+_CATEGORY_FIELDS = tuple(
+    ("tag_string_{0}".format(name), category)
+    for name, category in sorted(TAG_CATEGORIES['danbooru'].items()))
+
+
+class RelatedTags(object):
+    """Related tags of a tag or tag combination.
+
+    Attributes:
+        names (list): Tag names, the position is the tag id.
+        categories (array): Category of every tag (-1 if unknown).
+        api_name (str): API of the categories, 'danbooru' or 'moebooru'.
+    """
+
+    METRICS = ('cosine', 'jaccard', 'count')
+
+    def __init__(self, names, categories, indptr, indices,
+                 api_name='danbooru'):
+        """Initialize RelatedTags.
+
+        Keyword arguments:
+            names (list): Tag names, the position is the tag id.
+            categories (array): Category of every tag (-1 if unknown).
+            indptr (array): Start of the tags of every post in 'indices'
+                            (posts + 1 items).
+            indices (array): Tag ids of all the posts.
+            api_name (str): API of the categories, names of categories are
+                            looked up in resources.TAG_CATEGORIES
+                            (Default: danbooru).
+
+        Raises:
+            PybooruError: When api_name is invalid.
+        """
+        if api_name not in TAG_CATEGORIES:
+            raise PybooruError("Invalid API: {0}".format(api_name))
+        self.api_name = api_name
+        self.names = names
+        self.categories = categories
+        self._ids = dict((name, tag_id) for tag_id, name in enumerate(names))
+
+        # Transpose: the rows (posts) of every tag
+        postings = [array('I') for _ in names]
+        for row in range(len(indptr) - 1):
+            for position in range(indptr[row], indptr[row + 1]):
+                postings[indices[position]].append(row)
+        self._postings = postings
+        self._frequency = [len(posting) for posting in postings]
+
+        if numpy is not None:
+            self._indptr = numpy.asarray(indptr, dtype=numpy.int64)
+            self._indices = numpy.asarray(indices, dtype=numpy.int64)
+            self._frequency_np = numpy.asarray(self._frequency,
+                                               dtype=numpy.float64)
+            self._categories_np = numpy.asarray(categories)
+        else:
+            self._indptr = indptr
+            self._indices = indices
+
+    @classmethod
+    def build(cls, posts, categories=None, api_name='danbooru'):
+        """Build the engine from posts.
+
+        Tag categories are read from the 'tag_string_<category>' fields of
+        Danbooru posts, the 'categories' argument adds or overrides them.
+
+        Parameters:
+            posts (iterable): Posts (e.g. a PostMirror).
+            categories (dict): Tag name -> category number (e.g. from
+                               tag_list() or a MoebooruTagSnapshot).
+            api_name (str): API of the posts and categories
+                            (Default: danbooru).
+
+        Returns:
+            RelatedTags.
+        """
+        ids = {}
+        known = {}
+        indptr = array('l', [0])
+        indices = array('I')
+        for post in posts:
+            for field, category in _CATEGORY_FIELDS:
+                for name in (post.get(field) or '').split():
+                    known[name] = category
+            for name in set(post_tags(post)):
+                indices.append(ids.setdefault(name, len(ids)))
+            indptr.append(len(indices))
+
+        known.update(categories or {})
+        names = sorted(ids, key=ids.get)
+        return cls(names, array('b', [known.get(name, -1) for name in names]),
+                   indptr, indices, api_name)
+
+    def related(self, tags, category=None, metric='cosine', limit=25):
+        """Get the tags related to a tag or tag combination.
+
+        Parameters:
+            tags (str or list): Space delimited tags or list of tag names.
+            category (int or str): Only tags of this category, e.g. 4, '4'
+                                   or 'character', names depend on the API
+                                   (Default: all).
+            metric (str): Can be: cosine, jaccard, count (Default: cosine).
+            limit (int): Maximum number of tags (Default: 25).
+
+        Returns:
+            List of dicts (name, category, count, score), best first.
+
+        Raises:
+            PybooruError: When metric or category are invalid.
+        """
+        if metric not in self.METRICS:
+            raise PybooruError("Invalid metric: {0}".format(metric))
+        if category is not None:
+            # A name of the API or a number (int, long or numeric string)
+            names = TAG_CATEGORIES[self.api_name]
+            try:
+                if category in names:
+                    category = names[category]
+                else:
+                    category = int(category)
+            except (TypeError, ValueError):
+                raise PybooruError("Invalid category: {0}".format(category))
+        if not isinstance(tags, (list, tuple, set, frozenset)):
+            tags = tags.split()
+
+        query_ids = [self._ids.get(name) for name in tags]
+        if not query_ids or None in query_ids:
+            return []
+        rows = intersect([self._postings[tag_id] for tag_id in query_ids])
+        if not rows:
+            return []
+
+        if numpy is not None:
+            scored = self._score_numpy(rows, query_ids, category, metric,
+                                       limit)
+        else:
+            scored = self._score_python(rows, query_ids, category, metric,
+                                        limit)
+        return [{'name': self.names[tag_id],
+                 'category': self.categories[tag_id],
+                 'count': count, 'score': score}
+                for tag_id, count, score in scored]
+
+    def _score_numpy(self, rows, query_ids, category, metric, limit):
+        """Count and score with NumPy, returns (tag id, count, score)."""
+        selected = numpy.zeros(len(self._indptr) - 1, dtype=bool)
+        selected[numpy.asarray(rows, dtype=numpy.int64)] = True
+        entries = numpy.repeat(selected, numpy.diff(self._indptr))
+        counts = numpy.bincount(self._indices[entries],
+                                minlength=len(self.names)).astype(
+                                    numpy.float64)
+        counts[query_ids] = 0
+        if category is not None:
+            counts[self._categories_np != category] = 0
+
+        matches = len(rows)
+        if metric == 'cosine':
+            scores = counts / numpy.sqrt(matches * self._frequency_np)
+        elif metric == 'jaccard':
+            scores = counts / (matches + self._frequency_np - counts)
+        else:
+            scores = counts
+
+        candidates = numpy.flatnonzero(counts)
+        if len(candidates) > limit:
+            # Keep the ties of the last score, they are ordered by tag id
+            top = numpy.argpartition(-scores[candidates], limit)[:limit]
+            threshold = scores[candidates[top]].min()
+            candidates = candidates[scores[candidates] >= threshold]
+        order = sorted(candidates.tolist(),
+                       key=lambda tag_id: (-scores[tag_id], tag_id))[:limit]
+        return [(tag_id, int(counts[tag_id]), float(scores[tag_id]))
+                for tag_id in order]
+
+    def _score_python(self, rows, query_ids, category, metric, limit):
+        """Count and score in pure Python, returns (tag id, count, score)."""
+        counts = Counter()
+        for row in rows:
+            counts.update(self._indices[self._indptr[row]:
+                                        self._indptr[row + 1]])
+        matches = len(rows)
+
+        scored = []
+        for tag_id, count in counts.items():
+            if tag_id in query_ids:
+                continue
+            if category is not None and self.categories[tag_id] != category:
+                continue
+            frequency = self._frequency[tag_id]
+            if metric == 'cosine':
+                score = count / math.sqrt(matches * frequency)
+            elif metric == 'jaccard':
+                score = count / (matches + frequency - count)
+            else:
+                score = float(count)
+            scored.append((-score, tag_id, count))
+        scored.sort()
+        return [(tag_id, count, -score)
+                for score, tag_id, count in scored[:limit]]
@@ -8,6 +8,12 @@ SITE_LIST (dict):
     Is a dict that contains various based Moebooru, default sites.
 HTTP_STATUS_CODE (dict):
     Is a dict that contains the http status code for Moebooru API.
+IMAGE_VARIANTS (dict):
+    Is a dict that contains the image variants exposed by each API.
+TAG_CATEGORIES (dict):
+    Is a dict that contains the tag category (type) numbers of each API.
+PAGE_LIMITS (dict):
+    Is a dict that contains the maximum posts per page of each API.
 """
 
 
@@ -47,6 +53,60 @@ HTTP_STATUS_CODE = {
     422: ("Locked", "The resource is locked and cannot be modified"),
     423: ("Already Exists", "Resource already exists"),
     424: ("Invalid Parameters", "The given parameters were invalid"),
+    429: ("Too Many Requests", "The user has sent too many requests in a "
+          "given amount of time"),
     500: ("Internal Server Error", "Some unknown error occurred on the server"),
     503: ("Service Unavailable", "Server cannot currently handle the request")
     }
+
+
+# IMAGE_VARIANTS
+# Every variant is (name, url key, width key, height key, size key, box). When
+# the API doesn't report the dimensions of a variant, 'box' is the maximum
+# (width, height) the site scales the original image to.
+IMAGE_VARIANTS = {
+    'danbooru': (
+        ('preview', 'preview_file_url', None, None, None, (150, 150)),
+        ('large', 'large_file_url', None, None, None, (850, None)),
+        ('original', 'file_url', 'image_width', 'image_height', 'file_size',
+         None)
+        ),
+    'moebooru': (
+        ('preview', 'preview_url', 'preview_width', 'preview_height', None,
+         None),
+        ('sample', 'sample_url', 'sample_width', 'sample_height',
+         'sample_file_size', None),
+        ('jpeg', 'jpeg_url', 'jpeg_width', 'jpeg_height', 'jpeg_file_size',
+         None),
+        ('original', 'file_url', 'width', 'height', 'file_size', None)
+        )
+    }
+
+
+# TAG_CATEGORIES
+# Danbooru 'category' and Moebooru 'type' numbers by name
+TAG_CATEGORIES = {
+    'danbooru': {
+        'general': 0,
+        'artist': 1,
+        'copyright': 3,
+        'character': 4,
+        'meta': 5
+        },
+    'moebooru': {
+        'general': 0,
+        'artist': 1,
+        'copyright': 3,
+        'character': 4,
+        'circle': 5,
+        'faults': 6
+        }
+    }
+
+
+# PAGE_LIMITS
+# Maximum 'limit' of post_list()
+PAGE_LIMITS = {
+    'danbooru': 200,
+    'moebooru': 100
+    }
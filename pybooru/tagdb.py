@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.tagdb
+
+This module contains a local snapshot of the tag database of a Moebooru site
+(Konachan, yande.re...).
+
+Moebooru returns every tag in a single response with tag_list(limit=0). The
+snapshot streams that response and decodes the tags one by one into a SQLite
+file, so the whole list is never held in memory. Later refreshes only fetch
+the tags created after the newest stored id (after_id), and count updates
+stream the full list again updating counts and types in place.
+
+Classes:
+    MoebooruTagSnapshot -- Local copy of the tags of a Moebooru site.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import codecs
+import json
+import sqlite3
+import time
+import requests
+
+# pybooru imports
+from .exceptions import (PybooruError, PybooruHTTPError, PybooruTimeoutError)
+
+
+def _iter_json_array(chunks):
+    """Decode the items of a JSON array from an iterable of text chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in chunks:
+        buffer += chunk
+        position = 0
+        while True:
+            # Skip whitespace, separators and the array brackets
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+                if buffer[position] == '[':
+                    started = True
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                raise PybooruError("JSON Error: expected an array")
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Incomplete item, wait for the next chunk
+                break
+            yield item
+            position = end
+        buffer = buffer[position:]
+    if buffer.strip():
+        raise PybooruError("JSON Error: truncated array")
+
+
+class MoebooruTagSnapshot(object):
+    """Local copy of the tags of a Moebooru site.
+
+    Attributes:
+        client (Moebooru): Moebooru client.
+        path (str): Path of the SQLite file.
+        batch_size (int): Tags written per transaction.
+    """
+
+    def __init__(self, client, path='tags.sqlite', batch_size=10000):
+        """Initialize MoebooruTagSnapshot.
+
+        Keyword arguments:
+            client (Moebooru): Moebooru client.
+            path (str): Path of the SQLite file.
+            batch_size (int): Tags written per transaction (Default: 10000).
+        """
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS tags (id INTEGER "
+                         "PRIMARY KEY, name TEXT UNIQUE NOT NULL, count "
+                         "INTEGER, type INTEGER, ambiguous INTEGER)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta "
+                         "(key TEXT PRIMARY KEY, value REAL)")
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+
+    @property
+    def max_id(self):
+        """Highest stored tag id (0 if the snapshot is empty)."""
+        return self._db.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM tags").fetchone()[0]
+
+    @property
+    def updated_at(self):
+        """Time of the last full dump or count update (0 if never)."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = "
+                               "'updated_at'").fetchone()
+        return row[0] if row else 0
+
+    def dump(self):
+        """Store every tag of the site (full dump, tag_list(limit=0)).
+
+        Existing tags are updated in place.
+
+        Returns:
+            Number of tags received (int).
+        """
+        count = self._store(self._stream({'limit': 0}))
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) "
+                             "VALUES ('updated_at', ?)", (time.time(),))
+        return count
+
+    def refresh(self):
+        """Store the tags created after the newest stored tag.
+
+        The first refresh of an empty snapshot is a full dump.
+
+        Returns:
+            Number of new tags (int).
+        """
+        if not self.max_id:
+            return self.dump()
+        return self._store(self._stream({'limit': 0,
+                                         'after_id': self.max_id}))
+
+    def update_counts(self, max_age=24 * 60 * 60):
+        """Update post counts and types if they are older than max_age.
+
+        Parameters:
+            max_age (int): Seconds (Default: one day).
+
+        Returns:
+            Number of tags received (0 if the counts are fresh).
+        """
+        if time.time() - self.updated_at <= max_age:
+            return 0
+        return self.dump()
+
+    def get(self, name):
+        """Get a tag by name.
+
+        Returns:
+            Dict (id, name, count, type, ambiguous) or None.
+        """
+        row = self._db.execute("SELECT id, name, count, type, ambiguous FROM "
+                               "tags WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'name', 'count', 'type', 'ambiguous'), row))
+
+    def tag_type(self, name):
+        """Get the type of a tag (None if it isn't stored)."""
+        tag = self.get(name)
+        return tag['type'] if tag else None
+
+    def count(self, name):
+        """Get the post count of a tag (0 if it isn't stored)."""
+        tag = self.get(name)
+        return tag['count'] if tag else 0
+
+    def __iter__(self):
+        """Iterate over all the tags, ordered by id."""
+        for row in self._db.execute("SELECT id, name, count, type, ambiguous "
+                                    "FROM tags ORDER BY id"):
+            yield dict(zip(('id', 'name', 'count', 'type', 'ambiguous'), row))
+
+    def close(self):
+        """Close the SQLite file."""
+        self._db.close()
+
+    def _stream(self, params):
+        """Stream the tags returned by the 'tag' API call."""
+        url = self.client._build_url('tag')
+        if self.client.rate_limiter is not None:
+            self.client.rate_limiter.wait()
+        try:
+            response = self.client.client.get(
+                url, params=params, stream=True,
+                timeout=self.client._request_timeout())
+        except requests.exceptions.Timeout:
+            raise PybooruTimeoutError("Timeout! url: {0}".format(url))
+        deadline = self.client._deadline()
+        try:
+            self.client.last_call.update({
+                'API': 'tag',
+                'url': response.url,
+                'status_code': response.status_code,
+                'status': self.client._get_status(response.status_code),
+                'headers': response.headers
+                })
+            if response.status_code != 200:
+                raise PybooruHTTPError("In _stream", response.status_code,
+                                       response.url)
+            received = [0]
+
+            def chunks():
+                # Decode here (not with decode_unicode) to count the bytes
+                decoder = codecs.getincrementaldecoder(
+                    response.encoding or 'utf-8')()
+                for chunk in response.iter_content(64 * 1024):
+                    if deadline is not None:
+                        deadline.check()
+                    received[0] += len(chunk)
+                    yield decoder.decode(chunk)
+                yield decoder.decode(b'', True)
+
+            for tag in _iter_json_array(chunks()):
+                yield tag
+            self.client._record_transfer('tag', response, received[0])
+        finally:
+            response.close()
+
+    def _store(self, tags):
+        """Insert or update tags in batches."""
+        count = 0
+        batch = []
+        for tag in tags:
+            batch.append((tag['id'], tag['name'], tag.get('count'),
+                          tag.get('type'), int(bool(tag.get('ambiguous')))))
+            if len(batch) >= self.batch_size:
+                count += self._write(batch)
+                batch = []
+        return count + self._write(batch)
+
+    def _write(self, batch):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO tags (id, name, count, type, "
+                "ambiguous) VALUES (?, ?, ?, ?, ?)", batch)
+        return len(batch)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.tagdict
+
+This module contains a tag dictionary and a compact in-memory post set.
+
+Splitting the 'tag_string' ('tags' on Moebooru) of millions of posts creates
+millions of duplicate small strings. The tag dictionary maps every tag name
+to an integer id once, posts keep their tags as arrays of ids (4 bytes per
+tag) and the strings are rebuilt only when a post is read. Other short string
+values (rating, file_ext...) are interned.
+
+Every client has a dictionary ('tag_dictionary' attribute), so all the post
+sets of a session share the same ids.
+
+Classes:
+    TagDictionary -- Maps tag names to integer ids.
+    PostSet -- In-memory posts with dictionary-encoded tags.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import sys
+import threading
+from array import array
+
+# pybooru imports
+from .exceptions import PybooruError
+
+
+# Strings up to this length are interned by PostSet
+_INTERN_LENGTH = 16
+
+_STRING_TYPES = (str, type(u''))
+
+try:
+    _intern = sys.intern
+except AttributeError:
+    # Python 2, intern() only accepts byte strings
+    def _intern(value):
+        return value
+
+
+class TagDictionary(object):
+    """Maps tag names to integer ids.
+
+    Ids are assigned in order of first use and never change.
+
+    Attributes:
+        names (list): Tag names, the position is the tag id.
+    """
+
+    def __init__(self, names=()):
+        """Initialize TagDictionary.
+
+        Keyword arguments:
+            names (iterable): Initial tag names (Default: empty).
+        """
+        self.names = []
+        self._ids = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self.tag_id(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __getstate__(self):
+        return {'names': self.names}
+
+    def __setstate__(self, state):
+        self.__init__(state['names'])
+
+    def tag_id(self, name):
+        """Get the id of a tag name, a new id is assigned if it is unknown."""
+        tag_id = self._ids.get(name)
+        if tag_id is None:
+            with self._lock:
+                tag_id = self._ids.get(name)
+                if tag_id is None:
+                    tag_id = len(self.names)
+                    self.names.append(name)
+                    self._ids[name] = tag_id
+        return tag_id
+
+    def get(self, name):
+        """Get the id of a tag name (None if it is unknown)."""
+        return self._ids.get(name)
+
+    def encode(self, tags):
+        """Encode tags.
+
+        Parameters:
+            tags (str or list): Space delimited tags or list of tag names.
+
+        Returns:
+            array('I') of tag ids, in the same order.
+        """
+        if isinstance(tags, _STRING_TYPES):
+            tags = tags.split()
+        return array('I', [self.tag_id(name) for name in tags])
+
+    def decode(self, tag_ids):
+        """Decode tag ids.
+
+        Returns:
+            List of tag names.
+        """
+        names = self.names
+        try:
+            return [names[tag_id] for tag_id in tag_ids]
+        except IndexError:
+            raise PybooruError("Unknown tag id in: {0}".format(
+                list(tag_ids)))
+
+    def decode_string(self, tag_ids):
+        """Decode tag ids to a space delimited string."""
+        return ' '.join(self.decode(tag_ids))
+
+
+class PostSet(object):
+    """In-memory posts with dictionary-encoded tags.
+
+    The tag fields of every post ('tags' and 'tag_string*') are stored as
+    arrays of ids of a TagDictionary, reading a post decodes them.
+
+    Attributes:
+        dictionary (TagDictionary): Dictionary of the tag ids.
+    """
+
+    def __init__(self, dictionary=None, posts=()):
+        """Initialize PostSet.
+
+        Keyword arguments:
+            dictionary (TagDictionary): Shared dictionary, e.g.
+                                        client.tag_dictionary
+                                        (Default: a new one).
+            posts (iterable): Initial posts.
+        """
+        if dictionary is None:
+            dictionary = TagDictionary()
+        self.dictionary = dictionary
+        self._posts = {}
+        self.add(posts)
+
+    def __len__(self):
+        return len(self._posts)
+
+    def __contains__(self, post_id):
+        return post_id in self._posts
+
+    def __iter__(self):
+        """Iterate over the decoded posts, ordered by id."""
+        for post_id in sorted(self._posts):
+            yield self._decode(self._posts[post_id])
+
+    @staticmethod
+    def _is_tag_field(key):
+        return key == 'tags' or key.startswith('tag_string')
+
+    def add(self, posts):
+        """Add or replace posts.
+
+        Parameters:
+            posts (iterable): Posts returned by the API (or a single post).
+        """
+        if isinstance(posts, dict):
+            posts = [posts]
+        for post in posts:
+            encoded = {}
+            for key, value in post.items():
+                key = _intern(key)
+                if isinstance(value, _STRING_TYPES):
+                    if self._is_tag_field(key):
+                        value = self.dictionary.encode(value)
+                    elif len(value) <= _INTERN_LENGTH:
+                        value = _intern(value)
+                encoded[key] = value
+            self._posts[post['id']] = encoded
+
+    def get(self, post_id):
+        """Get a decoded post.
+
+        Returns:
+            The post (dict) or None.
+        """
+        post = self._posts.get(post_id)
+        return None if post is None else self._decode(post)
+
+    def tag_ids(self, post_id, field=None):
+        """Get the encoded tags of a post without decoding them.
+
+        Parameters:
+            post_id (int): The post id.
+            field (str): Tag field (Default: 'tag_string' or 'tags').
+
+        Returns:
+            array('I') of tag ids (empty if the post isn't stored).
+        """
+        post = self._posts.get(post_id)
+        if post is None:
+            return array('I')
+        if field is None:
+            field = 'tag_string' if 'tag_string' in post else 'tags'
+        return post.get(field, array('I'))
+
+    def tags(self, post_id, field=None):
+        """Get the tag names of a post (see tag_ids())."""
+        return self.dictionary.decode(self.tag_ids(post_id, field))
+
+    def remove(self, post_id):
+        """Remove a post."""
+        self._posts.pop(post_id, None)
+
+    def _decode(self, post):
+        decoded = dict(post)
+        for key, value in post.items():
+            if self._is_tag_field(key) and isinstance(value, array):
+                decoded[key] = self.dictionary.decode_string(value)
+        return decoded
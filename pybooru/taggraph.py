@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.taggraph
+
+This module contains a local cache of the Danbooru tag alias and tag
+implication graph.
+
+All the aliases and implications are fetched in bulk, alias chains are
+resolved and the transitive closure of the implications is precomputed, so
+canonical() and implied() are dict lookups. The graph is saved to a JSON file
+and refreshed when it is older than 'max_age'.
+
+Classes:
+    TagGraph -- Alias canonicalization and implication closure of tags.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import json
+import os
+import time
+
+
+class TagGraph(object):
+    """Alias canonicalization and implication closure of tags.
+
+    Attributes:
+        path (str): Path of the JSON cache file (None: memory only).
+        max_age (int): Seconds before the graph must be refreshed.
+        aliases (dict): Antecedent name -> canonical name.
+        implications (dict): Antecedent name -> set of implied names (one
+                             hop).
+        fetched_at (float): Time of the last refresh (0 if never).
+    """
+
+    def __init__(self, path=None, max_age=24 * 60 * 60):
+        """Initialize TagGraph, the cache file is loaded if it exists.
+
+        Keyword arguments:
+            path (str): Path of the JSON cache file.
+            max_age (int): Seconds before the graph must be refreshed
+                           (Default: one day).
+        """
+        self.path = path
+        self.max_age = max_age
+        self.aliases = {}
+        self.implications = {}
+        self.fetched_at = 0
+        self._closure = {}
+
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as file_:
+                data = json.load(file_)
+            self.fetched_at = data['fetched_at']
+            self._build(data['aliases'], data['implications'])
+
+    @property
+    def stale(self):
+        """True when the graph is older than 'max_age'."""
+        return time.time() - self.fetched_at > self.max_age
+
+    def refresh(self, client, limit=1000):
+        """Fetch all active aliases and implications and rebuild the graph.
+
+        Parameters:
+            client (Danbooru): Danbooru client.
+            limit (int): Records per request (Default: 1000).
+        """
+        aliases = [(item['antecedent_name'], item['consequent_name'])
+                   for item in self._fetch_all(client.tag_aliases, limit)]
+        implications = [(item['antecedent_name'], item['consequent_name'])
+                        for item in self._fetch_all(client.tag_implications,
+                                                    limit)]
+        self.fetched_at = time.time()
+        self._build(aliases, implications)
+        self.save()
+
+    def refresh_if_stale(self, client, limit=1000):
+        """Refresh the graph if it is older than 'max_age'.
+
+        Returns:
+            True if the graph was refreshed.
+        """
+        if self.stale:
+            self.refresh(client, limit)
+            return True
+        return False
+
+    def save(self):
+        """Save the graph to the cache file (if 'path' is set)."""
+        if self.path is None:
+            return
+        data = {
+            'fetched_at': self.fetched_at,
+            'aliases': sorted(self.aliases.items()),
+            'implications': sorted(
+                (antecedent, consequent)
+                for antecedent, consequents in self.implications.items()
+                for consequent in consequents)
+            }
+        temp = "{0}.tmp".format(self.path)
+        with open(temp, 'w') as file_:
+            json.dump(data, file_)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temp, self.path)
+
+    def canonical(self, name):
+        """Get the canonical name of a tag (the name itself if it isn't
+        aliased)."""
+        return self.aliases.get(name, name)
+
+    def implied(self, name):
+        """Get all the tags implied by a tag (transitive).
+
+        Returns:
+            frozenset of canonical tag names.
+        """
+        return self._closure.get(self.canonical(name), frozenset())
+
+    def normalize(self, tags):
+        """Canonicalize tags and add all the implied tags.
+
+        Parameters:
+            tags (str or list): Space delimited tags or list of tag names.
+
+        Returns:
+            Sorted list of tag names.
+        """
+        if not isinstance(tags, (list, tuple, set, frozenset)):
+            tags = tags.split()
+        result = set()
+        for name in tags:
+            name = self.canonical(name)
+            result.add(name)
+            result.update(self._closure.get(name, ()))
+        return sorted(result)
+
+    # Attributes of the aliases and implications used by the graph
+    FIELDS = ('id', 'antecedent_name', 'consequent_name', 'status')
+
+    @classmethod
+    def _fetch_all(cls, function, limit):
+        """Fetch every active record of a paginated Danbooru list."""
+        records = []
+        page = None
+        while True:
+            batch = function(limit=limit, page=page, only=cls.FIELDS)
+            if not batch:
+                break
+            records.extend(item for item in batch
+                           if item.get('status', 'active') == 'active')
+            page = "b{0}".format(min(item['id'] for item in batch))
+        return records
+
+    def _build(self, aliases, implications):
+        """Resolve alias chains and compute the implication closure."""
+        direct = dict(aliases)
+        self.aliases = {}
+        for antecedent in direct:
+            name, seen = antecedent, set()
+            while name in direct and name not in seen:
+                seen.add(name)
+                name = direct[name]
+            self.aliases[antecedent] = name
+
+        self.implications = {}
+        for antecedent, consequent in implications:
+            self.implications.setdefault(self.canonical(antecedent),
+                                         set()).add(self.canonical(consequent))
+
+        self._closure = {}
+        for name in self.implications:
+            self._close(name, set())
+
+    def _close(self, name, visiting):
+        """Compute (memoized) the implication closure of a tag."""
+        if name in self._closure:
+            return self._closure[name]
+        if name in visiting:
+            # Danbooru rejects circular implications, only stop recursion
+            return frozenset()
+
+        visiting.add(name)
+        implied = set()
+        for consequent in self.implications.get(name, ()):
+            implied.add(consequent)
+            implied.update(self._close(consequent, visiting))
+        visiting.discard(name)
+        implied.discard(name)
+        self._closure[name] = frozenset(implied)
+        return self._closure[name]
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.tagindex
+
+This module contains a local inverted tag index for mirrored posts.
+
+Every tag has a posting list: the sorted array of the ids of its posts
+(4 bytes per post). The index can be saved to a single file and opened with
+mmap, posting lists are then read from the mapped pages without loading the
+whole file.
+
+File format (native byte order):
+    header -- b'PBTI', version, tag count, names size, post count (5 x u32).
+    names -- JSON list of tag names, the position is the tag id.
+    offsets -- Start of every posting list, in posts (tag count + 1 x u64).
+    postings -- Posting lists (u32), followed by the list of all posts.
+
+Classes:
+    TagIndex -- Inverted tag index with AND/OR/NOT queries.
+
+Functions:
+    post_tags -- Get the tag names of a Danbooru or Moebooru post.
+    intersect -- Intersection of sorted posting lists.
+    union -- Union of sorted posting lists.
+    difference -- Posts of a sorted posting list missing in others.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import heapq
+import json
+import mmap
+import re
+import struct
+from array import array
+from bisect import bisect_left
+
+# pybooru imports
+from .exceptions import PybooruError
+
+
+_MAGIC = b'PBTI'
+_VERSION = 1
+_HEADER = struct.Struct('=4sIIII')
+
+# Python 2 has no memoryview.cast() and no 'Q' (u64) arrays
+_PY2 = not hasattr(memoryview, 'cast')
+
+
+def _padding(names_size):
+    """Bytes after the tag names to align the offsets to 8 bytes."""
+    return -(_HEADER.size + names_size) % 8
+
+
+def _array(code, values=()):
+    """Array of u32 ('I') or u64 ('Q') integers from a list or bytes.
+
+    On Python 2 u64 integers are stored in a list.
+    """
+    if not (_PY2 and code == 'Q'):
+        return array(code, values)
+    if isinstance(values, bytes):
+        return list(struct.unpack("={0}Q".format(len(values) // 8), values))
+    return list(values)
+
+
+def _tobytes(values):
+    """Native bytes of an array made by _array()."""
+    if isinstance(values, list):
+        return struct.pack("={0}Q".format(len(values)), *values)
+    return values.tostring() if _PY2 else values.tobytes()
+
+
+def _cast(data, start, count, code):
+    """Read 'count' u32 ('I') or u64 ('Q') integers of a buffer.
+
+    Returns a memoryview of the buffer (release() it before the buffer is
+    closed), on Python 2 a copy (see _array()).
+    """
+    end = start + count * struct.calcsize(code)
+    if _PY2:
+        return _array(code, data[start:end])
+    return memoryview(data)[start:end].cast(code)
+
+
+def _release(views):
+    """Release the memoryviews of a buffer (see _cast())."""
+    for view in views:
+        if isinstance(view, memoryview):
+            view.release()
+
+
+def post_tags(post):
+    """Get the tag names of a Danbooru ('tag_string') or Moebooru ('tags')
+    post.
+
+    Parameters:
+        post (dict): A post returned by the API.
+
+    Returns:
+        List of tag names.
+    """
+    return (post.get('tag_string') or post.get('tags') or '').split()
+
+
+def intersect(lists):
+    """Intersection of sorted posting lists.
+
+    The shortest list drives the search, the position in the other lists
+    only moves forward (bisect from the last match).
+
+    Parameters:
+        lists (list): Sorted posting lists.
+
+    Returns:
+        Sorted list of post ids.
+    """
+    if not lists:
+        return []
+    if len(lists) == 1:
+        return list(lists[0])
+    lists = sorted(lists, key=len)
+    positions = [0] * len(lists)
+    result = []
+    for post_id in lists[0]:
+        for number in range(1, len(lists)):
+            other = lists[number]
+            position = bisect_left(other, post_id, positions[number])
+            positions[number] = position
+            if position == len(other):
+                return result
+            if other[position] != post_id:
+                break
+        else:
+            result.append(post_id)
+    return result
+
+
+def union(lists):
+    """Union of sorted posting lists.
+
+    Parameters:
+        lists (list): Sorted posting lists.
+
+    Returns:
+        Sorted list of post ids.
+    """
+    result = []
+    for post_id in heapq.merge(*lists):
+        if not result or result[-1] != post_id:
+            result.append(post_id)
+    return result
+
+
+def difference(posts, lists):
+    """Posts of a sorted posting list missing in other lists.
+
+    Parameters:
+        posts (list): Sorted posting list.
+        lists (list): Sorted posting lists to remove.
+
+    Returns:
+        Sorted list of post ids.
+    """
+    excluded = union(lists) if len(lists) > 1 else (lists[0] if lists else [])
+    result = []
+    position = 0
+    for post_id in posts:
+        position = bisect_left(excluded, post_id, position)
+        if position == len(excluded) or excluded[position] != post_id:
+            result.append(post_id)
+    return result
+
+
+class TagIndex(object):
+    """Inverted tag index with AND/OR/NOT queries.
+
+    Build it from posts with TagIndex.build() or open a saved index with
+    TagIndex.load().
+
+    Attributes:
+        names (list): Tag names, the position is the tag id.
+    """
+
+    def __init__(self, names, postings, all_posts):
+        """Initialize TagIndex.
+
+        Keyword arguments:
+            names (list): Tag names, the position is the tag id.
+            postings (list): Sorted posting list of every tag.
+            all_posts (sequence): Sorted ids of all the indexed posts.
+        """
+        self.names = names
+        self._ids = dict((name, tag_id) for tag_id, name in enumerate(names))
+        self._postings = postings
+        self._all = all_posts
+        self._mmap = None
+        self._view = None
+
+    @classmethod
+    def build(cls, posts):
+        """Build the index from posts.
+
+        Parameters:
+            posts (iterable): Posts (e.g. a PostMirror).
+
+        Returns:
+            TagIndex.
+        """
+        lists = {}
+        all_posts = array('I')
+        for post in posts:
+            all_posts.append(post['id'])
+            for name in post_tags(post):
+                lists.setdefault(name, array('I')).append(post['id'])
+
+        names = sorted(lists)
+        postings = []
+        for name in names:
+            postings.append(array('I', sorted(set(lists.pop(name)))))
+        return cls(names, postings, array('I', sorted(set(all_posts))))
+
+    @classmethod
+    def load(cls, path):
+        """Open a saved index with mmap.
+
+        Parameters:
+            path (str): Path of the index file.
+
+        Returns:
+            TagIndex.
+
+        Raises:
+            PybooruError: When the file isn't a tag index.
+        """
+        with open(path, 'rb') as file_:
+            data = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, names_size, posts = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            data.close()
+            raise PybooruError("Invalid tag index: {0}".format(path))
+
+        start = _HEADER.size
+        names = json.loads(data[start:start + names_size].decode('utf-8'))
+        start += names_size + _padding(names_size)
+        offsets = _array('Q', data[start:start + (count + 1) * 8])
+        start += (count + 1) * 8
+
+        view = _cast(data, start, offsets[count] + posts, 'I')
+        postings = [view[offsets[tag_id]:offsets[tag_id + 1]]
+                    for tag_id in range(count)]
+        index = cls(names, postings,
+                    view[offsets[count]:offsets[count] + posts])
+        index._mmap = data
+        index._view = view
+        return index
+
+    def save(self, path):
+        """Save the index to a file that can be opened with load().
+
+        Parameters:
+            path (str): Path of the index file.
+        """
+        names = json.dumps(self.names).encode('utf-8')
+        offsets = _array('Q', [0])
+        for posting in self._postings:
+            offsets.append(offsets[-1] + len(posting))
+
+        with open(path, 'wb') as file_:
+            file_.write(_HEADER.pack(_MAGIC, _VERSION, len(self.names),
+                                     len(names), len(self._all)))
+            file_.write(names)
+            file_.write(b'\0' * _padding(len(names)))
+            file_.write(_tobytes(offsets))
+            for posting in self._postings:
+                file_.write(_tobytes(array('I', posting)))
+            file_.write(_tobytes(array('I', self._all)))
+
+    def close(self):
+        """Release the mapped file of a loaded index.
+
+        Posting lists returned by posting() and all_posts() are released
+        too, copy them (list()) to keep them.
+        """
+        if self._mmap is not None:
+            # The map can't be closed while views of it exist
+            _release(self._postings + [self._all, self._view])
+            self._postings = []
+            self._all = []
+            self._view = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        """Number of indexed posts."""
+        return len(self._all)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def tag_id(self, name):
+        """Get the id of a tag (None if it isn't indexed)."""
+        return self._ids.get(name)
+
+    def posting(self, name):
+        """Get the sorted post ids of a tag (empty if it isn't indexed)."""
+        tag_id = self._ids.get(name)
+        return self._postings[tag_id] if tag_id is not None else []
+
+    def count(self, name):
+        """Get the number of posts of a tag."""
+        return len(self.posting(name))
+
+    def match(self, pattern):
+        """Get the tag names that match a wildcard pattern ('*').
+
+        The prefix before the first '*' is searched with bisect in the sorted
+        names, only the names with that prefix are matched.
+
+        Parameters:
+            pattern (str): Pattern, e.g. 'long_*' or '*_hair'.
+
+        Returns:
+            List of tag names.
+        """
+        parts = pattern.split('*')
+        regex = re.compile(
+            '.*'.join(re.escape(part) for part in parts) + r'\Z', re.DOTALL)
+        names = []
+        for position in range(bisect_left(self.names, parts[0]),
+                              len(self.names)):
+            name = self.names[position]
+            if not name.startswith(parts[0]):
+                break
+            if regex.match(name):
+                names.append(name)
+        return names
+
+    def all_posts(self):
+        """Get the sorted ids of all the indexed posts."""
+        return self._all
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """Search posts by tags.
+
+        Parameters:
+            all_of (list): Posts must have all these tags (AND).
+            any_of (list): Posts must have at least one of these tags (OR).
+            none_of (list): Posts must have none of these tags (NOT).
+
+        Returns:
+            Sorted list of post ids.
+        """
+        lists = [self.posting(name) for name in all_of]
+        if any_of:
+            lists.append(union([self.posting(name) for name in any_of]))
+        if not lists:
+            lists.append(self._all)
+
+        posts = intersect(lists)
+        if none_of:
+            posts = difference(posts, [self.posting(name)
+                                       for name in none_of])
+        return posts
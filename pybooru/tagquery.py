@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.tagquery
+
+This module contains a local evaluator for the Danbooru tag search syntax,
+the 'tags' parameter of post_list().
+
+Supported syntax:
+    tag -- Posts with the tag.
+    -tag -- Posts without the tag.
+    ~tag1 ~tag2 -- Posts with at least one of the tags.
+    tag* -- Wildcards ('*'), can be negated or combined with '~'.
+    rating:s -- Rating (s, q, e, g or the full name), can be negated.
+    score:>N, favcount:N..M, id:N..M -- Numeric ranges: N, N..M, ..M, N..,
+                                        >N, >=N, <N, <=N and, for ids, lists
+                                        (N,M,...). Can be negated.
+    order:id -- Order: id, id_desc, score, score_asc, favcount,
+                favcount_asc, random (Default: id_desc).
+
+Other metatags of the sites (user:, pool:, fav:, width:...) need data that
+isn't stored locally, queries with them are rejected. Tags that only look
+like metatags (e.g. 're:zero') are searched as tags.
+
+Queries are run against a TagIndex (posting lists) and PostColumns (numeric
+fields). The plan starts from the cheapest set of candidates (the smallest
+posting list, OR group or id range), intersects the remaining tag terms
+ordered by size, removes negated tags and checks the numeric filters on the
+candidates left.
+
+Classes:
+    PostColumns -- Numeric post fields stored by column.
+    LocalSearch -- Runs tag queries against local data.
+
+Functions:
+    parse_query -- Parse a tag search string.
+"""
+
+# __future__ imports
+from __future__ import absolute_import
+
+# External imports
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+
+# pybooru imports
+from .exceptions import PybooruError
+from .tagindex import (intersect, union, difference)
+
+
+# Numeric metatags: metatag -> column
+NUMERIC_METATAGS = {
+    'id': 'id',
+    'score': 'score',
+    'favcount': 'fav_count'
+    }
+
+# Metatags of Danbooru and Moebooru that can't be evaluated locally
+UNSUPPORTED_METATAGS = frozenset((
+    'age', 'ai', 'appealer', 'approver', 'arttags', 'artcomm', 'chartags',
+    'child', 'comm', 'comment', 'commenter', 'commentary', 'copytags',
+    'date', 'disapproved', 'downvote', 'duration', 'embedded', 'exif',
+    'fav', 'favgroup', 'filesize', 'filetype', 'flagger', 'gentags', 'has',
+    'height', 'holds', 'is', 'limit', 'locked', 'md5', 'metatags', 'mpixels',
+    'note', 'noter', 'noteupdater', 'ordfav', 'ordpool', 'parent', 'pixiv',
+    'pixiv_id', 'pool', 'ratio', 'search', 'shown', 'source', 'status',
+    'sub', 'tagcount', 'unaliased', 'upvote', 'user', 'vote', 'width'
+    ))
+
+# order: metatag value -> (column, descending)
+ORDERS = {
+    'id': ('id', False),
+    'id_asc': ('id', False),
+    'id_desc': ('id', True),
+    'score': ('score', True),
+    'score_desc': ('score', True),
+    'score_asc': ('score', False),
+    'favcount': ('fav_count', True),
+    'favcount_desc': ('fav_count', True),
+    'favcount_asc': ('fav_count', False),
+    'random': (None, False)
+    }
+
+
+def _number(text):
+    """Parse an integer metatag value."""
+    try:
+        return int(text)
+    except ValueError:
+        raise PybooruError("Invalid number in query: {0}".format(text))
+
+
+def _parse_range(text):
+    """Parse a numeric metatag value.
+
+    Returns:
+        Tuple (low, high) with None for open ends, or a frozenset of values.
+    """
+    if ',' in text:
+        return frozenset(_number(value) for value in text.split(','))
+    if '..' in text:
+        low, high = text.split('..', 1)
+        return (_number(low) if low else None,
+                _number(high) if high else None)
+    for operator, bounds in (('>=', (0, None)), ('<=', (None, 0)),
+                             ('>', (1, None)), ('<', (None, -1))):
+        if text.startswith(operator):
+            value = _number(text[len(operator):])
+            return tuple(None if delta is None else value + delta
+                         for delta in bounds)
+    value = _number(text)
+    return (value, value)
+
+
+def _in_range(value, bounds):
+    """Check a value against a range returned by _parse_range()."""
+    if isinstance(bounds, frozenset):
+        return value in bounds
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def parse_query(tags):
+    """Parse a tag search string.
+
+    Parameters:
+        tags (str): The tags to search for.
+
+    Returns:
+        Dict with the lists 'all_of', 'none_of', 'any_of' (tag names or
+        wildcard patterns), 'ratings' and 'not_ratings' (sets of rating
+        letters), 'ranges' and 'not_ranges' (lists of (column, bounds)) and
+        'order'.
+
+    Raises:
+        PybooruError: When a metatag value is invalid or the metatag isn't
+                      supported.
+    """
+    query = {'all_of': [], 'none_of': [], 'any_of': [], 'ratings': set(),
+             'not_ratings': set(), 'ranges': [], 'not_ranges': [],
+             'order': 'id_desc'}
+
+    for term in tags.split():
+        negated = term.startswith('-') and len(term) > 1
+        either = term.startswith('~') and len(term) > 1
+        if negated or either:
+            term = term[1:]
+
+        name, _, value = term.partition(':')
+        name = name.lower()
+        if value and name == 'order':
+            if value.lower() not in ORDERS:
+                raise PybooruError("Unsupported order: {0}".format(value))
+            query['order'] = value.lower()
+        elif value and name == 'rating':
+            key = 'not_ratings' if negated else 'ratings'
+            query[key].add(value[0].lower())
+        elif value and name in NUMERIC_METATAGS:
+            key = 'not_ranges' if negated else 'ranges'
+            query[key].append((NUMERIC_METATAGS[name], _parse_range(value)))
+        elif value and name in UNSUPPORTED_METATAGS:
+            raise PybooruError("Unsupported metatag: {0}".format(term))
+        elif negated:
+            query['none_of'].append(term)
+        elif either:
+            query['any_of'].append(term)
+        else:
+            query['all_of'].append(term)
+    return query
+
+
+class PostColumns(object):
+    """Numeric post fields stored by column.
+
+    Rows are sorted by post id, a row is found with bisect.
+
+    Attributes:
+        ids (array): Sorted post ids.
+        columns (dict): Column name -> array, in the same order as 'ids'.
+    """
+
+    # Integer columns, 'rating' is stored as the code of its first letter
+    FIELDS = ('score', 'fav_count')
+
+    def __init__(self, ids, columns):
+        """Initialize PostColumns.
+
+        Keyword arguments:
+            ids (array): Sorted post ids.
+            columns (dict): Column name -> array.
+        """
+        self.ids = ids
+        self.columns = columns
+        self.columns['id'] = ids
+
+    @classmethod
+    def build(cls, posts):
+        """Build the columns from posts.
+
+        Parameters:
+            posts (iterable): Posts (e.g. a PostMirror).
+
+        Returns:
+            PostColumns.
+        """
+        rows = sorted((post['id'], post) for post in posts)
+        ids = array('I', [post_id for post_id, _ in rows])
+        columns = dict((field, array('i', [post.get(field) or 0
+                                           for _, post in rows]))
+                       for field in cls.FIELDS)
+        columns['rating'] = array('B', [ord((post.get('rating') or '-')[0])
+                                        for _, post in rows])
+        return cls(ids, columns)
+
+    def row(self, post_id):
+        """Get the row of a post (None if it isn't stored)."""
+        position = bisect_left(self.ids, post_id)
+        if position < len(self.ids) and self.ids[position] == post_id:
+            return position
+        return None
+
+    def value(self, post_id, column):
+        """Get a field of a post (None if it isn't stored)."""
+        position = self.row(post_id)
+        return None if position is None else self.columns[column][position]
+
+    def id_range(self, low=None, high=None):
+        """Get the sorted ids in [low, high] (None for open ends)."""
+        start = 0 if low is None else bisect_left(self.ids, low)
+        end = len(self.ids) if high is None else bisect_right(self.ids, high)
+        return self.ids[start:end]
+
+
+class LocalSearch(object):
+    """Runs tag queries against local data.
+
+    Attributes:
+        index (TagIndex): Tag posting lists.
+        columns (PostColumns): Numeric post fields.
+        mirror (PostMirror): Optional mirror to return posts instead of ids.
+    """
+
+    def __init__(self, index, columns, mirror=None):
+        """Initialize LocalSearch.
+
+        Keyword arguments:
+            index (TagIndex): Tag posting lists.
+            columns (PostColumns): Numeric post fields.
+            mirror (PostMirror): Mirror of the posts (Default: None).
+        """
+        self.index = index
+        self.columns = columns
+        self.mirror = mirror
+
+    def search(self, tags='', limit=None, page=1):
+        """Search post ids.
+
+        Parameters:
+            tags (str): The tags to search for.
+            limit (int): How many post ids to return (Default: all).
+            page (int): The page number.
+
+        Returns:
+            List of post ids in the order of the query.
+        """
+        query = parse_query(tags)
+        posts = self.execute(query)
+        posts = self.order(posts, query['order'])
+        if limit is not None:
+            start = (page - 1) * limit
+            posts = posts[start:start + limit]
+        return posts
+
+    def post_list(self, tags='', limit=100, page=1):
+        """Local post_list(): search posts in the mirror.
+
+        Parameters:
+            tags (str): The tags to search for.
+            limit (int): How many posts to return.
+            page (int): The page number.
+
+        Returns:
+            List of posts.
+
+        Raises:
+            PybooruError: When there isn't a mirror.
+        """
+        if self.mirror is None:
+            raise PybooruError("LocalSearch.post_list() requires a mirror.")
+        posts = (self.mirror.get(post_id)
+                 for post_id in self.search(tags, limit, page))
+        return [post for post in posts if post is not None]
+
+    def execute(self, query):
+        """Run a parsed query.
+
+        Parameters:
+            query (dict): Query returned by parse_query().
+
+        Returns:
+            Sorted list of post ids.
+        """
+        terms = self._tag_terms(query)
+
+        # Cheapest id range filter can replace the scan of all posts
+        id_bounds = [bounds for column, bounds in query['ranges']
+                     if column == 'id' and not isinstance(bounds, frozenset)]
+        if id_bounds:
+            lows = [low for low, _ in id_bounds if low is not None]
+            highs = [high for _, high in id_bounds if high is not None]
+            terms.append(self.columns.id_range(max(lows) if lows else None,
+                                               min(highs) if highs else None))
+        if not terms:
+            terms.append(self.index.all_posts())
+
+        # intersect() starts from the smallest list
+        posts = intersect(terms)
+
+        excluded = [self.index.posting(name)
+                    for name in self._expand(query['none_of'])]
+        if excluded and posts:
+            posts = difference(posts, excluded)
+
+        filters = ('ratings', 'not_ratings', 'ranges', 'not_ranges')
+        if any(query[key] for key in filters):
+            posts = [post_id for post_id in posts
+                     if self._check(post_id, query)]
+        return posts
+
+    def order(self, posts, order):
+        """Sort post ids.
+
+        Parameters:
+            posts (list): Sorted post ids.
+            order (str): Value of the 'order:' metatag.
+
+        Returns:
+            List of post ids, the posts without numeric fields are last.
+        """
+        column, descending = ORDERS[order]
+        if column is None:
+            posts = list(posts)
+            random.shuffle(posts)
+            return posts
+        if column == 'id':
+            return list(reversed(posts)) if descending else list(posts)
+
+        # Posts without a row (not in PostColumns) go last
+        values = self.columns.columns[column]
+        rows = [(post_id, self.columns.row(post_id)) for post_id in posts]
+        stored = sorted(((values[row], post_id) for post_id, row in rows
+                         if row is not None), reverse=descending)
+        missing = [post_id for post_id, row in rows if row is None]
+        return [post_id for _, post_id in stored] + missing
+
+    def _expand(self, names):
+        """Replace the wildcard patterns of a list of names."""
+        expanded = []
+        for name in names:
+            if '*' in name:
+                expanded.extend(self.index.match(name))
+            else:
+                expanded.append(name)
+        return expanded
+
+    def _tag_terms(self, query):
+        """Get the posting lists that every result must be in."""
+        terms = []
+        for name in query['all_of']:
+            if '*' in name:
+                terms.append(union([self.index.posting(match) for match
+                                    in self.index.match(name)]))
+            else:
+                terms.append(self.index.posting(name))
+        if query['any_of']:
+            terms.append(union([self.index.posting(name) for name
+                                in self._expand(query['any_of'])]))
+        return terms
+
+    def _check(self, post_id, query):
+        """Check the rating and numeric filters of a post."""
+        row = self.columns.row(post_id)
+        if row is None:
+            return False
+        columns = self.columns.columns
+
+        rating = chr(columns['rating'][row])
+        if query['ratings'] and rating not in query['ratings']:
+            return False
+        if rating in query['not_ratings']:
+            return False
+        for column, bounds in query['ranges']:
+            if not _in_range(columns[column][row], bounds):
+                return False
+        for column, bounds in query['not_ranges']:
+            if _in_range(columns[column][row], bounds):
+                return False
+        return True
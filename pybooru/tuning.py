@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""pybooru.tuning
+
+This module contains the auto-tuner of crawl page size and concurrency.
+
+Both values are controlled AIMD-style (additive increase, multiplicative
+decrease, like TCP congestion control): they grow by a small step while the
+site answers fast and without errors, and are cut by a factor when a page is
+slow, a request fails or the site throttles the client. Throttling also
+makes the crawl wait (exponential backoff) before the next request.
+
+Page size follows the latency of the pages (target: 'target_latency'),
+concurrency (download workers) follows the throughput of the downloads: a
+worker is added while the throughput grows and removed when it drops.
+
+Classes:
+    AIMD -- Additive increase / multiplicative decrease controller.
+    AutoTuner -- Page size and concurrency of a crawl.
+"""
+
+# __future__ imports
+from __future__ import absolute_import, division
+
+# External imports
+import threading
+
+# pybooru imports
+from .moebooru import Moebooru
+from .exceptions import PybooruHTTPError
+from .resources import PAGE_LIMITS
+
+
+# HTTP status codes of a throttled client
+THROTTLE_STATUS = (421, 429, 503)
+
+
+class AIMD(object):
+    """Additive increase / multiplicative decrease controller.
+
+    Attributes:
+        value (float): Current value.
+        minimum (float): Lowest value.
+        maximum (float): Highest value.
+        step (float): Added by increase().
+        factor (float): Multiplied by decrease().
+    """
+
+    def __init__(self, value, minimum, maximum, step, factor=0.5):
+        """Initialize AIMD.
+
+        Keyword arguments:
+            value (float): Initial value.
+            minimum (float): Lowest value.
+            maximum (float): Highest value.
+            step (float): Added by increase().
+            factor (float): Multiplied by decrease() (Default: 0.5).
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.factor = factor
+        self.value = min(max(value, minimum), maximum)
+
+    def __int__(self):
+        return int(self.value)
+
+    def increase(self):
+        """Add 'step' (up to 'maximum')."""
+        self.value = min(self.value + self.step, self.maximum)
+
+    def decrease(self):
+        """Multiply by 'factor' (down to 'minimum')."""
+        self.value = max(self.value * self.factor, self.minimum)
+
+
+class AutoTuner(object):
+    """Page size and concurrency of a crawl.
+
+    Pass it to CrawlJob or ShardedCrawler ('tuner' argument), the crawl
+    reports every page and every batch of downloads and reads 'limit' and
+    'workers' before the next ones.
+
+    Attributes:
+        page_size (AIMD): Posts per page.
+        concurrency (AIMD): Download workers.
+        target_latency (float): Slowest acceptable page (seconds).
+        backoff (float): Seconds to wait after the last throttled request.
+        history (list): Last adjustments (limit, workers, reason).
+    """
+
+    # Initial and maximum backoff (seconds)
+    MIN_BACKOFF = 1
+    MAX_BACKOFF = 300
+
+    def __init__(self, limit=50, workers=2, min_limit=10, max_limit=None,
+                 max_workers=8, target_latency=2.0):
+        """Initialize AutoTuner.
+
+        Keyword arguments:
+            limit (int): Initial posts per page (Default: 50).
+            workers (int): Initial download workers (Default: 2).
+            min_limit (int): Smallest page (Default: 10).
+            max_limit (int): Largest page (Default: the maximum of the site,
+                             set by set_client()).
+            max_workers (int): Maximum download workers (Default: 8).
+            target_latency (float): Slowest acceptable page in seconds
+                                    (Default: 2).
+        """
+        self.page_size = AIMD(limit, min_limit,
+                              max_limit or max(PAGE_LIMITS.values()),
+                              step=max(min_limit // 2, 1))
+        self.concurrency = AIMD(workers, 1, max_workers, step=1)
+        self.target_latency = target_latency
+        self.backoff = 0
+        self.history = []
+        self._fixed_limit = max_limit is not None
+        self._throughput = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Pickle support, every process has its own lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        """Posts of the next page (int)."""
+        return int(self.page_size)
+
+    @property
+    def workers(self):
+        """Download workers of the next page (int)."""
+        return int(self.concurrency)
+
+    def set_client(self, client):
+        """Set the maximum page size of the site of a client (if
+        'max_limit' wasn't given)."""
+        if not self._fixed_limit:
+            api = 'moebooru' if isinstance(client, Moebooru) else 'danbooru'
+            self.page_size.maximum = PAGE_LIMITS[api]
+            self.page_size.value = min(self.page_size.value,
+                                       self.page_size.maximum)
+
+    def throttled(self, error):
+        """True if an exception is a throttling response."""
+        if not isinstance(error, PybooruHTTPError):
+            return False
+        return error.http_code in THROTTLE_STATUS
+
+    def page_done(self, latency):
+        """Report a page fetched in 'latency' seconds."""
+        with self._lock:
+            self.backoff = 0
+            if latency > self.target_latency:
+                self.page_size.decrease()
+                self._log('slow page')
+            else:
+                self.page_size.increase()
+
+    def page_failed(self, error):
+        """Report a failed page request.
+
+        Returns:
+            Seconds to wait before the next request (0: don't retry, the
+            error isn't a throttling response).
+        """
+        with self._lock:
+            self.page_size.decrease()
+            if not self.throttled(error):
+                self._log('error')
+                return 0
+            self.concurrency.decrease()
+            self.backoff = min(max(self.backoff * 2, self.MIN_BACKOFF),
+                               self.MAX_BACKOFF)
+            self._log('throttled')
+            return self.backoff
+
+    def downloads_done(self, seconds, count, failures=0):
+        """Report a batch of downloads.
+
+        Only successful downloads count toward the throughput, failures are
+        a congestion signal: the batch removes a worker.
+
+        Parameters:
+            seconds (float): Duration of the batch.
+            count (int): Successful downloads.
+            failures (int): Failed downloads.
+        """
+        if not count and not failures:
+            return
+        with self._lock:
+            if failures:
+                self.concurrency.decrease()
+                self._throughput = None
+                self._log('download errors')
+                return
+            throughput = count / max(seconds, 1e-6)
+            if self._throughput is None or throughput >= self._throughput:
+                self.concurrency.increase()
+            else:
+                # Adding a worker didn't help, step back
+                self.concurrency.value = max(self.concurrency.value - 1,
+                                             self.concurrency.minimum)
+                self._log('throughput dropped')
+            self._throughput = throughput
+
+    def _log(self, reason):
+        self.history.append((self.limit, self.workers, reason))
+        del self.history[:-100]
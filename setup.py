@@ -27,6 +27,11 @@ setup(
     packages=find_packages(),
     platforms=['any'],
     install_requires=['requests'],
+    extras_require={
+        'numpy': ['numpy'],
+        'parquet': ['pyarrow'],
+        'brotli': ['brotli']
+        },
     include_package_data=True,
     data_file=[
         ('', ['LICENSE', 'README.md', 'changelog.md', 'requirements.txt'])
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+
+"""Benchmark of the Pybooru download engine.
+
+Serves a file from memory on a local HTTP server (in another process) and
+downloads it with the buffered write path of Downloader and with a plain
+iter_content() loop. Prints throughput and CPU seconds per GB downloaded by
+this process.
+
+Usage:
+    python tools/benchmark_download.py [size in MB] [rounds]
+"""
+
+# __future__ imports
+from __future__ import print_function, division
+
+# External imports
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pybooru imports
+from pybooru import Danbooru, Downloader  # NOQA
+
+
+PAYLOAD = b''
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Return PAYLOAD for any GET request."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(size, ports):
+    """Serve a payload of 'size' MB, the port is put in the queue."""
+    global PAYLOAD
+    PAYLOAD = os.urandom(size * 1024 * 1024)
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def cpu_time():
+    """CPU time of this process (the server isn't included)."""
+    if hasattr(time, 'process_time'):
+        return time.process_time()
+    return time.clock()
+
+
+def iter_content_download(downloader, url, path):
+    """Reference download: a plain iter_content() loop."""
+    response = downloader.client.client.get(url, stream=True)
+    with open(path, 'wb') as file_:
+        for chunk in response.iter_content(downloader.chunk_size):
+            file_.write(chunk)
+    response.close()
+
+
+def buffered_download(downloader, url, path):
+    """Download with the buffered write path of Downloader."""
+    name = os.path.basename(path)
+    downloader._fetch(url, name, {}, os.path.dirname(path))
+
+
+def run(name, function, downloader, url, path, size, rounds):
+    start_wall, start_cpu = time.time(), cpu_time()
+    for _ in range(rounds):
+        function(downloader, url, path)
+    wall, cpu = time.time() - start_wall, cpu_time() - start_cpu
+    gigabytes = size * rounds / 1024
+    print("{0:>14}: {1:8.1f} MB/s {2:8.2f} CPU s/GB".format(
+        name, gigabytes * 1024 / wall, cpu / gigabytes))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(size, ports))
+    server.daemon = True
+    server.start()
+
+    url = "http://127.0.0.1:{0}/file.bin".format(ports.get())
+    client = Danbooru(site_url="http://127.0.0.1")
+    downloader = Downloader(client, chunk_size=1024 * 1024)
+    path = os.path.join(tempfile.mkdtemp(), 'file.bin')
+
+    print("Payload: {0} MB x {1} rounds".format(size, rounds))
+    try:
+        for name, function in (('iter_content', iter_content_download),
+                               ('buffered', buffered_download)):
+            run(name, function, downloader, url, path, size, rounds)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()